@@ -1,10 +1,18 @@
-"""Alembic environment configuration."""
+"""Alembic environment configuration.
+
+Online runs set lock_timeout and use one transaction per revision, retrying
+a revision whose DDL timed out waiting for a lock. `-x dry_run=true`
+executes nothing and prints the estimated lock impact of the pending SQL.
+See app/core/online_migrations.py.
+"""
+import io
 from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
+from alembic.runtime.migration import MigrationContext
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -17,8 +25,9 @@ if config.config_file_name is not None:
 
 # add your model's MetaData object here
 # for 'autogenerate' support
+from app.core import online_migrations, partitions
 from app.core.database import Base
-from app.models import User, OAuthCredential, OAuthState  # noqa: F401
+from app.models import User, OAuthCredential, OAuthState, Job, Photo, RestyleRender, EnhancementRender, FaceEmbedding, FaceCluster  # noqa: F401
 
 target_metadata = Base.metadata
 
@@ -28,6 +37,18 @@ target_metadata = Base.metadata
 # ... etc.
 
 
+def include_name(name, type_, parent_names):
+    """Leave month partitions of jobs/photos (created at runtime) out of autogenerate."""
+    return not (type_ == "table" and partitions.is_partition_name(name))
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Leave out the copies of photos' foreign key PostgreSQL keeps for each jobs partition."""
+    if type_ == "foreign_key_constraint" and reflected:
+        return not partitions.is_partition_name(object.referred_table.name)
+    return True
+
+
 def get_url():
     """Get database URL from environment or config."""
     import os
@@ -66,6 +87,7 @@ def run_migrations_online() -> None:
     In this scenario we need to create an Engine
     and associate a connection with the context.
     """
+    options = online_migrations.migration_options(context.get_x_argument(as_dictionary=True))
     configuration = config.get_section(config.config_ini_section)
     configuration["sqlalchemy.url"] = get_url()
     connectable = engine_from_config(
@@ -75,12 +97,36 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        online_migrations.set_lock_timeout(connection, options.lock_timeout_ms)
+        connection.commit()
+
+        if options.dry_run:
+            # Generate the pending SQL from the current revision instead of executing it
+            script = io.StringIO()
+            context.configure(
+                connection=connection,
+                target_metadata=target_metadata,
+                as_sql=True,
+                output_buffer=script,
+                starting_rev=MigrationContext.configure(connection).get_current_revision(),
+                transaction_per_migration=True,
+            )
+            with context.begin_transaction():
+                context.run_migrations()
+            impacts = online_migrations.estimate_lock_impact(
+                connection, online_migrations.split_sql(script.getvalue()), options.lock_timeout_ms
+            )
+            print(online_migrations.format_report(impacts, options.lock_timeout_ms))
+            return
+
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
+            include_object=include_object,
+            transaction_per_migration=True,
         )
-
-        with context.begin_transaction():
-            context.run_migrations()
+        online_migrations.run_with_lock_retries(context.run_migrations, options.lock_retries)
 
 
 if context.is_offline_mode():
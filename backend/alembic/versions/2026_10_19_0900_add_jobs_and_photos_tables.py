@@ -0,0 +1,59 @@
+"""add jobs and photos tables
+
+Revision ID: 2026_10_19_0900
+Revises: 2025_12_07_0646
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_19_0900'
+down_revision = '2025_12_07_0646'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create jobs table
+    op.create_table(
+        'jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('google_album_id', sa.Text(), nullable=True),
+        sa.Column('output_album_id', sa.Text(), nullable=True),
+        sa.Column('status', sa.Text(), nullable=False, server_default='importing_album'),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('input_photo_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('output_photo_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    )
+    op.create_index(op.f('ix_jobs_user_id'), 'jobs', ['user_id'], unique=False)
+
+    # Create photos table (written in bulk with COPY, so ids and flags have server defaults)
+    op.create_table(
+        'photos',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('job_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('original_media_item_id', sa.Text(), nullable=False),
+        sa.Column('processed_media_item_id', sa.Text(), nullable=True),
+        sa.Column('is_duplicate', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('is_hero', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('is_album_cover', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('aesthetic_score', sa.Float(), nullable=True),
+        sa.Column('people_coverage_score', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ondelete='CASCADE'),
+        sa.UniqueConstraint('job_id', 'original_media_item_id', name='uq_photos_job_id_original_media_item_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('photos')
+    op.drop_index(op.f('ix_jobs_user_id'), table_name='jobs')
+    op.drop_table('jobs')
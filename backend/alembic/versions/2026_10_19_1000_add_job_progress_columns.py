@@ -0,0 +1,25 @@
+"""add job stage and progress columns
+
+Revision ID: 2026_10_19_1000
+Revises: 2026_10_19_0900
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_19_1000'
+down_revision = '2026_10_19_0900'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('stage', sa.Text(), nullable=True))
+    op.add_column('jobs', sa.Column('progress', sa.Float(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'progress')
+    op.drop_column('jobs', 'stage')
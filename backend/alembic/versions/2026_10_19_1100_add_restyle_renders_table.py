@@ -0,0 +1,30 @@
+"""add restyle_renders table
+
+Revision ID: 2026_10_19_1100
+Revises: 2026_10_19_1000
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_19_1100'
+down_revision = '2026_10_19_1000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'restyle_renders',
+        sa.Column('source_digest', sa.Text(), nullable=False),
+        sa.Column('style', sa.Text(), nullable=False),
+        sa.Column('output_digest', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.PrimaryKeyConstraint('source_digest', 'style'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('restyle_renders')
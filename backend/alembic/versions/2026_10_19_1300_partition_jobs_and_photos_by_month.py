@@ -0,0 +1,145 @@
+"""partition jobs and photos by creation month
+
+Revision ID: 2026_10_19_1300
+Revises: 2026_10_19_1200
+Create Date: 2026-10-19 13:00:00.000000
+
+Rebuilds `jobs` as range-partitioned by `created_at` and `photos` by the
+new `job_created_at` (its job's `created_at`), one partition per month plus
+a default partition, for the months holding jobs and the current month
+plus MONTHS_AHEAD (the PARTITION_MONTHS_AHEAD default); the partition
+maintainer creates later months at runtime. The DDL is spelled out here
+rather than taken from app/core/partitions.py, so this revision does not
+change when that module or the settings do. Primary and unique keys
+of a partitioned table must include the partition key, so they become
+(id, created_at), (id, job_created_at) and (job_id, original_media_item_id,
+job_created_at), and photos reference jobs by (job_id, job_created_at).
+`face_clusters` loses its foreign key to jobs (jobs.id alone is no longer
+unique); retention deletes the clusters of the jobs it drops.
+
+Existing rows are copied under an ACCESS EXCLUSIVE lock on both tables:
+run it in a maintenance window on large databases.
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_19_1300'
+down_revision = '2026_10_19_1200'
+branch_labels = None
+depends_on = None
+
+
+MONTHS_AHEAD = 2
+
+# Referenced table first
+PARTITIONED_TABLES = ('jobs', 'photos')
+
+PHOTO_COLUMNS = (
+    'id, job_id, original_media_item_id, processed_media_item_id, is_duplicate, is_hero, is_album_cover, '
+    'aesthetic_score, people_coverage_score, created_at'
+)
+
+
+def _month_start(moment: datetime) -> datetime:
+    moment = moment.astimezone(timezone.utc) if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _partition_months() -> list[datetime]:
+    """Months holding jobs, the current month and MONTHS_AHEAD months after it."""
+    current = _month_start(datetime.now(timezone.utc))
+    months = {_add_months(current, offset) for offset in range(MONTHS_AHEAD + 1)}
+    if not op.get_context().as_sql:  # A dry run only generates SQL: there is no data to look at
+        months.update(
+            _month_start(created_at)
+            for created_at in op.get_bind().exec_driver_sql(
+                "SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' "
+                "FROM jobs_unpartitioned"
+            ).scalars()
+        )
+    return sorted(months)
+
+
+def upgrade() -> None:
+    op.drop_constraint('face_clusters_job_id_fkey', 'face_clusters', type_='foreignkey')
+
+    # Keep the old tables (and their index names) out of the way while copying
+    op.rename_table('photos', 'photos_unpartitioned')
+    op.rename_table('jobs', 'jobs_unpartitioned')
+    op.execute('ALTER INDEX photos_pkey RENAME TO photos_unpartitioned_pkey')
+    op.execute('ALTER INDEX uq_photos_job_id_original_media_item_id RENAME TO uq_photos_unpartitioned_job_id_original_media_item_id')
+    op.execute('ALTER INDEX jobs_pkey RENAME TO jobs_unpartitioned_pkey')
+    op.execute('ALTER INDEX ix_jobs_user_id RENAME TO ix_jobs_unpartitioned_user_id')
+
+    op.execute('CREATE TABLE jobs (LIKE jobs_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)')
+    op.create_primary_key('jobs_pkey', 'jobs', ['id', 'created_at'])
+    op.create_foreign_key('jobs_user_id_fkey', 'jobs', 'users', ['user_id'], ['id'], ondelete='CASCADE')
+    op.create_index(op.f('ix_jobs_user_id'), 'jobs', ['user_id'], unique=False)
+    op.execute(
+        'CREATE TABLE photos (LIKE photos_unpartitioned INCLUDING DEFAULTS, job_created_at timestamptz NOT NULL) '
+        'PARTITION BY RANGE (job_created_at)'
+    )
+
+    months = _partition_months()
+    for table in PARTITIONED_TABLES:
+        for month in months:
+            op.execute(
+                f"CREATE TABLE {table}_{month:%Y_%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+            )
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+    op.execute('INSERT INTO jobs SELECT * FROM jobs_unpartitioned')
+    op.execute(
+        'INSERT INTO photos SELECT p.*, j.created_at FROM photos_unpartitioned p '
+        'JOIN jobs_unpartitioned j ON j.id = p.job_id'
+    )
+    op.create_primary_key('photos_pkey', 'photos', ['id', 'job_created_at'])
+    op.create_unique_constraint(
+        'uq_photos_job_id_original_media_item_id', 'photos', ['job_id', 'original_media_item_id', 'job_created_at']
+    )
+    op.create_foreign_key(
+        'photos_job_id_fkey', 'photos', 'jobs', ['job_id', 'job_created_at'], ['id', 'created_at'], ondelete='CASCADE'
+    )
+
+    op.drop_table('photos_unpartitioned')
+    op.drop_table('jobs_unpartitioned')
+
+
+def downgrade() -> None:
+    op.rename_table('photos', 'photos_partitioned')
+    op.rename_table('jobs', 'jobs_partitioned')
+    op.execute('ALTER INDEX photos_pkey RENAME TO photos_partitioned_pkey')
+    op.execute('ALTER INDEX uq_photos_job_id_original_media_item_id RENAME TO uq_photos_partitioned_job_id_original_media_item_id')
+    op.execute('ALTER INDEX jobs_pkey RENAME TO jobs_partitioned_pkey')
+    op.execute('ALTER INDEX ix_jobs_user_id RENAME TO ix_jobs_partitioned_user_id')
+
+    op.execute('CREATE TABLE jobs (LIKE jobs_partitioned INCLUDING DEFAULTS)')
+    op.execute('INSERT INTO jobs SELECT * FROM jobs_partitioned')
+    op.create_primary_key('jobs_pkey', 'jobs', ['id'])
+    op.create_foreign_key('jobs_user_id_fkey', 'jobs', 'users', ['user_id'], ['id'], ondelete='CASCADE')
+    op.create_index(op.f('ix_jobs_user_id'), 'jobs', ['user_id'], unique=False)
+
+    op.execute('CREATE TABLE photos (LIKE photos_partitioned INCLUDING DEFAULTS)')
+    op.drop_column('photos', 'job_created_at')
+    op.execute(f'INSERT INTO photos SELECT {PHOTO_COLUMNS} FROM photos_partitioned')
+    op.create_primary_key('photos_pkey', 'photos', ['id'])
+    op.create_unique_constraint(
+        'uq_photos_job_id_original_media_item_id', 'photos', ['job_id', 'original_media_item_id']
+    )
+    op.create_foreign_key('photos_job_id_fkey', 'photos', 'jobs', ['job_id'], ['id'], ondelete='CASCADE')
+
+    op.drop_table('photos_partitioned')  # With its partitions
+    op.drop_table('jobs_partitioned')
+
+    op.execute('DELETE FROM face_clusters WHERE job_id NOT IN (SELECT id FROM jobs)')
+    op.create_foreign_key(
+        'face_clusters_job_id_fkey', 'face_clusters', 'jobs', ['job_id'], ['id'], ondelete='CASCADE'
+    )
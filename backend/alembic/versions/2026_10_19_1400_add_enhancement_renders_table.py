@@ -0,0 +1,29 @@
+"""add enhancement_renders table
+
+Revision ID: 2026_10_19_1400
+Revises: 2026_10_19_1300
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_19_1400'
+down_revision = '2026_10_19_1300'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'enhancement_renders',
+        sa.Column('cache_key', sa.Text(), nullable=False),
+        sa.Column('output_digest', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.PrimaryKeyConstraint('cache_key'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('enhancement_renders')
@@ -1,11 +1,12 @@
 """Authentication API endpoints."""
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.dependencies import get_current_user
-from app.core.database import get_db
+from app.core.database import get_db, use_primary
 from app.core.encryption import encrypt_token
+from app.core.etag import model_etag_response
 from app.core.jwt import create_access_token
 from app.core.oauth import (
     OAuthError,
@@ -14,6 +15,7 @@ from app.core.oauth import (
     generate_state_token,
 )
 from app.models import User, OAuthCredential, OAuthState
+from app.schemas import UserProfile
 
 router = APIRouter()
 
@@ -61,6 +63,9 @@ async def google_oauth_callback(
     Exchanges authorization code for tokens, creates/updates user,
     and returns JWT token.
     """
+    # The state token was written moments ago and everything read here is
+    # then written: replica lag must not reject the login
+    use_primary(db)
     try:
         # Validate state token for CSRF protection
         oauth_state = db.query(OAuthState).filter(OAuthState.state_token == state).first()
@@ -170,16 +175,13 @@ async def google_oauth_callback(
         ) from e
 
 
-@router.get("/me")
-async def get_me(current_user: User = Depends(get_current_user)):
+@router.get("/me", response_model=UserProfile)
+async def get_me(request: Request, current_user: User = Depends(get_current_user)):
     """
     Get current authenticated user.
 
     Returns:
-        User information.
+        User information, with an ETag (304 if If-None-Match matches).
     """
-    return {
-        "id": str(current_user.id),
-        "email": current_user.email,
-    }
+    return model_etag_response(request, UserProfile(id=str(current_user.id), email=current_user.email))
 
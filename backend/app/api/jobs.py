@@ -0,0 +1,78 @@
+"""Processing job routes."""
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core import partitions
+from app.core.database import get_db, reads_from_replica, use_primary
+from app.core.dependencies import get_current_user
+from app.models.job import Job
+from app.models.user import User
+from app.schemas import JobStatus
+from app.services.job_progress import job_progress
+
+router = APIRouter()
+
+RECENT_MONTHS = 1  # Months before the current one whose partitions are searched first
+
+
+def _find_job(db: Session, job_id: uuid.UUID) -> Optional[Job]:
+    """
+    Look a job up in the recent months' partitions, then in all of them.
+
+    Job ids carry no date, so only a `created_at` bound lets PostgreSQL
+    skip the older partitions; most requests are for recent jobs.
+    """
+    recent = partitions.add_months(partitions.month_start(datetime.now(timezone.utc)), -RECENT_MONTHS)
+    job = db.scalars(select(Job).where(Job.id == job_id, Job.created_at >= recent)).first()
+    return job if job is not None else db.get(Job, job_id)
+
+
+@router.get("/{job_id}", response_model=JobStatus)
+def get_job(
+    job_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Get the status and progress of a processing job.
+
+    Jobs running in this process are answered from their live in-memory
+    progress; others are read from the jobs table, which is at most
+    JOB_PROGRESS_FLUSH_MS behind.
+
+    Returns:
+        Job status, stage, overall progress (0-1), photo counts and timestamps.
+    """
+    live = job_progress.get(job_id)
+    if live is not None:
+        if live.user_id != current_user.id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Job does not belong to user")
+        return live.snapshot()
+
+    job = _find_job(db, job_id)
+    if job is None and reads_from_replica(db):
+        # Just created and not replicated yet
+        use_primary(db)
+        job = _find_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    if job.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Job does not belong to user")
+    return JobStatus(
+        job_id=str(job.id),
+        status=job.status,
+        stage=job.stage,
+        progress=job.progress,
+        input_photo_count=job.input_photo_count,
+        output_photo_count=job.output_photo_count,
+        google_album_id=job.google_album_id,
+        output_album_id=job.output_album_id,
+        started_at=job.started_at,
+        completed_at=job.completed_at,
+        error_message=job.error_message,
+    )
@@ -1,16 +1,44 @@
 """Photos Picker API endpoints."""
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.dependencies import get_current_user
 from app.core.database import get_db
+from app.core.etag import etag_response, model_etag_response
+from app.core.singleflight import upstream_calls
 from app.models import User
-from app.services.picker_api import PickerAPIError, create_picker_session, get_picker_session_status, get_picker_session_items
+from app.schemas import (
+    IngestionStatus,
+    PickerBatchStatusRequest,
+    PickerBatchStatusResponse,
+    PickerBatchStatusResult,
+    PickerMediaItemList,
+    PickerSession,
+    PickerSessionStatus,
+    SessionId,
+)
+from app.services.ingestion import ingestion_manager
+from app.services.picker_api import (
+    PickerAPIError,
+    call_for_user,
+    create_picker_session,
+    fetch_session_status,
+    get_picker_session_items,
+    get_picker_session_status,
+    get_user_credentials,
+)
+from app.services.picker_catalog import picker_catalog
+from app.services.picker_status import status_hub
 
 router = APIRouter()
 
 
-@router.post("/session")
+@router.post("/session", response_model=PickerSession)
 async def create_session(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -32,21 +60,30 @@ async def create_session(
         ) from e
 
 
-@router.get("/session/{session_id}")
+@router.get("/session/{session_id}", response_model=PickerSessionStatus)
 async def get_session_status(
     session_id: str,
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
 ):
     """
     Get the status of a Picker API session.
 
     Returns:
-        Dict with sessionId, mediaItemsSet (bool), and state.
+        Dict with sessionId, mediaItemsSet (bool), and state, with an ETag
+        (304 if If-None-Match matches).
     """
     try:
-        result = get_picker_session_status(current_user, db, session_id)
-        return result
+        # Identical concurrent requests (tabs, retries) share one Google call
+        result = await upstream_calls.do(
+            (current_user.id, "session_status", session_id),
+            call_for_user,
+            current_user.id,
+            get_picker_session_status,
+            session_id,
+        )
+        ingestion_manager.on_status(current_user.id, session_id, result)
+        return model_etag_response(request, result)
     except PickerAPIError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -54,22 +91,123 @@ async def get_session_status(
         ) from e
 
 
-@router.get("/session/{session_id}/items")
+@router.post("/sessions/status", response_model=PickerBatchStatusResponse)
+async def get_sessions_status(
+    body: PickerBatchStatusRequest,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Get the status of several Picker sessions in one call.
+
+    Credentials are resolved once for the whole batch; the Google calls then
+    run concurrently (at most BATCH_STATUS_CONCURRENCY at a time) and share
+    in-flight calls with the single-session endpoint. A failure for one
+    session is reported in its result and does not fail the batch.
+
+    Returns:
+        Dict with results (sessionId, status or error), in request order.
+    """
+    user_id = current_user.id
+    try:
+        credentials = await asyncio.to_thread(call_for_user, user_id, get_user_credentials)
+    except PickerAPIError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get session status: {str(e)}",
+        ) from e
+
+    limit = asyncio.Semaphore(settings.batch_status_concurrency)
+
+    async def one(session_id: str) -> PickerBatchStatusResult:
+        async with limit:
+            try:
+                result = await upstream_calls.do(
+                    (user_id, "session_status", session_id), fetch_session_status, credentials, session_id
+                )
+            except PickerAPIError as e:
+                return PickerBatchStatusResult(session_id=session_id, error=str(e))
+        ingestion_manager.on_status(user_id, session_id, result)
+        return PickerBatchStatusResult(session_id=session_id, status=result)
+
+    session_ids = list(dict.fromkeys(body.session_ids))  # Drop duplicates, keep order
+    results = await asyncio.gather(*(one(session_id) for session_id in session_ids))
+    return PickerBatchStatusResponse(results=results)
+
+
+@router.get("/session/{session_id}/events")
+async def stream_session_status(
+    session_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Stream Picker session status as Server-Sent Events.
+
+    All subscribers to a session share one server-side poller, so open tabs
+    do not multiply upstream calls. Emits a `status` event on every change
+    and closes after a final status (selection made, or session completed or
+    expired). Emits an `error` event and closes if polling fails. Comment
+    lines are sent as keep-alives while nothing changes.
+    """
+    user_id = current_user.id
+
+    async def events():
+        async with status_hub.subscribe(user_id, session_id) as queue:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.sse_heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+
+                if event.error is not None:
+                    yield f"event: error\ndata: {json.dumps({'detail': event.error})}\n\n"
+                else:
+                    yield f"event: status\ndata: {event.status.model_dump_json(by_alias=True)}\n\n"
+                if event.is_last:
+                    return
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/session/{session_id}/items", response_model=PickerMediaItemList)
 async def get_session_items(
     session_id: str,
+    request: Request,
     page_token: str | None = Query(None, description="Page token for pagination"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
 ):
     """
     Get media items selected in a Picker API session.
 
+    A selection does not change once set, so pages are served from the
+    catalog cache when present, without contacting Google.
+
     Returns:
-        Dict with mediaItems list and optional nextPageToken.
+        Dict with mediaItems list and optional nextPageToken, with an ETag
+        (304 if If-None-Match matches).
     """
+    cached = picker_catalog.get(current_user.id, session_id, page_token)
+    if cached is not None:
+        return etag_response(request, cached.body, cached.etag)
+
     try:
-        result = get_picker_session_items(current_user, db, session_id, page_token=page_token)
-        return result
+        result = await upstream_calls.do(
+            (current_user.id, "session_items", session_id, page_token),
+            call_for_user,
+            current_user.id,
+            get_picker_session_items,
+            session_id,
+            page_token=page_token,
+        )
+        page = picker_catalog.put(current_user.id, session_id, page_token, result)
+        return etag_response(request, page.body, page.etag)
     except PickerAPIError as e:
         # 404 if items not available yet (user hasn't selected)
         status_code = status.HTTP_404_NOT_FOUND if "Media items not available yet" in str(e) else status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -78,3 +216,29 @@ async def get_session_items(
             detail=f"Failed to get session items: {str(e)}",
         ) from e
 
+
+@router.get("/session/{session_id}/ingestion", response_model=IngestionStatus)
+async def get_session_ingestion(
+    session_id: SessionId,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Get the progress of the background ingestion of a session's selection.
+
+    Ingestion starts automatically once the session's selection is observed
+    to be set (via the status endpoint or event stream).
+    """
+    state = ingestion_manager.get(current_user.id, session_id)
+    if state is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No ingestion for this session")
+    return IngestionStatus(
+        session_id=session_id,
+        state=state.state,
+        items_total=state.items_total,
+        proxies_done=state.proxies_done,
+        skipped=state.skipped,
+        failed=state.failed,
+        error=state.error,
+        started_at=state.started_at,
+        finished_at=state.finished_at,
+    )
@@ -0,0 +1,222 @@
+"""Admission control: shed load before the worker falls over.
+
+When Google slows down, requests pile up on synchronous `requests` calls and
+on the SQLAlchemy pool, and every new request makes it worse. The load of
+the process is the highest of three ratios (each 0 when its limit is 0):
+
+- requests in flight / ADMISSION_MAX_IN_FLIGHT; a request counts until it
+  starts its response, so open event streams do not;
+- DB connections checked out / pool capacity (pool_size + max_overflow),
+  over the primary and replica pools;
+- mean event loop lag (`loop_monitor.recent_mean_lag`) / ADMISSION_MAX_LOOP_LAG_MS.
+
+`AdmissionMiddleware` answers new requests with a fast 503 and Retry-After
+once the load reaches 1, and requests to expensive routes (the Picker
+proxies, ADMISSION_EXPENSIVE_PREFIXES) already at ADMISSION_EXPENSIVE_LOAD,
+so headroom goes to cheaper work. Cheap routes (health, metrics, /auth/me:
+ADMISSION_CHEAP_PATHS) are always admitted.
+
+`readiness()` reports the same signals for `GET /api/health?ready=true`,
+cached for ADMISSION_READINESS_CACHE_MS so load balancer probes cost nothing.
+"""
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.database import get_engine, get_replica_engines
+from app.core.loop_monitor import loop_monitor
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+CHEAP, NORMAL, EXPENSIVE = "cheap", "normal", "expensive"
+
+REJECTED = registry.counter(
+    "admission_rejected_total", "Requests shed with 503, by route priority and limiting signal", ("priority", "signal")
+)
+IN_FLIGHT = registry.gauge("admission_in_flight", "Requests admitted that have not started their response")
+POOL_USAGE = registry.gauge("db_pool_usage_ratio", "DB connections checked out / pool capacity (busiest pool)")
+
+
+def _split(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def pool_usage(engines: Optional[list[Engine]] = None) -> float:
+    """Checked-out connections / capacity of the busiest pool (0 for pools without a fixed size)."""
+    usage = 0.0
+    for engine in engines if engines is not None else [get_engine(), *get_replica_engines()]:
+        pool = engine.pool
+        size, max_overflow = getattr(pool, "size", None), getattr(pool, "_max_overflow", -1)
+        if size is None or max_overflow < 0:  # NullPool, StaticPool, unlimited overflow
+            continue
+        capacity = size() + max_overflow
+        if capacity > 0:
+            usage = max(usage, pool.checkedout() / capacity)
+    return usage
+
+
+@dataclass
+class Load:
+    """Load signals of the process, and the highest of their ratios."""
+
+    in_flight: int
+    pool_usage: float
+    loop_lag_s: float
+    load: float
+    signal: str  # Signal with the highest ratio
+
+    def as_dict(self) -> dict:
+        return {
+            "load": round(self.load, 3),
+            "signal": self.signal,
+            "in_flight": self.in_flight,
+            "pool_usage": round(self.pool_usage, 3),
+            "loop_lag_ms": round(self.loop_lag_s * 1000, 1),
+        }
+
+
+class AdmissionController:
+    """
+    Decides which requests to admit from in-flight count, pool usage and loop lag.
+
+    Args:
+        max_in_flight: In-flight requests at load 1 (0 ignores in-flight requests).
+        max_loop_lag: Mean loop lag (seconds) at load 1 (0 ignores lag).
+        expensive_load: Load at which expensive routes are shed.
+        cheap_paths: Paths always admitted.
+        expensive_prefixes: Path prefixes of expensive routes.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_loop_lag: float,
+        expensive_load: float,
+        cheap_paths: list[str],
+        expensive_prefixes: list[str],
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_loop_lag = max_loop_lag
+        self.expensive_load = expensive_load
+        self.cheap_paths = frozenset(cheap_paths)
+        self.expensive_prefixes = tuple(expensive_prefixes)
+        self.in_flight = 0
+        IN_FLIGHT.set_function(lambda: self.in_flight)
+        POOL_USAGE.set_function(pool_usage)
+
+    def priority(self, path: str) -> str:
+        if path in self.cheap_paths:
+            return CHEAP
+        return EXPENSIVE if path.startswith(self.expensive_prefixes) else NORMAL
+
+    def load(self) -> Load:
+        usage = pool_usage()
+        lag = loop_monitor.recent_mean_lag
+        ratios = {
+            "in_flight": self.in_flight / self.max_in_flight if self.max_in_flight > 0 else 0.0,
+            "pool": usage,
+            "loop_lag": lag / self.max_loop_lag if self.max_loop_lag > 0 else 0.0,
+        }
+        signal = max(ratios, key=ratios.get)
+        return Load(self.in_flight, usage, lag, ratios[signal], signal)
+
+    def admit(self, priority: str) -> Optional[Load]:
+        """None if a request of this priority may run now, else the load that sheds it."""
+        if priority == CHEAP:
+            return None
+        load = self.load()
+        limit = self.expensive_load if priority == EXPENSIVE else 1.0
+        return load if load.load >= limit else None
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware that sheds requests with 503 + Retry-After under load.
+
+    Args:
+        app: Wrapped ASGI app.
+        controller: Admission decisions and in-flight accounting.
+        retry_after: Seconds clients are told to wait.
+    """
+
+    def __init__(self, app: ASGIApp, controller: "AdmissionController", retry_after: int = 2):
+        self.app = app
+        self.controller = controller
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        priority = self.controller.priority(scope["path"])
+        shed = self.controller.admit(priority)
+        if shed is not None:
+            REJECTED.inc(priority=priority, signal=shed.signal)
+            logger.debug("request shed path=%s load=%.2f signal=%s", scope["path"], shed.load, shed.signal)
+            await self._reject(send)
+            return
+
+        controller = self.controller
+        controller.in_flight += 1
+        counted = True
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal counted
+            if counted and message["type"] == "http.response.start":
+                counted = False
+                controller.in_flight -= 1
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if counted:
+                controller.in_flight -= 1
+
+    async def _reject(self, send: Send) -> None:
+        body = json.dumps({"detail": "Server overloaded, retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+admission = AdmissionController(
+    max_in_flight=settings.admission_max_in_flight,
+    max_loop_lag=settings.admission_max_loop_lag_ms / 1000,
+    expensive_load=settings.admission_expensive_load,
+    cheap_paths=_split(settings.admission_cheap_paths),
+    expensive_prefixes=_split(settings.admission_expensive_prefixes),
+)
+
+_readiness: tuple[float, dict] = (0.0, {})
+
+
+def readiness() -> dict:
+    """
+    Readiness for load balancers, recomputed at most every ADMISSION_READINESS_CACHE_MS.
+
+    Returns:
+        {"ready": bool, **Load.as_dict()}; not ready once normal requests are being shed.
+    """
+    global _readiness
+    checked_at, result = _readiness
+    now = time.monotonic()
+    if not result or now - checked_at >= settings.admission_readiness_cache_ms / 1000:
+        load = admission.load()
+        result = {"ready": load.load < 1.0, **load.as_dict()}
+        _readiness = (now, result)
+    return result
@@ -0,0 +1,343 @@
+"""Content-addressed blob storage for pipeline intermediates.
+
+`BlobStore` is the interface pipeline stages use for image bytes (proxies,
+enhanced and restyled outputs). Blobs are addressed by the SHA-256 of their
+content, so identical outputs are stored once. Owners (e.g. a job) hold
+references to blobs; referenced blobs are never evicted.
+
+`LocalBlobStore` keeps blobs on local disk for development, load tests and
+single-instance deployments (the worker processes of one host may share its
+directory):
+
+- objects live at `objects/<2 hex>/<2 hex>/<digest>` (sharded by prefix);
+- writes go to `tmp/` and are renamed into place, so readers never see
+  partial blobs and concurrent writers of the same content are harmless;
+- when the total size exceeds the quota, the least recently used
+  unreferenced blobs are deleted;
+- each process indexes the blobs it knows in memory; a miss falls back to
+  the disk, so blobs and references written by another process are found
+  (and counted against the quota once);
+- reads are zero-copy: `open_mmap` maps the file, `sendfile` copies it to a
+  socket in the kernel, and `path` suits `FileResponse`.
+
+A Cloud Storage backend (TEMP_BUCKET_NAME) can implement the same interface.
+"""
+import hashlib
+import logging
+import mmap
+import os
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterable, Optional, Union
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class BlobNotFoundError(KeyError):
+    """Raised when a blob digest is not in the store."""
+
+
+@dataclass(frozen=True)
+class BlobRef:
+    """A stored blob."""
+
+    digest: str  # SHA-256, hex
+    size: int
+
+
+class BlobStore(ABC):
+    """Interface for content-addressed blob storage."""
+
+    @abstractmethod
+    def put(self, data: Union[bytes, Iterable[bytes], BinaryIO], owner: Optional[str] = None) -> BlobRef:
+        """Store content (bytes, chunks or a binary file) and optionally reference it for `owner`."""
+
+    @abstractmethod
+    def exists(self, digest: str) -> bool:
+        """Whether the blob is stored."""
+
+    @abstractmethod
+    def read(self, digest: str) -> bytes:
+        """Return the blob's content."""
+
+    @abstractmethod
+    def add_ref(self, digest: str, owner: str) -> None:
+        """Reference a blob for `owner`, protecting it from eviction."""
+
+    @abstractmethod
+    def remove_ref(self, digest: str, owner: str) -> None:
+        """Drop `owner`'s reference to a blob."""
+
+    @abstractmethod
+    def release_owner(self, owner: str) -> int:
+        """Drop all of `owner`'s references. Returns the number removed."""
+
+
+def _check_digest(digest: str) -> str:
+    if len(digest) != 64 or any(c not in "0123456789abcdef" for c in digest):
+        raise ValueError(f"Invalid blob digest: {digest!r}")
+    return digest
+
+
+def _check_owner(owner: str) -> str:
+    if not owner or "/" in owner or owner in (".", ".."):
+        raise ValueError(f"Invalid blob owner: {owner!r}")
+    return owner
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Blob store on local disk with an LRU size quota.
+
+    Args:
+        root: Store directory (created if needed).
+        quota_bytes: Total size of blobs kept; unreferenced blobs beyond it are evicted.
+    """
+
+    def __init__(self, root: str, quota_bytes: int):
+        self.root = Path(root)
+        self.quota_bytes = quota_bytes
+        self.objects_dir = self.root / "objects"
+        self.tmp_dir = self.root / "tmp"
+        self.refs_dir = self.root / "refs"
+        for directory in (self.objects_dir, self.tmp_dir, self.refs_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._lru: OrderedDict[str, int] = OrderedDict()  # digest -> size, least recently used first
+        self._refs: dict[str, set[str]] = {}  # digest -> owners
+        self.total_bytes = 0
+        self._load()
+
+    def _load(self) -> None:
+        """Rebuild the LRU order (by access time) and references from disk."""
+        for path in self.tmp_dir.iterdir():  # Writes interrupted by a crash
+            path.unlink(missing_ok=True)
+        found = []
+        for path in self.objects_dir.glob("*/*/*"):
+            stat = path.stat()
+            found.append((stat.st_atime, path.name, stat.st_size))
+        for _, digest, size in sorted(found):
+            self._lru[digest] = size
+            self.total_bytes += size
+        for ref_dir in self.refs_dir.iterdir():
+            owners = {path.name for path in ref_dir.iterdir()}
+            if ref_dir.name in self._lru and owners:
+                self._refs[ref_dir.name] = owners
+
+    def _disk_owners(self, digest: str) -> set[str]:
+        try:
+            return {path.name for path in (self.refs_dir / digest).iterdir()}
+        except FileNotFoundError:
+            return set()
+
+    def _index_locked(self, digest: str) -> bool:
+        """Whether a blob is stored, indexing it (and its references) if another process wrote it."""
+        if digest in self._lru:
+            return True
+        try:
+            size = self.path(digest).stat().st_size
+        except FileNotFoundError:
+            return False
+        self._lru[digest] = size
+        self.total_bytes += size
+        owners = self._disk_owners(digest)
+        if owners:
+            self._refs[digest] = owners
+        return True
+
+    def _forget(self, digest: str) -> None:
+        """Drop a blob another process evicted from the index."""
+        with self._lock:
+            size = self._lru.pop(digest, None)
+            if size is not None:
+                self.total_bytes -= size
+            self._refs.pop(digest, None)
+
+    def path(self, digest: str) -> Path:
+        """Filesystem path of a blob (it may not exist)."""
+        _check_digest(digest)
+        return self.objects_dir / digest[:2] / digest[2:4] / digest
+
+    def put(self, data: Union[bytes, Iterable[bytes], BinaryIO], owner: Optional[str] = None) -> BlobRef:
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            chunks: Iterable[bytes] = (data,)
+        elif hasattr(data, "read"):
+            chunks = iter(lambda: data.read(CHUNK_SIZE), b"")
+        else:
+            chunks = data
+
+        hasher = hashlib.sha256()
+        size = 0
+        temp_path = self.tmp_dir / uuid.uuid4().hex
+        try:
+            with open(temp_path, "wb") as file:
+                for chunk in chunks:
+                    hasher.update(chunk)
+                    file.write(chunk)
+                    size += len(chunk)
+            digest = hasher.hexdigest()
+            final_path = self.path(digest)
+            with self._lock:
+                if self._index_locked(digest):
+                    temp_path.unlink()
+                    self._lru.move_to_end(digest)
+                else:
+                    final_path.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(temp_path, final_path)
+                    self._lru[digest] = size
+                    self.total_bytes += size
+                if owner is not None:
+                    self._add_ref_locked(digest, owner)
+                self._evict_locked()
+        finally:
+            temp_path.unlink(missing_ok=True)
+        return BlobRef(digest=digest, size=size)
+
+    def exists(self, digest: str) -> bool:
+        _check_digest(digest)
+        with self._lock:
+            return self._index_locked(digest)
+
+    def _touch(self, digest: str) -> Path:
+        with self._lock:
+            if not self._index_locked(digest):
+                raise BlobNotFoundError(digest)
+            self._lru.move_to_end(digest)
+        return self.path(digest)
+
+    def read(self, digest: str) -> bytes:
+        path = self._touch(_check_digest(digest))
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            self._forget(digest)
+            raise BlobNotFoundError(digest) from None
+
+    def open_mmap(self, digest: str) -> mmap.mmap:
+        """
+        Map a blob read-only (zero-copy). Close the map when done.
+
+        The mapping stays valid even if the blob is evicted meanwhile.
+        """
+        path = self._touch(_check_digest(digest))
+        try:
+            with open(path, "rb") as file:
+                return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            self._forget(digest)
+            raise BlobNotFoundError(digest) from None
+
+    def sendfile(self, digest: str, out_fd: int, offset: int = 0, count: Optional[int] = None) -> int:
+        """
+        Copy a blob to a socket (or file) descriptor in the kernel with `os.sendfile`.
+
+        Returns:
+            Bytes sent.
+        """
+        path = self._touch(_check_digest(digest))
+        try:
+            file = open(path, "rb")
+        except FileNotFoundError:
+            self._forget(digest)
+            raise BlobNotFoundError(digest) from None
+        with file:
+            remaining = (os.fstat(file.fileno()).st_size - offset) if count is None else count
+            sent = 0
+            while remaining > 0:
+                n = os.sendfile(out_fd, file.fileno(), offset + sent, remaining)
+                if n == 0:
+                    break
+                sent += n
+                remaining -= n
+            return sent
+
+    def add_ref(self, digest: str, owner: str) -> None:
+        with self._lock:
+            if not self._index_locked(_check_digest(digest)):
+                raise BlobNotFoundError(digest)
+            self._add_ref_locked(digest, owner)
+
+    def _add_ref_locked(self, digest: str, owner: str) -> None:
+        _check_owner(owner)  # Before any state changes: an empty ref set would pin the blob
+        owners = self._refs.get(digest, set())
+        if owner in owners:
+            return
+        ref_dir = self.refs_dir / digest
+        ref_dir.mkdir(exist_ok=True)
+        (ref_dir / owner).touch()
+        self._refs[digest] = owners | {owner}
+
+    def remove_ref(self, digest: str, owner: str) -> None:
+        with self._lock:
+            self._remove_ref_locked(_check_digest(digest), _check_owner(owner))
+            self._evict_locked()
+
+    def _remove_ref_locked(self, digest: str, owner: str) -> None:
+        ref_dir = self.refs_dir / digest
+        (ref_dir / owner).unlink(missing_ok=True)
+        owners = self._disk_owners(digest)  # Including references other processes added
+        if owners:
+            self._refs[digest] = owners
+            return
+        self._refs.pop(digest, None)
+        try:
+            ref_dir.rmdir()
+        except OSError:
+            pass
+
+    def release_owner(self, owner: str) -> int:
+        _check_owner(owner)
+        with self._lock:
+            digests = [ref_dir.name for ref_dir in self.refs_dir.iterdir() if (ref_dir / owner).exists()]
+            for digest in digests:
+                self._remove_ref_locked(digest, owner)
+            self._evict_locked()
+        return len(digests)
+
+    def refs(self, digest: str) -> set[str]:
+        """Owners referencing a blob."""
+        return self._disk_owners(_check_digest(digest))
+
+    def _evict_locked(self) -> None:
+        if self.total_bytes <= self.quota_bytes:
+            return
+        for digest in list(self._lru):
+            if self.total_bytes <= self.quota_bytes:
+                break
+            if digest in self._refs:
+                continue
+            owners = self._disk_owners(digest)  # Referenced by another process since we looked
+            if owners:
+                self._refs[digest] = owners
+                continue
+            size = self._lru.pop(digest)
+            self.path(digest).unlink(missing_ok=True)
+            self.total_bytes -= size
+            self.evictions += 1
+        if self.total_bytes > self.quota_bytes:
+            logger.warning(
+                "blob store over quota with referenced blobs only total_mb=%.1f quota_mb=%.1f",
+                self.total_bytes / 2**20, self.quota_bytes / 2**20,
+            )
+
+
+_blob_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """Get or create the process-wide blob store for the configured backend."""
+    global _blob_store
+    if _blob_store is None:
+        if settings.blob_store_backend != "local":
+            raise ValueError(f"Unsupported BLOB_STORE_BACKEND: {settings.blob_store_backend}")
+        _blob_store = LocalBlobStore(settings.blob_store_dir, settings.blob_store_quota_mb * 2**20)
+    return _blob_store
@@ -0,0 +1,168 @@
+"""Bulk writes for PostgreSQL: COPY inserts and batched keyed updates.
+
+These bypass the ORM unit of work and talk to the psycopg2 cursor of a
+SQLAlchemy connection directly, so they join the caller's transaction.
+Column types for casts come from the SQLAlchemy `Table`; client-side ORM
+defaults do not apply, so callers supply every value the server default
+does not cover.
+"""
+import io
+import math
+import uuid
+from datetime import date, datetime
+from typing import Any, Iterable, Optional, Sequence
+
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Connection
+
+# Above this many rows, updates go through a temp table loaded with COPY
+# instead of one `UPDATE ... FROM (VALUES ...)` statement per page.
+MERGE_THRESHOLD = 5000
+VALUES_PAGE_SIZE = 1000
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_value(value: Any) -> str:
+    """Render one value in COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "NaN"
+        return repr(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def _copy_buffer(rows: Iterable[Sequence[Any]]) -> tuple[io.StringIO, int]:
+    buffer = io.StringIO()
+    count = 0
+    for row in rows:
+        buffer.write("\t".join(_copy_value(value) for value in row))
+        buffer.write("\n")
+        count += 1
+    buffer.seek(0)
+    return buffer, count
+
+
+def _sql_type(table: Table, column: str) -> str:
+    return table.c[column].type.compile(dialect=postgresql.dialect())
+
+
+def copy_rows(connection: Connection, table: Table, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> int:
+    """
+    Insert rows with `COPY ... FROM STDIN`.
+
+    Args:
+        connection: SQLAlchemy connection; the COPY runs in its current transaction.
+        table: Target table.
+        columns: Column names, in the order values appear in each row.
+        rows: Value tuples.
+
+    Returns:
+        Number of rows copied.
+    """
+    buffer, count = _copy_buffer(rows)
+    if count == 0:
+        return 0
+    from psycopg2 import sql
+
+    statement = sql.SQL("COPY {} ({}) FROM STDIN").format(
+        sql.Identifier(table.name), sql.SQL(", ").join(map(sql.Identifier, columns))
+    )
+    with connection.connection.cursor() as cursor:
+        cursor.copy_expert(statement.as_string(cursor), buffer)
+    return count
+
+
+def update_rows(
+    connection: Connection,
+    table: Table,
+    key_columns: Sequence[str],
+    columns: Sequence[str],
+    rows: Sequence[Sequence[Any]],
+    where: Optional[dict[str, Any]] = None,
+    ranges: Optional[dict[str, tuple[Any, Any]]] = None,
+) -> int:
+    """
+    Update many rows by key in a few statements.
+
+    Small batches use `UPDATE ... FROM (VALUES ...)`; batches of at least
+    `MERGE_THRESHOLD` rows are copied into a temp table and merged with one
+    `UPDATE ... FROM`.
+
+    Args:
+        connection: SQLAlchemy connection; runs in its current transaction.
+        table: Target table.
+        key_columns: Columns identifying a row (each row's leading values).
+        columns: Columns to set (each row's remaining values).
+        rows: Tuples of key values followed by new values.
+        where: Column values every updated row has, added to the statement
+            as constants (e.g. a partition key, so only its partition is scanned).
+        ranges: Half-open [low, high) bounds every updated row's column falls
+            in, added as constants (e.g. the month of a range partition key).
+
+    Returns:
+        Number of table rows updated.
+    """
+    if not rows:
+        return 0
+    from psycopg2 import sql
+    from psycopg2.extras import execute_values
+
+    names = [*key_columns, *columns]
+    assignments = sql.SQL(", ").join(
+        sql.SQL("{} = v.{}").format(sql.Identifier(column), sql.Identifier(column)) for column in columns
+    )
+    match = sql.SQL(" AND ").join(
+        [
+            *(sql.SQL("t.{} = v.{}").format(sql.Identifier(column), sql.Identifier(column)) for column in key_columns),
+            *(
+                sql.SQL("t.{} = {}").format(sql.Identifier(column), sql.Literal(str(value) if isinstance(value, uuid.UUID) else value))
+                for column, value in (where or {}).items()
+            ),
+            *(
+                sql.SQL("t.{} >= {} AND t.{} < {}").format(
+                    sql.Identifier(column), sql.Literal(low), sql.Identifier(column), sql.Literal(high)
+                )
+                for column, (low, high) in (ranges or {}).items()
+            ),
+        ]
+    )
+
+    with connection.connection.cursor() as cursor:
+        if len(rows) >= MERGE_THRESHOLD:
+            temp = sql.Identifier(f"_bulk_{table.name}_{uuid.uuid4().hex[:8]}")
+            cursor.execute(
+                sql.SQL("CREATE TEMP TABLE {} ON COMMIT DROP AS SELECT {} FROM {} WITH NO DATA").format(
+                    temp, sql.SQL(", ").join(map(sql.Identifier, names)), sql.Identifier(table.name)
+                )
+            )
+            buffer, _ = _copy_buffer(rows)
+            cursor.copy_expert(sql.SQL("COPY {} FROM STDIN").format(temp).as_string(cursor), buffer)
+            cursor.execute(
+                sql.SQL("UPDATE {} AS t SET {} FROM {} AS v WHERE {}").format(
+                    sql.Identifier(table.name), assignments, temp, match
+                )
+            )
+            updated = cursor.rowcount
+            cursor.execute(sql.SQL("DROP TABLE {}").format(temp))
+            return updated
+
+        template = "(" + ", ".join(f"%s::{_sql_type(table, column)}" for column in names) + ")"
+        statement = sql.SQL("UPDATE {} AS t SET {} FROM (VALUES %s) AS v ({}) WHERE {}").format(
+            sql.Identifier(table.name), assignments, sql.SQL(", ").join(map(sql.Identifier, names)), match
+        )
+        updated = 0
+        for start in range(0, len(rows), VALUES_PAGE_SIZE):
+            page = [[str(v) if isinstance(v, uuid.UUID) else v for v in row] for row in rows[start : start + VALUES_PAGE_SIZE]]
+            execute_values(cursor, statement.as_string(cursor), page, template=template, page_size=len(page))
+            updated += cursor.rowcount
+        return updated
@@ -1,15 +1,151 @@
-"""Database connection and session management."""
-from sqlalchemy import create_engine
+"""Database connection and session management.
+
+The engine (and its DBAPI driver) is created on first use rather than at
+import time, so importing the app stays cheap. The FastAPI lifespan hook in
+`app.main` creates it at startup and can optionally pre-warm the pool.
+
+When DATABASE_REPLICA_URL is set (one or more comma-separated URLs),
+sessions are `RoutingSession`s: plain SELECTs go to a replica (one per
+session, chosen round-robin) and everything else goes to the primary. Once
+a session writes, or `use_primary()` is called on it, it stays on the
+primary for the rest of its life, so a request reads its own writes after
+committing. Core access through `get_engine()` always uses the primary.
+"""
+import itertools
+import threading
+from typing import Optional
+
+from sqlalchemy import Select, create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
+from app.core.metrics import registry
+
+ROUTED = registry.counter("db_routed_statements_total", "Session statements by target database", ("target",))
+
+_PRIMARY = "use_primary"  # Session.info key: the session is pinned to the primary
+_REPLICA = "replica"  # Session.info key: index of the session's replica
+
+
+class RoutingSession(Session):
+    """Session that sends plain reads to a replica and writes (and every read after a write) to the primary."""
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        replicas = get_replica_engines()
+        if not replicas or self.info.get(_PRIMARY):
+            ROUTED.inc(target="primary")
+            return super().get_bind(mapper, clause=clause, **kw)
+        if self._flushing or not _is_plain_select(clause):
+            # A write (or a statement we can't classify): pin the session, so
+            # reads after it, including after commit, see what it wrote
+            self.info[_PRIMARY] = True
+            ROUTED.inc(target="primary")
+            return super().get_bind(mapper, clause=clause, **kw)
+        if _REPLICA not in self.info:
+            self.info[_REPLICA] = next(_replica_cycle) % len(replicas)
+        ROUTED.inc(target="replica")
+        return replicas[self.info[_REPLICA]]
+
+
+def _is_plain_select(clause) -> bool:
+    """SELECT without FOR UPDATE/SHARE (lazy loads and refreshes are plain selects too)."""
+    return isinstance(clause, Select) and clause._for_update_arg is None
+
+
+def use_primary(session: Session) -> None:
+    """
+    Send the rest of a session's statements to the primary.
+
+    For reads that must see writes made outside the session (e.g. by an
+    earlier request) or that guard a write (check-then-delete). No-op
+    without replicas.
+    """
+    session.info[_PRIMARY] = True
+
+
+def reads_from_replica(session: Session) -> bool:
+    """Whether the session's next plain SELECT would go to a replica."""
+    return bool(get_replica_engines()) and not session.info.get(_PRIMARY)
+
 
-engine = create_engine(settings.database_url)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+class _LazySessionmaker(sessionmaker):
+    """Session factory that creates the engine the first time a session is made."""
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None and local_kw.get("bind") is None:
+            get_engine()
+        return super().__call__(**local_kw)
+
+
+SessionLocal = _LazySessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
 
 Base = declarative_base()
 
+# Global engines (initialized on first use)
+_engine: Optional[Engine] = None
+_replica_engines: Optional[list[Engine]] = None
+_replica_lock = threading.Lock()
+_replica_cycle = itertools.count()
+
+
+def get_engine() -> Engine:
+    """Get or create the global database engine."""
+    global _engine
+    if _engine is None:
+        _engine = create_engine(settings.database_url)
+        SessionLocal.configure(bind=_engine)
+    return _engine
+
+
+def get_replica_engines() -> list[Engine]:
+    """Get or create the read replica engines (empty without DATABASE_REPLICA_URL)."""
+    global _replica_engines
+    if _replica_engines is None:
+        with _replica_lock:
+            if _replica_engines is None:
+                urls = [url.strip() for url in (settings.database_replica_url or "").split(",") if url.strip()]
+                _replica_engines = [create_engine(url, pool_pre_ping=True) for url in urls]
+    return _replica_engines
+
+
+def warm_pool(connections: int) -> int:
+    """
+    Open pool connections ahead of the first request, on the primary and each replica.
+
+    Args:
+        connections: Number of connections to establish per engine (capped by pool size).
+
+    Returns:
+        Number of connections actually opened.
+    """
+    opened = 0
+    for engine in [get_engine(), *get_replica_engines()]:
+        size = getattr(engine.pool, "size", lambda: connections)()
+        connections_opened = []
+        try:
+            for _ in range(min(connections, size)):
+                connections_opened.append(engine.connect())
+        finally:
+            for connection in connections_opened:
+                connection.close()
+        opened += len(connections_opened)
+    return opened
+
+
+def dispose_engine() -> None:
+    """Close all pooled connections (called on application shutdown)."""
+    global _engine, _replica_engines
+    if _engine is not None:
+        _engine.dispose()
+        _engine = None
+        SessionLocal.configure(bind=None)
+    with _replica_lock:
+        for engine in _replica_engines or ():
+            engine.dispose()
+        _replica_engines = None
+
 
 def get_db():
     """Database session dependency for FastAPI."""
@@ -18,5 +154,3 @@ def get_db():
         yield db
     finally:
         db.close()
-
-
@@ -2,7 +2,7 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
-from app.core.database import SessionLocal, get_db
+from app.core.database import SessionLocal, get_db, reads_from_replica, use_primary
 from app.core.jwt import get_user_id_from_token, JWTError
 from app.models import User
 from sqlalchemy.orm import Session
@@ -39,6 +39,10 @@ async def get_current_user(
         ) from e
 
     user = db.query(User).filter(User.id == user_id).first()
+    if user is None and reads_from_replica(db):
+        # A user who just signed up may not have reached the replica yet
+        use_primary(db)
+        user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -46,5 +50,10 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # End the read transaction so the pooled connection isn't held while the
+    # route awaits upstream calls; the detached user keeps its loaded fields.
+    db.expunge(user)
+    db.rollback()
+
     return user
 
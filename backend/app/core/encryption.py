@@ -3,9 +3,6 @@ import base64
 import secrets
 from typing import Optional
 
-from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-from cryptography.exceptions import InvalidTag
-
 from app.core.config import settings
 
 
@@ -37,6 +34,9 @@ class TokenEncryption:
         except Exception as e:
             raise ValueError(f"Invalid TOKEN_ENCRYPTION_KEY format: {e}") from e
 
+        # Imported lazily so importing this module doesn't load cryptography
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
         self._aesgcm = AESGCM(key_bytes)
         self._nonce_length = 12  # 12 bytes for GCM
 
@@ -80,6 +80,8 @@ class TokenEncryption:
         Raises:
             EncryptionError: If decryption fails or token is invalid.
         """
+        from cryptography.exceptions import InvalidTag
+
         try:
             # Decode base64
             encrypted_bytes = base64.b64decode(encrypted_token)
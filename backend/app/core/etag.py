@@ -0,0 +1,77 @@
+"""Strong ETags and If-None-Match handling for JSON read endpoints.
+
+ETags are a digest of the exact response body, so equal bodies always get
+equal tags. When `CompressionMiddleware` encodes a body it appends the
+content coding to the tag (`"<digest>-br"`), keeping the validator strong
+per representation; matching strips that suffix again.
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response, status
+from pydantic import BaseModel
+
+ENCODING_SUFFIXES = ("-br", "-gzip")
+CACHE_CONTROL = "private, no-cache"
+
+
+def compute_etag(body: bytes) -> str:
+    """Return a strong ETag (quoted) for a response body."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """Return the ETag for the `encoding`-coded representation of a body."""
+    if etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _opaque_tag(etag: str) -> str:
+    """Strip weakness and content-coding suffixes for weak comparison."""
+    tag = etag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[: -len(suffix)]
+    return tag
+
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    """
+    Evaluate an If-None-Match header against the current ETag.
+
+    Uses weak comparison, as RFC 9110 requires for If-None-Match.
+
+    Returns:
+        True if the client's copy is current (respond 304).
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    current = _opaque_tag(etag)
+    return any(_opaque_tag(candidate) == current for candidate in header.split(","))
+
+
+def etag_response(request: Request, body: bytes, etag: Optional[str] = None) -> Response:
+    """
+    Build a JSON response with an ETag, or a 304 if the client's copy is current.
+
+    Args:
+        request: Incoming request (for If-None-Match).
+        body: Serialized JSON body.
+        etag: Precomputed ETag for `body` (computed if omitted).
+    """
+    etag = etag or compute_etag(body)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if if_none_match(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def model_etag_response(request: Request, model: BaseModel) -> Response:
+    """`etag_response` for a response model, serialized with its camelCase aliases."""
+    return etag_response(request, model.model_dump_json(by_alias=True).encode())
@@ -0,0 +1,85 @@
+"""Retries of outbound HTTP calls on transient errors.
+
+One policy for every upstream (Google Photos, the enhancement and restyle
+providers): connection errors, timeouts, bodies cut mid-stream and
+RETRYABLE_STATUS_CODES are transient; anything else (4xx, programming
+errors, bad responses) fails at once. Waits grow exponentially up to a cap.
+
+`requests` is imported on first use, so importing this module stays cheap.
+"""
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def is_retryable(error: Optional[BaseException]) -> bool:
+    """
+    Whether a failed call is worth retrying.
+
+    An error raised `from` a transport error (e.g. an app error wrapping a
+    `requests` connection error) is judged by that cause.
+    """
+    import requests
+    import urllib3
+
+    transient = (
+        requests.exceptions.ConnectionError,
+        requests.exceptions.Timeout,
+        requests.exceptions.ChunkedEncodingError,
+        urllib3.exceptions.ProtocolError,  # Raw body reads (stream=True) fail with urllib3 errors
+        urllib3.exceptions.ReadTimeoutError,
+    )
+    while error is not None:
+        if isinstance(error, requests.exceptions.HTTPError):
+            return error.response is not None and error.response.status_code in RETRYABLE_STATUS_CODES
+        if isinstance(error, transient):
+            return True
+        error = error.__cause__
+    return False
+
+
+def backoff_seconds(attempt: int, base: float = 0.5, cap: float = 8.0) -> float:
+    """Wait before retry number `attempt` (0 for the first retry)."""
+    return min(base * 2**attempt, cap)
+
+
+def post_with_retries(
+    url: str, max_retries: int, backoff: float = 0.5, max_backoff: float = 8.0, **kwargs
+) -> requests.Response:
+    """
+    POST, retrying transient failures up to `max_retries` times.
+
+    Args:
+        url: Target URL.
+        max_retries: Retries after the first attempt (0 for a single attempt).
+        backoff: Wait before the first retry, doubled for each further one.
+        max_backoff: Longest wait between attempts.
+        **kwargs: Passed to `requests.post` (headers, data, json, timeout, ...).
+
+    Returns:
+        The successful response.
+
+    Raises:
+        requests.exceptions.RequestException: The last error, or the HTTPError
+            of a non-retryable status (or of a retryable one on the last attempt).
+    """
+    import requests
+
+    attempt = 0
+    while True:
+        try:
+            response = requests.post(url, **kwargs)
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= max_retries:
+                response.raise_for_status()
+                return response
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if attempt >= max_retries:
+                raise
+        time.sleep(backoff_seconds(attempt, backoff, max_backoff))
+        attempt += 1
@@ -3,8 +3,6 @@ from datetime import datetime, timedelta, timezone
 from typing import Optional
 from uuid import UUID
 
-from jose import JWTError as JoseJWTError, jwt
-
 from app.core.config import settings
 
 # JWT settings
@@ -35,6 +33,9 @@ def create_access_token(user_id: UUID, email: str) -> str:
     if not settings.jwt_secret:
         raise JWTError("JWT_SECRET must be set in environment variables")
 
+    # Imported lazily: python-jose pulls in its crypto backends at import time
+    from jose import jwt
+
     expire = datetime.now(timezone.utc) + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
 
     to_encode = {
@@ -64,6 +65,8 @@ def decode_access_token(token: str) -> dict:
     if not settings.jwt_secret:
         raise JWTError("JWT_SECRET must be set in environment variables")
 
+    from jose import JWTError as JoseJWTError, jwt
+
     try:
         payload = jwt.decode(token, settings.jwt_secret, algorithms=[ALGORITHM])
         return payload
@@ -0,0 +1,212 @@
+"""Event-loop lag monitoring and blocking-call detection.
+
+Async routes that call blocking code (`requests`, SQLAlchemy, OAuth
+refreshes) stall every other request on the worker for as long as the call
+takes. Two tools measure this under real traffic:
+
+- Lag (always on unless LOOP_LAG_INTERVAL_MS is 0): a task sleeps for the
+  interval and records how late it wakes up, which is how long ready
+  callbacks waited for the loop. Exported as the `event_loop_lag_seconds`
+  histogram and the `event_loop_lag_recent_max_seconds` gauge (worst lag
+  of the last LAG_WINDOW samples); admission control reads the mean.
+- Blocking-call diagnostics (LOOP_BLOCK_DIAGNOSTICS=true): a watchdog
+  thread notices when the lag task has not run for LOOP_BLOCK_THRESHOLD_MS
+  past its interval, and captures the loop thread's stack while it is
+  still stuck, together with the route of the request whose task is
+  running (`RequestTaskMiddleware` records each request's task). One
+  `BlockReport` per episode is completed with the delay it caused once the
+  loop runs again, logged with the stack, counted in
+  `event_loop_blocked_total{route}` and kept for `GET /api/debug/blocking`.
+
+Stacks are read with `sys._current_frames()`, which costs nothing until a
+block is detected, so diagnostics can stay on in production.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+LAG_WINDOW = 50  # Samples behind the recent-max gauge (5 s at the default interval)
+
+LAG = registry.histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a timer due now",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LAG_RECENT_MAX = registry.gauge("event_loop_lag_recent_max_seconds", "Worst event loop lag of the recent samples")
+BLOCKED = registry.counter(
+    "event_loop_blocked_total", "Times the event loop was blocked past the threshold, by route", ("route",)
+)
+
+# Request task -> ASGI scope of the request it serves
+_request_scopes: "weakref.WeakKeyDictionary[asyncio.Task, Scope]" = weakref.WeakKeyDictionary()
+
+
+def route_name(scope: Scope) -> str:
+    """'METHOD /path/{template}' of a request (the raw path until routing has run)."""
+    route = scope.get("route")
+    return f"{scope.get('method', '')} {getattr(route, 'path', None) or scope.get('path', '')}".strip()
+
+
+class RequestTaskMiddleware:
+    """ASGI middleware recording which task serves each HTTP request (for blocking-call reports)."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        task = asyncio.current_task() if scope["type"] == "http" else None
+        if task is not None:
+            _request_scopes[task] = scope
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if task is not None:
+                _request_scopes.pop(task, None)
+
+
+@dataclass
+class BlockReport:
+    """One episode of the event loop blocked past the threshold."""
+
+    route: str  # Route of the request whose task was running, or the task name
+    started_at: float  # Wall-clock time the loop last ran before the block
+    stack: list[str] = field(default_factory=list)  # Loop thread's stack when detected, innermost last
+    blocked_ms: float = 0.0  # Delay the block caused (final once the loop ran again); up to one interval short
+    finished: bool = False
+
+    def as_dict(self) -> dict:
+        return {
+            "route": self.route,
+            "started_at": self.started_at,
+            "blocked_ms": round(self.blocked_ms, 1),
+            "finished": self.finished,
+            "stack": self.stack,
+        }
+
+
+class LoopMonitor:
+    """
+    Measures event loop lag and, optionally, captures blocking calls.
+
+    Args:
+        interval: Seconds between lag samples (0 disables monitoring).
+        block_threshold: Seconds past the interval after which the loop counts as blocked.
+        diagnostics: Run the watchdog thread that captures blocking stacks.
+        max_reports: Block reports kept.
+    """
+
+    def __init__(self, interval: float, block_threshold: float, diagnostics: bool, max_reports: int = 100):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.diagnostics = diagnostics
+        self.reports: deque[BlockReport] = deque(maxlen=max_reports)
+        self._recent: deque[float] = deque(maxlen=LAG_WINDOW)
+        self._heartbeat = time.monotonic()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def recent_mean_lag(self) -> float:
+        """Mean lag (seconds) of the last LAG_WINDOW samples: sustained lag, not one-off blocks."""
+        return sum(self._recent) / len(self._recent) if self._recent else 0.0
+
+    @property
+    def recent_max_lag(self) -> float:
+        """Worst lag (seconds) of the last LAG_WINDOW samples, or the ongoing stall if longer."""
+        stalled = time.monotonic() - self._heartbeat - self.interval if self._task is not None else 0.0
+        return max(max(self._recent, default=0.0), stalled)
+
+    async def _sample(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._heartbeat = now
+            self._recent.append(lag)
+            LAG.observe(lag)
+            LAG_RECENT_MAX.set(max(self._recent))
+
+    def _running_route(self) -> str:
+        task = asyncio.current_task(self._loop) if self._loop is not None else None
+        if task is None:
+            return "(no task)"
+        scope = _request_scopes.get(task)
+        return route_name(scope) if scope is not None else f"(task {task.get_name()})"
+
+    def _watch(self) -> None:
+        report: Optional[BlockReport] = None
+        blocked_since = 0.0  # Heartbeat before the current block
+        check = max(0.005, self.block_threshold / 4)
+        while not self._stop.wait(check):
+            heartbeat = self._heartbeat
+            if report is None:
+                stalled = time.monotonic() - heartbeat - self.interval
+                if stalled <= self.block_threshold:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread)
+                report = BlockReport(
+                    route=self._running_route(),
+                    started_at=time.time() - stalled - self.interval,
+                    stack=traceback.format_stack(frame) if frame is not None else [],
+                )
+                blocked_since = heartbeat
+                self.reports.append(report)
+                BLOCKED.inc(route=report.route)
+            elif heartbeat != blocked_since:
+                # The loop ran again: the lag of the sample that ended the block is its duration
+                report.blocked_ms = max(0.0, heartbeat - blocked_since - self.interval) * 1000
+                report.finished = True
+                logger.warning(
+                    "event loop blocked route=%s ms=%.0f\n%s", report.route, report.blocked_ms, "".join(report.stack)
+                )
+                report = None
+            else:
+                report.blocked_ms = (time.monotonic() - blocked_since - self.interval) * 1000
+
+    def start(self) -> None:
+        """Start sampling on the running loop, and the watchdog if diagnostics are on (application startup)."""
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.create_task(self._sample(), name="loop-lag-monitor")
+        if self.diagnostics:
+            self._stop.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._watchdog is not None:
+            self._stop.set()
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+
+loop_monitor = LoopMonitor(
+    interval=settings.loop_lag_interval_ms / 1000,
+    block_threshold=settings.loop_block_threshold_ms / 1000,
+    diagnostics=settings.loop_block_diagnostics,
+)
@@ -1,13 +1,20 @@
-"""Google OAuth utilities."""
-import secrets
-from typing import Optional
+"""Google OAuth utilities.
+
+Google client libraries are imported inside the functions that need them:
+they account for a large share of import time and most requests never touch
+them, which keeps cold starts fast.
+"""
+from __future__ import annotations
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import Flow
+import secrets
+from typing import TYPE_CHECKING, Optional
 
 from app.core.config import settings
 
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import Flow
+
 
 # Google Photos API scopes
 # Picker API requires photospicker.mediaitems.readonly scope
@@ -41,12 +48,14 @@ def create_oauth_flow() -> Flow:
     if not settings.google_client_id or not settings.google_client_secret:
         raise OAuthError("Google OAuth credentials not configured")
 
+    from google_auth_oauthlib.flow import Flow
+
     client_config = {
         "web": {
             "client_id": settings.google_client_id,
             "client_secret": settings.google_client_secret,
             "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-            "token_uri": "https://oauth2.googleapis.com/token",
+            "token_uri": settings.google_token_uri,
             "redirect_uris": [settings.google_redirect_uri],
         }
     }
@@ -104,8 +113,11 @@ def exchange_code_for_tokens(code: str) -> tuple[Credentials, dict]:
         # Manually exchange code to avoid scope validation issues
         # Google may return additional scopes (e.g., readonly/appendonly when requesting photoslibrary)
         import requests
+        from google.auth.transport.requests import Request
+        from google.oauth2.credentials import Credentials
+
         token_response = requests.post(
-            "https://oauth2.googleapis.com/token",
+            settings.google_token_uri,
             data={
                 "code": code,
                 "client_id": settings.google_client_id,
@@ -123,13 +135,12 @@ def exchange_code_for_tokens(code: str) -> tuple[Credentials, dict]:
         
         token_data = token_response.json()
         
-        from google.oauth2.credentials import Credentials
         granted_scopes = token_data.get("scope", "").split() if token_data.get("scope") else None
         credentials = Credentials(
             token=token_data.get("access_token"),
             refresh_token=token_data.get("refresh_token"),
             id_token=token_data.get("id_token"),
-            token_uri="https://oauth2.googleapis.com/token",
+            token_uri=settings.google_token_uri,
             client_id=settings.google_client_id,
             client_secret=settings.google_client_secret,
             scopes=granted_scopes,
@@ -184,11 +195,14 @@ def refresh_access_token(refresh_token: str) -> Credentials:
     Raises:
         OAuthError: If token refresh fails.
     """
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+
     try:
         credentials = Credentials(
             token=None,
             refresh_token=refresh_token,
-            token_uri="https://oauth2.googleapis.com/token",
+            token_uri=settings.google_token_uri,
             client_id=settings.google_client_id,
             client_secret=settings.google_client_secret,
         )
@@ -0,0 +1,431 @@
+"""Helpers for Alembic migrations that must not stall traffic on large tables.
+
+Used from migration scripts (`photos` and future large tables):
+
+- `create_index_concurrently` / `drop_index_concurrently`: index changes
+  outside the migration transaction, so writes continue during the build
+  (an invalid index left by an interrupted build is dropped and rebuilt);
+- `backfill`: UPDATEs in primary-key-ordered batches, each committed on its
+  own, with a pause between batches and progress logging.
+
+`alembic/env.py` sets `lock_timeout` for every migration connection, so
+DDL waiting behind a long transaction fails fast instead of queueing every
+request behind it, runs each revision in its own transaction, and retries a
+revision that hit the timeout. With `-x dry_run=true` nothing is executed:
+the pending SQL is generated and `estimate_lock_impact` reports, per
+statement, the lock taken, what it blocks, the table's size and the
+transactions it would currently wait for.
+
+Options (`-x name=value`, defaults from settings): lock_timeout_ms,
+lock_retries, dry_run.
+
+An autocommit block commits whatever its revision ran before it, so a
+retried revision would run those steps again: put concurrent index builds
+and backfills in revisions of their own.
+"""
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LOCK_NOT_AVAILABLE = "55P03"  # SQLSTATE raised when lock_timeout expires
+SCAN_BYTES_PER_SECOND = 200 * 2**20  # Rough sequential scan speed for estimates
+WRITE_BYTES_PER_SECOND = 50 * 2**20  # Rough rewrite / index build speed for estimates
+LONG_TRANSACTION_SECONDS = 1.0  # Transactions older than this count as "would wait for"
+PROGRESS_LOG_SECONDS = 5.0
+
+# What concurrent sessions cannot do while each table lock mode is held
+BLOCKS = {
+    "ACCESS EXCLUSIVE": "reads and writes",
+    "EXCLUSIVE": "writes",
+    "SHARE ROW EXCLUSIVE": "writes",
+    "SHARE": "writes",
+    "SHARE UPDATE EXCLUSIVE": "schema changes only",
+    "ROW EXCLUSIVE": "nothing (row locks only)",
+}
+
+
+@dataclass
+class MigrationOptions:
+    """Options for one Alembic run."""
+
+    lock_timeout_ms: int
+    lock_retries: int
+    dry_run: bool
+
+
+def migration_options(x_arguments: dict) -> MigrationOptions:
+    """Options from `-x name=value` arguments, defaulting to settings."""
+    return MigrationOptions(
+        lock_timeout_ms=int(x_arguments.get("lock_timeout_ms", settings.migration_lock_timeout_ms)),
+        lock_retries=int(x_arguments.get("lock_retries", settings.migration_lock_retries)),
+        dry_run=x_arguments.get("dry_run", "false").lower() in ("1", "true", "yes"),
+    )
+
+
+def set_lock_timeout(connection: Connection, milliseconds: int) -> None:
+    """Session-level lock_timeout (0 = wait forever); survives commits and autocommit blocks."""
+    connection.exec_driver_sql(f"SET lock_timeout = {int(milliseconds)}")
+
+
+def is_lock_timeout(error: BaseException) -> bool:
+    return getattr(getattr(error, "orig", None), "pgcode", None) == LOCK_NOT_AVAILABLE
+
+
+def run_with_lock_retries(run, retries: int, backoff_seconds: float = 2.0) -> None:
+    """
+    Call `run()` (e.g. `context.run_migrations`), again after a lock timeout.
+
+    With one transaction per revision, the revision that timed out is rolled
+    back, revisions before it stay applied, and the next call continues
+    from the database's current revision.
+    """
+    for attempt in range(retries + 1):
+        try:
+            run()
+            return
+        except sa.exc.DBAPIError as e:
+            if not is_lock_timeout(e) or attempt == retries:
+                raise
+            logger.warning("migration hit lock_timeout, retrying attempt=%d error=%s", attempt + 1, e.orig)
+            time.sleep(backoff_seconds * 2**attempt)
+
+
+def _context():
+    from alembic import op
+
+    return op.get_context()
+
+
+def _invalid_index_exists(connection: Connection, index_name: str) -> bool:
+    return connection.execute(
+        sa.text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": index_name},
+    ).first() is not None
+
+
+def create_index_concurrently(index_name: str, table: str, columns: Sequence[str], unique: bool = False, **kw) -> None:
+    """
+    CREATE INDEX CONCURRENTLY, outside the migration transaction.
+
+    Takes SHARE UPDATE EXCLUSIVE, which lets reads and writes continue, so
+    lock_timeout is lifted for the build (it waits for running transactions
+    instead of failing). An invalid index of the same name, left by an
+    interrupted build, is dropped first.
+    """
+    from alembic import op
+
+    context = _context()
+    with context.autocommit_block():
+        if not context.as_sql:
+            connection = context.connection
+            if _invalid_index_exists(connection, index_name):
+                logger.warning("dropping invalid index from an interrupted build index=%s", index_name)
+                op.drop_index(index_name, table_name=table, postgresql_concurrently=True, if_exists=True)
+            previous = connection.exec_driver_sql("SHOW lock_timeout").scalar()
+            connection.exec_driver_sql("SET lock_timeout = 0")
+        try:
+            op.create_index(
+                index_name, table, list(columns), unique=unique, postgresql_concurrently=True, if_not_exists=True, **kw
+            )
+        finally:
+            if not context.as_sql:
+                connection.exec_driver_sql(f"SET lock_timeout = '{previous}'")
+
+
+def drop_index_concurrently(index_name: str, table: str) -> None:
+    """DROP INDEX CONCURRENTLY, outside the migration transaction."""
+    from alembic import op
+
+    with _context().autocommit_block():
+        op.drop_index(index_name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def _estimated_rows(connection: Connection, table: str) -> Optional[int]:
+    rows = connection.execute(
+        sa.text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+    ).scalar()
+    return rows if rows is not None and rows >= 0 else None
+
+
+def backfill(
+    table: str,
+    set_sql: str,
+    where_sql: str = "true",
+    key: str = "id",
+    batch_rows: Optional[int] = None,
+    pause_seconds: Optional[float] = None,
+) -> int:
+    """
+    UPDATE matching rows in batches ordered by `key`, committing each batch.
+
+    Row locks are held for one batch at a time, and the pause between
+    batches leaves room for replication and request traffic. Progress is
+    logged every few seconds against the planner's row estimate.
+
+    Args:
+        table: Table to update.
+        set_sql: SET clause, e.g. "is_hero = false".
+        where_sql: Rows to update, e.g. "is_hero IS NULL".
+        key: Unique, indexed column to walk in order (the primary key).
+        batch_rows: Rows per batch (MIGRATION_BACKFILL_BATCH_ROWS).
+        pause_seconds: Sleep between batches (MIGRATION_BACKFILL_PAUSE_MS).
+
+    Returns:
+        Rows updated (0 in dry-run / offline mode, where one batch is emitted as SQL).
+    """
+    from alembic import op
+
+    batch_rows = batch_rows or settings.migration_backfill_batch_rows
+    pause_seconds = settings.migration_backfill_pause_ms / 1000 if pause_seconds is None else pause_seconds
+    select = f"SELECT {key} FROM {table} WHERE ({where_sql}) {{after}} ORDER BY {key} LIMIT {int(batch_rows)}"
+    update = (
+        f"/* backfill batch */ WITH batch AS ({select}) UPDATE {table} SET {set_sql} "
+        f"FROM batch WHERE {table}.{key} = batch.{key} RETURNING {table}.{key}"
+    )
+    context = _context()
+    if context.as_sql:
+        op.execute(update.replace("{after}", ""))
+        return 0
+
+    connection = context.connection
+    total = _estimated_rows(connection, table)
+    done = 0
+    last_key = None
+    started = last_log = time.monotonic()
+    with context.autocommit_block():
+        while True:
+            if last_key is None:
+                keys = connection.execute(sa.text(update.replace("{after}", ""))).scalars().all()
+            else:
+                keys = connection.execute(
+                    sa.text(update.replace("{after}", f"AND {key} > :after")), {"after": last_key}
+                ).scalars().all()
+            if not keys:
+                break
+            done += len(keys)
+            last_key = max(keys)
+            now = time.monotonic()
+            if now - last_log >= PROGRESS_LOG_SECONDS:
+                rate = done / (now - started)
+                share = f" ({done / total:.0%} of ~{total})" if total else ""
+                logger.info("backfill %s rows=%d%s rate=%.0f/s", table, done, share, rate)
+                last_log = now
+            if len(keys) < batch_rows:
+                break
+            time.sleep(pause_seconds)
+    logger.info("backfill %s done rows=%d seconds=%.1f", table, done, time.monotonic() - started)
+    return done
+
+
+@dataclass
+class LockImpact:
+    """Estimated locking of one migration statement."""
+
+    statement: str
+    table: Optional[str]
+    lock: Optional[str]  # Table lock mode, None for statements that lock nothing existing
+    work: str  # "catalog", "scan", "rewrite", "build", "rows", "batched rows" or "none"
+    rows: Optional[int] = None  # Planner estimate for the table
+    size_bytes: Optional[int] = None
+    seconds: Optional[float] = None  # Estimated time holding the lock
+    waits_for: list[str] = field(default_factory=list)  # Long transactions holding locks on the table now
+    risk: str = "low"
+
+    @property
+    def blocks(self) -> str:
+        return BLOCKS.get(self.lock, "nothing") if self.lock else "nothing"
+
+
+_NAME = r'((?:"[^"]+"|\w+)(?:\.(?:"[^"]+"|\w+))?)'
+
+
+def _table(pattern: str, sql: str) -> Optional[str]:
+    match = re.search(pattern + _NAME, sql, re.IGNORECASE)
+    return match.group(1).replace('"', "") if match else None
+
+
+def _classify_alter(sql: str) -> tuple[str, str]:
+    """(lock mode, work) of the heaviest action in an ALTER TABLE."""
+    upper = sql.upper()
+    not_valid = "NOT VALID" in upper
+    if re.search(r"\bDETACH PARTITION\b.*\bCONCURRENTLY\b", upper):
+        return "SHARE UPDATE EXCLUSIVE", "catalog"
+    if "ATTACH PARTITION" in upper:
+        return "SHARE UPDATE EXCLUSIVE", "scan"  # Scans the partition unless a matching CHECK exists
+    if "VALIDATE CONSTRAINT" in upper:
+        return "SHARE UPDATE EXCLUSIVE", "scan"
+    if re.search(r"\bALTER COLUMN\b.*\bTYPE\b", upper) or re.search(r"\bSET DATA TYPE\b", upper):
+        return "ACCESS EXCLUSIVE", "rewrite"
+    if re.search(r"\bADD (COLUMN )?.*\bDEFAULT\b.*\b(GEN_RANDOM_UUID|RANDOM|CLOCK_TIMESTAMP|UUID_GENERATE_V4)\b", upper):
+        return "ACCESS EXCLUSIVE", "rewrite"  # Volatile default: every row is written
+    if "SET NOT NULL" in upper:
+        return "ACCESS EXCLUSIVE", "scan"
+    if "FOREIGN KEY" in upper:
+        return "SHARE ROW EXCLUSIVE", "catalog" if not_valid else "scan"
+    if re.search(r"\bADD (CONSTRAINT \S+ )?CHECK\b", upper):
+        return "ACCESS EXCLUSIVE", "catalog" if not_valid else "scan"
+    if re.search(r"\b(UNIQUE|PRIMARY KEY)\b", upper) and "USING INDEX" not in upper:
+        return "ACCESS EXCLUSIVE", "build"
+    if "DETACH PARTITION" in upper:
+        return "ACCESS EXCLUSIVE", "catalog"
+    return "ACCESS EXCLUSIVE", "catalog"
+
+
+def classify_statement(sql: str) -> Optional[LockImpact]:
+    """
+    Lock mode and work of one SQL statement, from its text.
+
+    Returns:
+        LockImpact without table statistics, or None for statements that
+        take no table locks (transaction control, SET, Alembic's version table).
+    """
+    text = " ".join(sql.split())
+    upper = text.upper()
+    short = text if len(text) <= 100 else text[:97] + "..."
+    if not text or re.match(r"(BEGIN|COMMIT|ROLLBACK|SET|SHOW|SELECT)\b", upper) or "ALEMBIC_VERSION" in upper:
+        return None
+    if re.match(r"CREATE (UNIQUE )?INDEX CONCURRENTLY", upper):
+        return LockImpact(short, _table(r"\bON\s+(?:ONLY\s+)?", text), "SHARE UPDATE EXCLUSIVE", "build")
+    if re.match(r"CREATE (UNIQUE )?INDEX", upper):
+        return LockImpact(short, _table(r"\bON\s+(?:ONLY\s+)?", text), "SHARE", "build")
+    if re.match(r"DROP INDEX CONCURRENTLY", upper):
+        return LockImpact(short, None, "SHARE UPDATE EXCLUSIVE", "catalog")
+    if re.match(r"DROP INDEX", upper):
+        return LockImpact(short, _table(r"DROP INDEX\s+(?:IF EXISTS\s+)?", text), "ACCESS EXCLUSIVE", "catalog")
+    if re.match(r"CREATE TABLE", upper):
+        # The new table is invisible to others; referenced tables get SHARE ROW EXCLUSIVE briefly
+        referenced = _table(r"\bREFERENCES\s+", text)
+        if referenced:
+            return LockImpact(short, referenced, "SHARE ROW EXCLUSIVE", "catalog")
+        return LockImpact(short, _table(r"CREATE TABLE\s+(?:IF NOT EXISTS\s+)?", text), None, "none")
+    if re.match(r"DROP TABLE", upper):
+        return LockImpact(short, _table(r"DROP TABLE\s+(?:IF EXISTS\s+)?", text), "ACCESS EXCLUSIVE", "catalog")
+    if re.match(r"ALTER TABLE", upper):
+        lock, work = _classify_alter(text)
+        return LockImpact(short, _table(r"ALTER TABLE\s+(?:IF EXISTS\s+)?(?:ONLY\s+)?", text), lock, work)
+    if "/* BACKFILL BATCH */" in upper:
+        return LockImpact(short, _table(r"\bUPDATE\s+", text), "ROW EXCLUSIVE", "batched rows")
+    if re.match(r"(WITH\b.*\b)?(UPDATE|DELETE FROM|INSERT INTO)\b", upper):
+        return LockImpact(short, _table(r"\b(?:UPDATE|DELETE FROM|INSERT INTO)\s+", text), "ROW EXCLUSIVE", "rows")
+    return LockImpact(short, None, "ACCESS EXCLUSIVE", "catalog")  # Unknown DDL: assume the worst lock
+
+
+def split_sql(script: str) -> list[str]:
+    """Split SQL generated by Alembic's offline mode into statements (dropping "--" comment lines)."""
+    lines = [line for line in script.splitlines() if not line.lstrip().startswith("--")]
+    return [statement.strip() for statement in re.split(r";\s*\n", "\n".join(lines) + "\n") if statement.strip()]
+
+
+def estimate_lock_impact(connection: Connection, statements: Sequence[str], lock_timeout_ms: int) -> list[LockImpact]:
+    """
+    Classify statements and add live table statistics and current blockers.
+
+    Args:
+        connection: Connection to the database the migration would run on.
+        statements: SQL statements (e.g. from `split_sql`).
+        lock_timeout_ms: lock_timeout of the run (`MigrationOptions.lock_timeout_ms`);
+            blocking statements expected to outlast it are high risk.
+
+    Returns:
+        One LockImpact per statement that locks an existing table.
+    """
+    impacts = []
+    for statement in statements:
+        impact = classify_statement(statement)
+        if impact is None:
+            continue
+        if impact.table:
+            index_table = connection.execute(
+                sa.text("SELECT indrelid::regclass::text FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+                {"name": impact.table},
+            ).scalar() if impact.statement.upper().startswith("DROP INDEX") else None
+            impact.table = index_table or impact.table
+            stats = connection.execute(
+                sa.text(
+                    "SELECT reltuples::bigint, pg_total_relation_size(oid) FROM pg_class "
+                    "WHERE oid = to_regclass(:table)"
+                ),
+                {"table": impact.table},
+            ).first()
+            if stats is not None:
+                impact.rows = max(stats[0], 0)
+                impact.size_bytes = stats[1]
+                impact.waits_for = [
+                    f"pid {row.pid} ({row.age:.0f}s): {row.query}"
+                    for row in connection.execute(
+                        sa.text(
+                            "SELECT DISTINCT a.pid, extract(epoch FROM now() - a.xact_start) AS age, "
+                            "left(a.query, 60) AS query FROM pg_locks l JOIN pg_stat_activity a ON a.pid = l.pid "
+                            "WHERE l.relation = to_regclass(:table) AND a.pid <> pg_backend_pid() "
+                            "AND a.xact_start < now() - make_interval(secs => :age)"
+                        ),
+                        {"table": impact.table, "age": LONG_TRANSACTION_SECONDS},
+                    )
+                ]
+        _estimate(impact, lock_timeout_ms)
+        impacts.append(impact)
+    return impacts
+
+
+def _estimate(impact: LockImpact, lock_timeout_ms: int) -> None:
+    size = impact.size_bytes or 0
+    if impact.work == "scan":
+        impact.seconds = size / SCAN_BYTES_PER_SECOND
+    elif impact.work in ("rewrite", "build"):
+        impact.seconds = size / WRITE_BYTES_PER_SECOND
+    elif impact.work == "catalog":
+        impact.seconds = 0.0
+
+    blocking = impact.lock in ("ACCESS EXCLUSIVE", "EXCLUSIVE", "SHARE ROW EXCLUSIVE", "SHARE")
+    timeout = lock_timeout_ms / 1000
+    if blocking and (impact.seconds or 0) > timeout:
+        impact.risk = "high"  # Requests stall for the whole operation
+    elif impact.work == "rows" and (impact.rows or 0) > settings.migration_backfill_batch_rows:
+        impact.risk = "high"  # One long transaction over a large table: use backfill()
+    elif blocking and (impact.waits_for or impact.lock == "ACCESS EXCLUSIVE"):
+        impact.risk = "medium"  # Brief, but queues behind running transactions (bounded by lock_timeout)
+    else:
+        impact.risk = "low"
+
+
+def _format_size(size: Optional[int]) -> str:
+    if size is None:
+        return "-"
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return "-"
+
+
+def format_report(impacts: Sequence[LockImpact], lock_timeout_ms: int) -> str:
+    """Human-readable dry-run report."""
+    if not impacts:
+        return "Dry run: no pending statements lock existing tables."
+    lines = [f"Dry run: estimated lock impact (lock_timeout {lock_timeout_ms} ms; nothing was executed)", ""]
+    for impact in impacts:
+        seconds = "-" if impact.seconds is None else f"~{impact.seconds:.1f}s"
+        rows = "-" if impact.rows is None else f"~{impact.rows}"
+        lines.append(f"[{impact.risk.upper():6}] {impact.statement}")
+        lines.append(
+            f"         table={impact.table or '-'} lock={impact.lock or 'none'} blocks={impact.blocks} "
+            f"work={impact.work} rows={rows} size={_format_size(impact.size_bytes)} held={seconds}"
+        )
+        for blocker in impact.waits_for:
+            lines.append(f"         would wait for {blocker}")
+    high = sum(impact.risk == "high" for impact in impacts)
+    lines.append("")
+    lines.append(f"{len(impacts)} statements, {high} high risk")
+    return "\n".join(lines)
@@ -0,0 +1,153 @@
+"""Monthly range partitions of the jobs and photos tables.
+
+`jobs` is partitioned by `created_at` and `photos` by `job_created_at` (a
+copy of its job's `created_at`), both by calendar month in UTC. A job and
+all its photos therefore live in partitions of the same month
+(`jobs_2026_10`, `photos_2026_10`), so:
+
+- retention drops a whole month (`drop_month`) instead of DELETEing rows,
+  which would leave dead tuples for vacuum and bloat the tables;
+- queries that bound `created_at` / `job_created_at` only scan the months
+  they can match (partition pruning).
+
+Rows outside every month land in the `_default` partitions, which
+`ensure_partitions` keeps empty by creating months ahead of time. Creating
+or dropping a partition briefly locks the parent table, so callers set a
+lock_timeout and retry later rather than queue traffic behind the DDL.
+"""
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> partition key column; referenced tables first
+PARTITIONED_TABLES = {"jobs": "created_at", "photos": "job_created_at"}
+
+_PARTITION_NAME = re.compile(r"^(?P<table>jobs|photos)_(?:(?P<year>\d{4})_(?P<month>\d{2})|default)$")
+
+
+@dataclass(frozen=True)
+class Partition:
+    """One month partition of a partitioned table."""
+
+    table: str
+    name: str
+    month: datetime  # First instant of the month, UTC
+
+
+def month_start(moment: datetime) -> datetime:
+    """First instant (UTC) of the month containing `moment`."""
+    moment = moment.astimezone(timezone.utc) if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    """The month `months` after (or before, if negative) the month starting at `month`."""
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+def is_partition_name(name: str) -> bool:
+    """Whether a table name is one of our partitions (for Alembic autogenerate to ignore)."""
+    return _PARTITION_NAME.match(name) is not None
+
+
+def list_partitions(connection: Connection, table: str) -> list[Partition]:
+    """Month partitions of `table`, oldest first (the default partition is not included)."""
+    names = connection.exec_driver_sql(
+        "SELECT child.relname FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = %(table)s::regclass",
+        {"table": table},
+    ).scalars()
+    partitions = []
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match and match["year"] and match["table"] == table:
+            month = datetime(int(match["year"]), int(match["month"]), 1, tzinfo=timezone.utc)
+            partitions.append(Partition(table=table, name=name, month=month))
+    return sorted(partitions, key=lambda partition: partition.month)
+
+
+def default_partition_ddl(table: str) -> str:
+    return f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"
+
+
+def month_partition_ddl(table: str, month: datetime) -> str:
+    month = month_start(month)
+    return (
+        f"CREATE TABLE {partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+def create_month(connection: Connection, month: datetime) -> list[str]:
+    """
+    Create the jobs and photos partitions of a month, if missing.
+
+    Raises if the default partition already holds rows of the month.
+
+    Returns:
+        Names of the partitions created.
+    """
+    month = month_start(month)
+    existing = {partition.name for table in PARTITIONED_TABLES for partition in list_partitions(connection, table)}
+    created = []
+    for table in PARTITIONED_TABLES:
+        name = partition_name(table, month)
+        if name in existing:
+            continue
+        connection.exec_driver_sql(month_partition_ddl(table, month))
+        created.append(name)
+    if created:
+        logger.info("partitions created month=%s tables=%s", f"{month:%Y-%m}", ",".join(created))
+    return created
+
+
+def ensure_partitions(connection: Connection, months_ahead: int, now: Optional[datetime] = None) -> list[str]:
+    """
+    Create the partitions of the current month and `months_ahead` months after it.
+
+    Returns:
+        Names of the partitions created.
+    """
+    current = month_start(now or datetime.now(timezone.utc))
+    created = []
+    for offset in range(months_ahead + 1):
+        created += create_month(connection, add_months(current, offset))
+    return created
+
+
+def drop_month(connection: Connection, month: datetime) -> list[str]:
+    """
+    Drop the jobs and photos partitions of a month with everything in them.
+
+    The photos partition goes first; the jobs partition is then detached
+    (PostgreSQL does not drop a partition of a referenced table directly,
+    and detaching checks no photos still reference it) and dropped.
+
+    Returns:
+        Names of the partitions dropped.
+    """
+    month = month_start(month)
+    present = {partition.name for table in PARTITIONED_TABLES for partition in list_partitions(connection, table)}
+    dropped = []
+    for table in reversed(list(PARTITIONED_TABLES)):
+        name = partition_name(table, month)
+        if name not in present:
+            continue
+        if table == "jobs":
+            connection.exec_driver_sql(f"ALTER TABLE {table} DETACH PARTITION {name}")
+        connection.exec_driver_sql(f"DROP TABLE {name}")
+        dropped.append(name)
+    if dropped:
+        logger.info("partitions dropped month=%s tables=%s", f"{month:%Y-%m}", ",".join(dropped))
+    return dropped
@@ -0,0 +1,85 @@
+"""Single-flight coalescing of identical concurrent upstream calls.
+
+Concurrent callers asking for the same key share one in-flight call, which
+runs in a worker thread so the event loop stays free while it waits on
+Google. A completed result can optionally be reused for a very short TTL,
+so a burst of identical requests (retries, several tabs) arriving just
+after the call finished still collapses into it. Failures are shared with
+the callers that were waiting but never cached.
+
+Coalescing is per process; each uvicorn worker has its own table.
+"""
+import asyncio
+import functools
+import time
+from typing import Any, Callable, Hashable, Optional
+
+from app.core.config import settings
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls by key.
+
+    Args:
+        ttl_seconds: How long a successful result is reused (0 disables reuse).
+        max_entries: Upper bound on cached results kept for the TTL.
+    """
+
+    def __init__(self, ttl_seconds: float = 0.0, max_entries: int = 10_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+        self._results: dict[Hashable, tuple[float, Any]] = {}
+        self.calls = 0  # Upstream calls actually made
+        self.shared = 0  # Callers served by another caller's call or a cached result
+
+    async def do(self, key: Hashable, fn: Callable[..., Any], *args, ttl: Optional[float] = None, **kwargs) -> Any:
+        """
+        Return `fn(*args, **kwargs)`, sharing the call with concurrent callers of the same key.
+
+        Args:
+            key: Identity of the call, e.g. (user_id, endpoint, params...).
+            fn: Blocking function; runs in a worker thread.
+            ttl: Override of ttl_seconds for this key.
+        """
+        ttl = self.ttl_seconds if ttl is None else ttl
+        if ttl > 0:
+            cached = self._results.get(key)
+            if cached is not None:
+                if cached[0] > time.monotonic():
+                    self.shared += 1
+                    return cached[1]
+                del self._results[key]
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.shared += 1
+        else:
+            self.calls += 1
+            future = asyncio.ensure_future(asyncio.to_thread(functools.partial(fn, *args, **kwargs)))
+            self._in_flight[key] = future
+            future.add_done_callback(functools.partial(self._completed, key, ttl))
+        # Shield so one caller disconnecting doesn't cancel the call for the others
+        return await asyncio.shield(future)
+
+    def _completed(self, key: Hashable, ttl: float, future: asyncio.Future) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        if ttl > 0 and not future.cancelled() and future.exception() is None:
+            if len(self._results) >= self.max_entries:
+                self._evict_expired()
+            if len(self._results) < self.max_entries:
+                self._results[key] = (time.monotonic() + ttl, future.result())
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        for key in [key for key, (expires_at, _) in self._results.items() if expires_at <= now]:
+            del self._results[key]
+
+    def forget(self, key: Hashable) -> None:
+        """Drop a cached result (e.g. after a write that changes it)."""
+        self._results.pop(key, None)
+
+
+upstream_calls = SingleFlight(ttl_seconds=settings.upstream_coalesce_ttl_seconds)
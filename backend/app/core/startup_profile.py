@@ -0,0 +1,141 @@
+"""
+Startup profiling mode.
+
+Measures, in fresh interpreters:
+- the import-time breakdown of `app.main` (via `python -X importtime`),
+  aggregated per top-level package and listed per module, and
+- time to first request: import + lifespan startup + `GET /api/health`.
+
+Usage (from backend/):
+    python -m app.core.startup_profile
+    python -m app.core.startup_profile --top 40 --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+_FIRST_REQUEST_SCRIPT = """
+import asyncio, json, time
+t0 = time.perf_counter()
+from app.main import app
+t1 = time.perf_counter()
+
+async def main():
+    startup, shutdown = asyncio.Queue(), asyncio.Event()
+    await startup.put({"type": "lifespan.startup"})
+    sent = []
+
+    async def lifespan_receive():
+        if not startup.empty():
+            return await startup.get()
+        await shutdown.wait()
+        return {"type": "lifespan.shutdown"}
+
+    async def lifespan_send(message):
+        sent.append(message["type"])
+
+    lifespan = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}}, lifespan_receive, lifespan_send))
+    while "lifespan.startup.complete" not in sent and "lifespan.startup.failed" not in sent:
+        await asyncio.sleep(0)
+    t2 = time.perf_counter()
+
+    status = []
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/api/health", "raw_path": b"/api/health", "root_path": "",
+        "query_string": b"", "headers": [], "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 8000),
+    }
+    await app(scope, receive, send)
+    t3 = time.perf_counter()
+    shutdown.set()
+    await lifespan
+    return t2, t3, status[0] if status else None
+
+t2, t3, status = asyncio.run(main())
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "lifespan_ms": (t2 - t1) * 1000,
+                  "first_request_ms": (t3 - t2) * 1000, "total_ms": (t3 - t0) * 1000, "status": status}))
+"""
+
+
+def import_breakdown() -> list[tuple[str, int, int]]:
+    """
+    Run `python -X importtime -c "import app.main"` and parse its report.
+
+    Returns:
+        List of (module, self_us, cumulative_us) in import order.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        env=dict(os.environ),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing app.main failed:\n{result.stderr}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|", 2)
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def first_request_timings() -> dict:
+    """Time import, lifespan startup and the first /api/health request in a fresh process."""
+    result = subprocess.run(
+        [sys.executable, "-c", _FIRST_REQUEST_SCRIPT],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        env=dict(os.environ),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"First-request probe failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=25, help="Modules to list by cumulative time")
+    parser.add_argument("--runs", type=int, default=3, help="First-request probes to average")
+    args = parser.parse_args()
+
+    rows = import_breakdown()
+    by_package: dict[str, int] = defaultdict(int)
+    for module, self_us, _ in rows:
+        by_package[module.split(".")[0]] += self_us
+    total_us = sum(by_package.values())
+
+    print(f"Import of app.main: {total_us / 1000:.1f} ms total (sum of self times)\n")
+    print(f"{'package':32} {'self ms':>9} {'share':>7}")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"{package:32} {self_us / 1000:>9.1f} {self_us / total_us:>7.1%}")
+
+    print(f"\n{'module':56} {'cumulative ms':>14}")
+    for module, _, cumulative_us in sorted(rows, key=lambda row: -row[2])[: args.top]:
+        print(f"{module[:56]:56} {cumulative_us / 1000:>14.1f}")
+
+    probes = [first_request_timings() for _ in range(args.runs)]
+    print(f"\nTime to first request (median of {args.runs} fresh processes):")
+    for key in ("import_ms", "lifespan_ms", "first_request_ms", "total_ms"):
+        print(f"  {key:18} {statistics.median(probe[key] for probe in probes):>9.1f}")
+    print(f"  {'status':18} {probes[-1]['status']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,110 @@
 """Main FastAPI application entry point."""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.routing import APIRouter
 
-from app.api import auth, picker
+from app.api import auth, jobs, picker
+from app.core.admission import AdmissionMiddleware, admission, readiness
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
+from app.core.database import dispose_engine, get_engine, warm_pool
+from app.core.loop_monitor import RequestTaskMiddleware, loop_monitor
+from app.core.metrics import registry
+from app.services.ingestion import ingestion_manager
+from app.services.job_progress import job_progress
+from app.services.picker_status import status_hub
+from app.services.retention import partition_maintainer
+from app.services.scheduler import job_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create the database engine at startup (optionally pre-warming its pool) and start background work
+    (event loop monitoring, job progress flushing, partition maintenance); stop it on shutdown.
+    """
+    loop_monitor.start()
+    get_engine()
+    if settings.db_pool_prewarm > 0:
+        try:
+            opened = await asyncio.to_thread(warm_pool, settings.db_pool_prewarm)
+            logger.info("database pool pre-warmed connections=%d", opened)
+        except Exception as e:
+            # Serve anyway; connections will be opened on demand
+            logger.warning("database pool pre-warm failed error=%s", e)
+    job_progress.start()
+    partition_maintainer.start()
+    yield
+    await partition_maintainer.close()
+    await status_hub.close()
+    await ingestion_manager.close()
+    await job_scheduler.close()
+    await job_progress.close()
+    from app.pipeline.local_enhance import shutdown_enhance_pool
+
+    shutdown_enhance_pool()
+    dispose_engine()
+    await loop_monitor.close()
+
 
 app = FastAPI(
     title="Voyage Voyage",
     description="Transform messy Google Photos trip albums into clean, cinematic, curated experiences",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
+# Brotli/gzip for large responses (e.g. Picker item pages)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_minimum_size)
+
+# Which task serves which request, so blocking-call reports can name the route
+if settings.loop_block_diagnostics:
+    app.add_middleware(RequestTaskMiddleware)
+
+# Outermost: shed load with 503 + Retry-After before any work is done
+if settings.admission_enabled:
+    app.add_middleware(AdmissionMiddleware, controller=admission, retry_after=settings.admission_retry_after_s)
+
 # API router with /api prefix
 api_router = APIRouter(prefix="/api")
 
 
 @api_router.get("/health")
-async def health_check():
-    """Health check endpoint."""
-    return {
+async def health_check(ready: bool = False):
+    """Health check endpoint; with ready=true, readiness from the admission signals (503 when overloaded)."""
+    body = {
         "status": "ok",
         "time": datetime.now(timezone.utc).isoformat(),
     }
+    if not ready:
+        return body
+    state = readiness()
+    if state["ready"]:
+        return {**body, **state}
+    return JSONResponse({**body, **state, "status": "overloaded"}, status_code=503)
+
+
+@api_router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Process metrics in the Prometheus text format."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+if settings.loop_block_diagnostics:
+
+    @api_router.get("/debug/blocking")
+    def blocking_calls():
+        """Recent event loop blocks (most recent last), with the route and stack that caused them."""
+        return {
+            "threshold_ms": settings.loop_block_threshold_ms,
+            "reports": [report.as_dict() for report in loop_monitor.reports],
+        }
 
 
 # Include auth routes
@@ -30,5 +113,8 @@ api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 # Include picker routes
 api_router.include_router(picker.router, prefix="/photos/picker", tags=["picker"])
 
+# Include job routes
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+
 app.include_router(api_router)
 
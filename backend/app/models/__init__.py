@@ -2,7 +2,11 @@
 from app.models.user import User
 from app.models.oauth_credential import OAuthCredential
 from app.models.oauth_state import OAuthState
+from app.models.job import Job
+from app.models.photo import Photo
+from app.models.restyle_render import RestyleRender
+from app.models.enhancement_render import EnhancementRender
+from app.models.face_embedding import FaceEmbedding
+from app.models.face_cluster import FaceCluster
 
-__all__ = ["User", "OAuthCredential", "OAuthState"]
-
-
+__all__ = ["User", "OAuthCredential", "OAuthState", "Job", "Photo", "RestyleRender", "EnhancementRender", "FaceEmbedding", "FaceCluster"]
@@ -0,0 +1,26 @@
+"""Cache of enhancement provider results, keyed by source content and params."""
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Text
+
+from app.core.database import Base
+
+
+class EnhancementRender(Base):
+    """
+    An enhanced output already produced for (source image content, enhancement params).
+
+    `output_digest` addresses a blob in the blob store (`app.core.blob_store`).
+    Rows outlive processes and jobs, so re-runs, restarts and the other
+    worker processes of the host reuse the result instead of calling the
+    provider again; an instance without the blob treats the row as a miss.
+    """
+
+    __tablename__ = "enhancement_renders"
+
+    cache_key = Column(Text, primary_key=True)  # `app.services.enhancement.cache_key`
+    output_digest = Column(Text, nullable=False)  # SHA-256 of the enhanced image bytes
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self) -> str:
+        return f"<EnhancementRender(key={self.cache_key[:12]})>"
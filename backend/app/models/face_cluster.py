@@ -0,0 +1,26 @@
+"""Per-job identity clustering state."""
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, LargeBinary, Text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from app.core.database import Base
+
+
+class FaceCluster(Base):
+    """
+    Identity clusters of a job's faces, so photos added later are clustered
+    against them without revisiting earlier faces.
+    """
+
+    __tablename__ = "face_clusters"
+
+    # No foreign key: jobs are keyed by (id, created_at); retention deletes the clusters of purged jobs
+    job_id = Column(UUID(as_uuid=True), primary_key=True)
+    model = Column(Text, nullable=False)  # FaceAnalyzer.model_id the centroids come from
+    state = Column(LargeBinary, nullable=False)  # IdentityClusterer.to_bytes()
+    assignments = Column(JSONB, nullable=False)  # media item id -> identity indexes of its faces
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self) -> str:
+        return f"<FaceCluster(job_id={self.job_id})>"
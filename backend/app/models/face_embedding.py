@@ -0,0 +1,26 @@
+"""Cached face embeddings, keyed by image content and face model."""
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, Text
+
+from app.core.database import Base
+
+
+class FaceEmbedding(Base):
+    """
+    Faces found in one image's content by one face model.
+
+    Keyed by content hash rather than photo, so the same image in another
+    job (or a re-run) is never analysed twice.
+    """
+
+    __tablename__ = "face_embeddings"
+
+    content_digest = Column(Text, primary_key=True)  # SHA-256 of the image bytes
+    model = Column(Text, primary_key=True)  # FaceAnalyzer.model_id
+    face_count = Column(Integer, nullable=False)
+    embeddings = Column(LargeBinary, nullable=False)  # float32 (face_count, D), row-major
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self) -> str:
+        return f"<FaceEmbedding(content={self.content_digest[:12]}, faces={self.face_count})>"
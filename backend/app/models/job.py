@@ -0,0 +1,42 @@
+"""Processing job model."""
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, Text
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+
+
+class Job(Base):
+    """
+    One album processing run for a user.
+
+    The table is partitioned by `created_at` month (see
+    `app.core.partitions`), so its primary key is (id, created_at); the
+    mapper still identifies jobs by `id` alone.
+    """
+
+    __tablename__ = "jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    google_album_id = Column(Text, nullable=True)
+    output_album_id = Column(Text, nullable=True)
+    status = Column(Text, nullable=False, default="importing_album")
+    stage = Column(Text, nullable=True)
+    progress = Column(Float, nullable=False, default=0.0)  # Overall, 0-1
+    error_message = Column(Text, nullable=True)
+    input_photo_count = Column(Integer, nullable=False, default=0)
+    output_photo_count = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(
+        DateTime(timezone=True), primary_key=True, nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
+    __mapper_args__ = {"primary_key": [id]}
+
+    def __repr__(self) -> str:
+        return f"<Job(id={self.id}, status={self.status})>"
@@ -0,0 +1,47 @@
+"""Per-photo results of a processing job."""
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKeyConstraint, Text, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+
+
+class Photo(Base):
+    """
+    One media item of a job, with its scores and flags.
+
+    Rows are written in bulk (see `app.services.photo_store`), so defaults
+    that matter are also set server-side in the migration. The table is
+    partitioned by its job's creation month (`job_created_at`), so a job's
+    photos are dropped with the job's partition.
+    """
+
+    __tablename__ = "photos"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_id = Column(UUID(as_uuid=True), nullable=False)
+    original_media_item_id = Column(Text, nullable=False)
+    processed_media_item_id = Column(Text, nullable=True)
+    is_duplicate = Column(Boolean, nullable=False, default=False)
+    is_hero = Column(Boolean, nullable=False, default=False)
+    is_album_cover = Column(Boolean, nullable=False, default=False)
+    aesthetic_score = Column(Float, nullable=True)
+    people_coverage_score = Column(Float, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    job_created_at = Column(DateTime(timezone=True), primary_key=True, nullable=False)  # Partition key: Job.created_at
+
+    # Stage updates address photos by (job_id, original_media_item_id); keys of a partitioned table
+    # must include the partition key
+    __table_args__ = (
+        ForeignKeyConstraint(["job_id", "job_created_at"], ["jobs.id", "jobs.created_at"], ondelete="CASCADE"),
+        UniqueConstraint(
+            "job_id", "original_media_item_id", "job_created_at", name="uq_photos_job_id_original_media_item_id"
+        ),
+        {"postgresql_partition_by": "RANGE (job_created_at)"},
+    )
+    __mapper_args__ = {"primary_key": [id]}
+
+    def __repr__(self) -> str:
+        return f"<Photo(id={self.id}, media_item_id={self.original_media_item_id})>"
@@ -0,0 +1,26 @@
+"""Cache of restyled renders, keyed by source content and style."""
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Text
+
+from app.core.database import Base
+
+
+class RestyleRender(Base):
+    """
+    A restyled output already produced for (source image content, style).
+
+    Both digests address blobs in the blob store (`app.core.blob_store`).
+    Rows outlive jobs, so re-runs and other jobs with the same photo reuse the
+    render instead of calling the provider again.
+    """
+
+    __tablename__ = "restyle_renders"
+
+    source_digest = Column(Text, primary_key=True)  # SHA-256 of the original image bytes
+    style = Column(Text, primary_key=True)
+    output_digest = Column(Text, nullable=False)  # SHA-256 of the restyled image bytes
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self) -> str:
+        return f"<RestyleRender(source={self.source_digest[:12]}, style={self.style})>"
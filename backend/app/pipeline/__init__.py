@@ -0,0 +1 @@
+"""Image processing pipeline stages."""
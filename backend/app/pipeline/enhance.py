@@ -0,0 +1,66 @@
+"""Enhancement stage with the fallback-to-original rule (technical-spec §6.2)."""
+import logging
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+Enhancer = Callable[[bytes], bytes]
+
+
+@dataclass
+class EnhancementResult:
+    """Output of the enhancement stage for one image."""
+
+    data: bytes  # Enhanced bytes, or the untouched original on fallback
+    enhanced: bool
+    error: Optional[str] = None
+    cached: bool = False  # Served from the enhancement cache (no provider call)
+    local: bool = False  # Produced by the local CPU fallback enhancer
+
+
+def enhance_with_fallback(
+    original: bytes, enhancer: Optional[Enhancer], fallback: Optional[Enhancer] = None
+) -> EnhancementResult:
+    """
+    Run an enhancer, falling back to the original image on any failure.
+
+    The output album must never be worse than the input, so an enhancer that
+    raises or returns nothing yields the original bytes unchanged. If a
+    `fallback` enhancer is given (the local CPU enhancer), it is tried first,
+    and only its failure yields the original.
+
+    Args:
+        original: Original encoded image.
+        enhancer: Callable returning enhanced bytes, or None to skip enhancement.
+        fallback: Enhancer to try when `enhancer` fails or is None.
+
+    Returns:
+        EnhancementResult with the bytes to use downstream.
+    """
+    if enhancer is None:
+        return fallback_result(original, fallback, "enhancement disabled")
+
+    try:
+        enhanced = enhancer(original)
+    except Exception as e:
+        logger.warning("enhancement failed, using fallback stage=enhancing_photos error=%s", e)
+        return fallback_result(original, fallback, str(e))
+
+    if not enhanced:
+        logger.warning("enhancement returned no data, using fallback stage=enhancing_photos")
+        return fallback_result(original, fallback, "empty enhancement result")
+
+    return EnhancementResult(data=enhanced, enhanced=True)
+
+
+def fallback_result(original: bytes, fallback: Optional[Enhancer], error: str) -> EnhancementResult:
+    """Result of the fallback enhancer, or the original if there is none or it fails."""
+    if fallback is not None:
+        try:
+            enhanced = fallback(original)
+            if enhanced:
+                return EnhancementResult(data=enhanced, enhanced=True, error=error, local=True)
+        except Exception as e:
+            logger.warning("local enhancement failed, using original stage=enhancing_photos error=%s", e)
+    return EnhancementResult(data=original, enhanced=False, error=error)
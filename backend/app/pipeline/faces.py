@@ -0,0 +1,216 @@
+"""Face detection, face embeddings and identity clustering (people coverage, §6.4/§6.5).
+
+Needs the optional OpenCV extra: pip install "voyage-voyage[faces]".
+
+Faces are detected on proxies of at most ANALYSIS_MAX_SIDE pixels, with
+YuNet when FACE_DETECTOR_MODEL points at its ONNX file, otherwise with the
+Haar cascade bundled with OpenCV 4. Each face becomes an L2-normalized
+embedding: SFace when FACE_RECOGNIZER_MODEL is set (it aligns faces on
+YuNet's landmarks, so it needs FACE_DETECTOR_MODEL too), otherwise a
+gradient-orientation descriptor of the aligned crop (weaker, but needs no
+model file).
+
+`IdentityClusterer` assigns faces to identities online: each face is
+compared with one centroid per identity, so clustering costs
+O(faces x identities) and new photos never revisit old faces.
+"""
+import io
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from app.pipeline.images import resize_max, to_grayscale
+
+try:
+    import cv2
+except ImportError:  # Optional extra: pip install "voyage-voyage[faces]"
+    cv2 = None
+
+ANALYSIS_MAX_SIDE = 640
+MIN_FACE_PX = 24
+HAAR_CASCADE = "haarcascade_frontalface_default.xml"
+YUNET_SCORE_THRESHOLD = 0.8
+SFACE_MATCH_THRESHOLD = 0.363  # Cosine similarity (SFace reference value)
+DESCRIPTOR_MATCH_THRESHOLD = 0.85
+DESCRIPTOR_SIZE = 64  # Crop side for the built-in descriptor
+DESCRIPTOR_CELLS = 4  # Grid of cells per side
+DESCRIPTOR_BINS = 8  # Orientation bins per cell
+
+
+def faces_available() -> bool:
+    """Whether OpenCV is installed, so faces can be analysed."""
+    return cv2 is not None
+
+
+@dataclass
+class FaceAnalysis:
+    """Faces found in one image."""
+
+    boxes: np.ndarray  # (N, 4) int x, y, w, h in proxy pixels
+    embeddings: np.ndarray  # (N, D) float32, L2-normalized
+
+
+def _gradient_descriptor(gray: np.ndarray) -> np.ndarray:
+    """Orientation histograms over a grid of cells, as one normalized vector."""
+    gy, gx = np.gradient(gray)
+    magnitude = np.hypot(gx, gy)
+    angle = np.mod(np.arctan2(gy, gx), np.pi)  # Unsigned orientation
+    bins = np.minimum((angle / np.pi * DESCRIPTOR_BINS).astype(np.int64), DESCRIPTOR_BINS - 1)
+    cell = DESCRIPTOR_SIZE // DESCRIPTOR_CELLS
+    cell_index = (np.arange(DESCRIPTOR_SIZE) // cell)[:, None] * DESCRIPTOR_CELLS + (np.arange(DESCRIPTOR_SIZE) // cell)
+    histogram = np.bincount(
+        (cell_index * DESCRIPTOR_BINS + bins).ravel(),
+        weights=magnitude.ravel(),
+        minlength=DESCRIPTOR_CELLS * DESCRIPTOR_CELLS * DESCRIPTOR_BINS,
+    ).astype(np.float32)
+    histogram -= histogram.mean()
+    return histogram
+
+
+class FaceAnalyzer:
+    """
+    Detects faces and computes their embeddings. Not thread-safe (OpenCV models keep state).
+
+    Args:
+        detector_model: YuNet ONNX path; the bundled Haar cascade if None.
+        recognizer_model: SFace ONNX path; the built-in descriptor if None.
+            Needs `detector_model`: SFace aligns faces on YuNet landmarks.
+
+    Raises:
+        RuntimeError: If OpenCV is not installed.
+        ValueError: If `recognizer_model` is set without `detector_model`.
+    """
+
+    def __init__(self, detector_model: Optional[str] = None, recognizer_model: Optional[str] = None):
+        if cv2 is None:
+            raise RuntimeError('Face analysis needs OpenCV: pip install "voyage-voyage[faces]"')
+        if recognizer_model and not detector_model:
+            raise ValueError("FACE_RECOGNIZER_MODEL (SFace) needs FACE_DETECTOR_MODEL (YuNet) for its landmarks")
+        if detector_model:
+            self._yunet = cv2.FaceDetectorYN.create(detector_model, "", (320, 320), YUNET_SCORE_THRESHOLD)
+            self._haar = None
+        else:
+            self._yunet = None
+            self._haar = cv2.CascadeClassifier(os.path.join(cv2.data.haarcascades, HAAR_CASCADE))
+        self._sface = cv2.FaceRecognizerSF.create(recognizer_model, "") if recognizer_model else None
+        detector = f"yunet:{os.path.basename(detector_model)}" if detector_model else "haar"
+        embedder = f"sface:{os.path.basename(recognizer_model)}" if recognizer_model else "gradient-v1"
+        self.model_id = f"{detector}+{embedder}"
+        self.match_threshold = SFACE_MATCH_THRESHOLD if self._sface is not None else DESCRIPTOR_MATCH_THRESHOLD
+
+    def analyze(self, image: np.ndarray) -> FaceAnalysis:
+        """
+        Find faces in an RGB image and embed them.
+
+        Args:
+            image: RGB uint8 array (analysed at ANALYSIS_MAX_SIDE).
+
+        Returns:
+            FaceAnalysis with one box and embedding per face.
+        """
+        proxy = np.ascontiguousarray(resize_max(image, ANALYSIS_MAX_SIDE))
+        if self._yunet is not None:
+            bgr = cv2.cvtColor(proxy, cv2.COLOR_RGB2BGR)
+            self._yunet.setInputSize((bgr.shape[1], bgr.shape[0]))
+            _, detections = self._yunet.detect(bgr)
+            detections = np.zeros((0, 15), np.float32) if detections is None else detections
+            detections = detections[np.minimum(detections[:, 2], detections[:, 3]) >= MIN_FACE_PX]
+            boxes = detections[:, :4].astype(np.int64)
+        else:
+            gray_u8 = cv2.equalizeHist(cv2.cvtColor(proxy, cv2.COLOR_RGB2GRAY))
+            found = self._haar.detectMultiScale(gray_u8, 1.1, 5, minSize=(MIN_FACE_PX, MIN_FACE_PX))
+            boxes = np.asarray(found, dtype=np.int64).reshape(-1, 4)
+
+        if len(boxes) == 0:
+            return FaceAnalysis(boxes=boxes.reshape(0, 4), embeddings=np.zeros((0, 1), np.float32))
+
+        vectors = []
+        if self._sface is not None:  # Always with YuNet, whose rows carry the landmarks
+            for row in detections:
+                aligned = self._sface.alignCrop(bgr, row)
+                vectors.append(self._sface.feature(aligned).ravel())
+        else:
+            gray = to_grayscale(proxy)
+            for x, y, w, h in boxes:
+                crop = cv2.resize(gray[y : y + h, x : x + w], (DESCRIPTOR_SIZE, DESCRIPTOR_SIZE))
+                vectors.append(_gradient_descriptor(crop))
+        embeddings = np.stack(vectors).astype(np.float32)
+        embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        return FaceAnalysis(boxes=boxes, embeddings=embeddings)
+
+
+class IdentityClusterer:
+    """
+    Online identity clustering by nearest centroid.
+
+    A face joins the most similar identity whose centroid is within
+    `threshold` cosine similarity, otherwise it starts a new identity.
+    Faces of one photo never share an identity. Centroids are running means
+    (re-normalized), so the state is one vector and one count per identity.
+
+    Args:
+        threshold: Minimum cosine similarity to join an identity.
+        centroids: Existing (K, D) centroids, e.g. from `from_bytes`.
+        counts: Faces per existing identity.
+    """
+
+    def __init__(self, threshold: float, centroids: Optional[np.ndarray] = None, counts: Optional[np.ndarray] = None):
+        self.threshold = threshold
+        self.centroids = centroids if centroids is not None else np.zeros((0, 0), np.float32)
+        self.counts = counts if counts is not None else np.zeros(0, np.int64)
+
+    @property
+    def identities(self) -> int:
+        return len(self.counts)
+
+    def assign(self, embeddings: np.ndarray) -> list[int]:
+        """
+        Assign the faces of one photo to identities, updating centroids.
+
+        Args:
+            embeddings: (N, D) normalized embeddings of the photo's faces.
+
+        Returns:
+            Identity index per face.
+        """
+        if len(embeddings) == 0:
+            return []
+        if self.identities == 0:
+            self.centroids = np.zeros((0, embeddings.shape[1]), np.float32)
+
+        similarity = embeddings @ self.centroids.T  # (N, K)
+        assigned = [-1] * len(embeddings)
+        taken: set[int] = set()
+        # Greedy by best similarity, so the most confident matches pick first
+        for face in np.argsort(-similarity.max(axis=1, initial=-1.0)):
+            for identity in np.argsort(-similarity[face]):
+                if similarity[face, identity] < self.threshold:
+                    break
+                if identity not in taken:
+                    assigned[face] = int(identity)
+                    taken.add(int(identity))
+                    break
+
+        for face, identity in enumerate(assigned):
+            if identity < 0:
+                self.centroids = np.vstack([self.centroids, embeddings[face]])
+                self.counts = np.append(self.counts, 1)
+                assigned[face] = self.identities - 1
+            else:
+                count = self.counts[identity]
+                centroid = (self.centroids[identity] * count + embeddings[face]) / (count + 1)
+                self.centroids[identity] = centroid / max(float(np.linalg.norm(centroid)), 1e-12)
+                self.counts[identity] = count + 1
+        return assigned
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        np.savez(buffer, centroids=self.centroids, counts=self.counts)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes, threshold: float) -> "IdentityClusterer":
+        with np.load(io.BytesIO(data)) as state:
+            return cls(threshold, centroids=state["centroids"], counts=state["counts"])
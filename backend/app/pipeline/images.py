@@ -0,0 +1,52 @@
+"""Image array helpers shared by pipeline stages.
+
+Images are passed between stages as RGB `uint8` NumPy arrays of shape (H, W, 3).
+"""
+import io
+
+import numpy as np
+from PIL import Image, ImageOps
+
+
+def decode_image(data: bytes) -> np.ndarray:
+    """
+    Decode image bytes into an RGB array, applying EXIF orientation.
+
+    Args:
+        data: Encoded image (JPEG, PNG, ...).
+
+    Returns:
+        RGB uint8 array of shape (H, W, 3).
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        img = ImageOps.exif_transpose(img)
+        return np.asarray(img.convert("RGB"))
+
+
+def encode_jpeg(image: np.ndarray, quality: int = 90) -> bytes:
+    """Encode an RGB array as JPEG bytes."""
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def to_grayscale(image: np.ndarray) -> np.ndarray:
+    """Convert an RGB array to float32 luma (ITU-R BT.601), range 0-255."""
+    if image.ndim == 2:
+        return image.astype(np.float32)
+    rgb = image.astype(np.float32)
+    return rgb[..., 0] * 0.299 + rgb[..., 1] * 0.587 + rgb[..., 2] * 0.114
+
+
+def resize_max(image: np.ndarray, max_side: int) -> np.ndarray:
+    """
+    Downscale an image so its longest side is at most `max_side` pixels.
+
+    Images already within the limit are returned unchanged.
+    """
+    height, width = image.shape[:2]
+    scale = max_side / max(height, width)
+    if scale >= 1:
+        return image
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return np.asarray(Image.fromarray(image).resize(size, Image.Resampling.BILINEAR))
@@ -0,0 +1,243 @@
+"""Local CPU enhancement, the fallback of the enhancement provider (§6.2).
+
+Auto-levels with gray-world white balance, light denoise and unsharp-mask
+sharpening, written as whole-array NumPy operations. Level statistics are
+taken once per image (on a subsample); the filters then run on horizontal
+strips with a small halo of neighbouring rows, so large images are split
+across a process pool and every strip produces exactly the pixels the
+whole image would. The pool is a `SharedArrayExecutor`: the image and the
+output are shared memory segments, and workers cut their padded strip from
+the image and write the enhanced rows straight into the output, so no
+pixels are pickled in either direction.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.pipeline.images import decode_image, encode_jpeg
+from app.pipeline.shared_arrays import SharedArray, SharedArrayExecutor
+
+logger = logging.getLogger(__name__)
+
+HALO = 3  # Rows/columns of context: 1 for the denoise blur, 2 for the sharpening blur
+STATS_STEP = 4  # Level statistics use every 4th pixel in each direction
+MIN_LEVELS_RANGE = 64  # Never stretch a channel by more than 255/64
+MAX_WHITE_BALANCE_GAIN = 1.25
+BLOCK_ROWS = 64  # Rows filtered at a time; keeps float32 temporaries cache-sized
+
+
+@dataclass(frozen=True)
+class LocalEnhanceParams:
+    """Strengths of the local enhancement steps."""
+
+    sharpen_amount: float = 0.6  # Unsharp-mask gain on the 5x5 binomial high-pass
+    denoise: float = 0.3  # Blend toward the 3x3 binomial blur before sharpening, 0-1
+    levels_clip: float = 0.005  # Share of pixels clipped at each end by auto-levels
+    white_balance: bool = True  # Gray-world channel gains after levels
+
+
+def levels_lut(image: np.ndarray, params: LocalEnhanceParams) -> np.ndarray:
+    """
+    Per-channel lookup table (3, 256) float32 for auto-levels and white balance.
+
+    Args:
+        image: RGB uint8 array.
+        params: Enhancement parameters.
+
+    Returns:
+        Table mapping each channel's input value to its output value (0-255).
+    """
+    sample = image[::STATS_STEP, ::STATS_STEP].reshape(-1, 3)
+    values = np.arange(256, dtype=np.float32)
+    lut = np.empty((3, 256), dtype=np.float32)
+    for channel in range(3):
+        cumulative = np.cumsum(np.bincount(sample[:, channel], minlength=256)) / len(sample)
+        low = int(np.searchsorted(cumulative, params.levels_clip))
+        high = int(np.searchsorted(cumulative, 1 - params.levels_clip))
+        if high - low < MIN_LEVELS_RANGE:
+            # Low-contrast channel: stretch around its middle by at most 255/MIN_LEVELS_RANGE
+            low = min(max((low + high - MIN_LEVELS_RANGE) // 2, 0), 255 - MIN_LEVELS_RANGE)
+            high = low + MIN_LEVELS_RANGE
+        lut[channel] = (values - low) * (255.0 / (high - low))
+    np.clip(lut, 0, 255, out=lut)
+
+    if params.white_balance:
+        weights = np.stack([np.bincount(sample[:, c], minlength=256) for c in range(3)]).astype(np.float32)
+        means = (weights * lut).sum(axis=1) / len(sample)
+        gains = np.clip(means.mean() / np.maximum(means, 1.0), 1 / MAX_WHITE_BALANCE_GAIN, MAX_WHITE_BALANCE_GAIN)
+        lut *= gains[:, None]
+        np.clip(lut, 0, 255, out=lut)
+    return lut
+
+
+def _blur121(x: np.ndarray) -> np.ndarray:
+    """
+    Unnormalized [1, 2, 1] blur in both directions (16x the mean), 'valid' mode.
+
+    The output is one pixel smaller on every side. Applied twice it is the
+    [1, 4, 6, 4, 1] binomial blur (256x the mean).
+    """
+    rows = x[:-2] + x[2:]
+    rows += x[1:-1]
+    rows += x[1:-1]
+    out = rows[:, :-2] + rows[:, 2:]
+    out += rows[:, 1:-1]
+    out += rows[:, 1:-1]
+    return out
+
+
+def _enhance_block(padded: np.ndarray, lut: np.ndarray, params: LocalEnhanceParams, out: np.ndarray) -> None:
+    """Enhance a block with HALO pixels of context into `out`, one channel plane at a time."""
+    denoise, amount = params.denoise, params.sharpen_amount
+    for channel in range(3):
+        x = np.take(lut[channel], padded[..., channel])
+        # Denoise: blend toward the 3x3 blur
+        base = _blur121(x)
+        base *= denoise / 16
+        base += (1 - denoise) * x[1:-1, 1:-1]
+        # Unsharp mask: (1 + amount) * base - amount * blur5(base)
+        sharp = _blur121(_blur121(base))
+        sharp *= -amount / 256
+        sharp += (1 + amount) * base[2:-2, 2:-2]
+        np.clip(sharp, 0, 255, out=sharp)
+        out[..., channel] = np.rint(sharp, out=sharp)
+
+
+def enhance_strip(padded: np.ndarray, lut: np.ndarray, params: LocalEnhanceParams) -> np.ndarray:
+    """
+    Enhance one strip that carries HALO pixels of context on every side.
+
+    Works through the strip in blocks of BLOCK_ROWS rows so the float32
+    temporaries stay in cache.
+
+    Args:
+        padded: RGB uint8 array of shape (h + 2*HALO, w + 2*HALO, 3).
+        lut: Table from `levels_lut`.
+        params: Enhancement parameters.
+
+    Returns:
+        Enhanced RGB uint8 array of shape (h, w, 3).
+    """
+    height, width = padded.shape[0] - 2 * HALO, padded.shape[1] - 2 * HALO
+    out = np.empty((height, width, 3), dtype=np.uint8)
+    for start in range(0, height, BLOCK_ROWS):
+        stop = min(start + BLOCK_ROWS, height)
+        _enhance_block(padded[start : stop + 2 * HALO], lut, params, out[start:stop])
+    return out
+
+
+def _strip_bounds(height: int, rows: int) -> list[tuple[int, int]]:
+    return [(start, min(start + rows, height)) for start in range(0, height, rows)]
+
+
+def _padded_strip(image: np.ndarray, start: int, stop: int) -> np.ndarray:
+    """Rows [start, stop) plus HALO rows/columns of context, edge-replicated at the borders."""
+    top, bottom = max(0, start - HALO), min(image.shape[0], stop + HALO)
+    pad_top, pad_bottom = HALO - (start - top), HALO - (bottom - stop)
+    return np.pad(image[top:bottom], ((pad_top, pad_bottom), (HALO, HALO), (0, 0)), mode="edge")
+
+
+def enhance_strip_into(
+    image: np.ndarray, out: np.ndarray, start: int, stop: int, lut: np.ndarray, params: LocalEnhanceParams
+) -> None:
+    """Enhance rows [start, stop) of `image` into the same rows of `out` (a pool task on shared arrays)."""
+    out[start:stop] = enhance_strip(_padded_strip(image, start, stop), lut, params)
+
+
+_pool: Optional[SharedArrayExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _pool_workers() -> int:
+    return settings.local_enhance_workers or os.cpu_count() or 1
+
+
+def get_enhance_pool() -> SharedArrayExecutor:
+    """Get or create the process pool for strip work (LOCAL_ENHANCE_WORKERS, 0 = one per CPU)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SharedArrayExecutor(max_workers=_pool_workers(), mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_enhance_pool() -> None:
+    """Stop the strip process pool, if started."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def enhance_array(
+    image: np.ndarray,
+    params: Optional[LocalEnhanceParams] = None,
+    executor: Optional[Executor] = None,
+) -> np.ndarray:
+    """
+    Enhance an RGB image.
+
+    Images of at least LOCAL_ENHANCE_PARALLEL_MIN_MP megapixels are split
+    into strips of about LOCAL_ENHANCE_TILE_MP megapixels and processed on
+    `executor` (the shared process pool by default); smaller images are
+    processed in the calling thread, where pool overhead would dominate (as
+    it does for every image with a single worker). A `SharedArrayExecutor`
+    gets the image and output as shared memory; other executors (e.g. a
+    thread pool) get padded strip copies.
+
+    Args:
+        image: RGB uint8 array.
+        params: Enhancement parameters (defaults if None).
+        executor: Executor for strips; the shared process pool if None.
+
+    Returns:
+        Enhanced RGB uint8 array of the same shape.
+    """
+    params = params or LocalEnhanceParams()
+    height, width = image.shape[:2]
+    lut = levels_lut(image, params)
+
+    if height * width < settings.local_enhance_parallel_min_mp * 1e6 or (executor is None and _pool_workers() == 1):
+        return enhance_strip(_padded_strip(image, 0, height), lut, params)
+
+    rows = max(HALO, int(settings.local_enhance_tile_mp * 1e6 // width))
+    executor = executor or get_enhance_pool()
+    if not isinstance(executor, SharedArrayExecutor):
+        futures = [
+            executor.submit(enhance_strip, _padded_strip(image, start, stop), lut, params)
+            for start, stop in _strip_bounds(height, rows)
+        ]
+        return np.concatenate([future.result() for future in futures], axis=0)
+
+    # Tasks hold their own references, so segments outlive this call if a strip fails early
+    with executor.share(image) as source, SharedArray(image.shape, np.uint8) as out:
+        futures = [
+            executor.submit(enhance_strip_into, source, out, start, stop, lut, params)
+            for start, stop in _strip_bounds(height, rows)
+        ]
+        for future in futures:
+            future.result()
+        return out.array.copy()
+
+
+def local_enhancer(params: Optional[LocalEnhanceParams] = None, quality: int = 90):
+    """
+    Enhancer (encoded bytes -> JPEG bytes) for `enhance_with_fallback` and the enhancement client.
+
+    Args:
+        params: Enhancement parameters (defaults if None).
+        quality: JPEG quality of the output.
+    """
+
+    def enhance(data: bytes) -> bytes:
+        return encode_jpeg(enhance_array(decode_image(data), params), quality=quality)
+
+    return enhance
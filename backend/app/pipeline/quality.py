@@ -0,0 +1,59 @@
+"""Per-photo quality metrics (sharpness, exposure, contrast)."""
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.pipeline.images import to_grayscale
+
+SHADOW_LEVEL = 8
+HIGHLIGHT_LEVEL = 247
+
+
+@dataclass
+class QualityMetrics:
+    """Quality metrics for a single image."""
+
+    sharpness: float  # Variance of the Laplacian of the luma channel
+    brightness: float  # Mean luma, 0-255
+    contrast: float  # Standard deviation of luma
+    shadow_clip: float  # Fraction of pixels at or below SHADOW_LEVEL
+    highlight_clip: float  # Fraction of pixels at or above HIGHLIGHT_LEVEL
+
+    def is_blurry(self, threshold: Optional[float] = None) -> bool:
+        """Whether the image is below the sharpness threshold."""
+        return self.sharpness < (settings.blur_threshold if threshold is None else threshold)
+
+    def is_underexposed(self, threshold: Optional[float] = None) -> bool:
+        """Whether mean brightness is below the exposure threshold."""
+        return self.brightness < (
+            settings.underexposure_threshold if threshold is None else threshold
+        )
+
+
+def compute_quality(image: np.ndarray) -> QualityMetrics:
+    """
+    Compute quality metrics for an image.
+
+    Metrics are resolution-dependent, so compute them on proxies of a
+    consistent size (see `app.pipeline.images.resize_max`).
+
+    Args:
+        image: RGB or grayscale uint8 array.
+
+    Returns:
+        QualityMetrics for the image.
+    """
+    gray = to_grayscale(image)
+    laplacian = (
+        gray[1:-1, :-2] + gray[1:-1, 2:] + gray[:-2, 1:-1] + gray[2:, 1:-1] - 4 * gray[1:-1, 1:-1]
+    )
+    pixels = gray.size
+    return QualityMetrics(
+        sharpness=float(laplacian.var()),
+        brightness=float(gray.mean()),
+        contrast=float(gray.std()),
+        shadow_clip=float(np.count_nonzero(gray <= SHADOW_LEVEL) / pixels),
+        highlight_clip=float(np.count_nonzero(gray >= HIGHLIGHT_LEVEL) / pixels),
+    )
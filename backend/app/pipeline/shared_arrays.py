@@ -0,0 +1,200 @@
+"""Zero-copy handoff of image arrays to worker processes.
+
+Submitting a NumPy array to a `ProcessPoolExecutor` pickles it: the parent
+serializes every byte, the pipe carries it, and the worker rebuilds a
+second copy, so multi-megapixel images cost CPU on both sides and double
+their memory while in flight. `SharedArrayExecutor` instead:
+
+- keeps arrays in `multiprocessing.shared_memory` segments (`SharedArray`),
+  written once by the owner process;
+- sends workers only an `ArrayDescriptor` (segment name, shape, dtype), and
+  the worker maps the segment and hands the task a plain ndarray over it;
+- reference-counts every segment: the owner holds one reference, and
+  `submit` takes one per task (released when the task finishes), so a
+  segment is unlinked only when the owner is done with it and no queued or
+  running task still needs it, even if the owner gives up early.
+
+Any picklable module-level function taking arrays works unchanged
+(`executor.submit(dhash, shared)`); results come back pickled as usual, so
+large outputs should be written into a shared output array instead.
+
+Segments are created with the resource tracker watching them, so they are
+unlinked if the owner process dies. Workers attach without registering
+them: before Python 3.13 an attaching process registers the segment too,
+and the tracker would unlink it or warn about it as leaked when that
+worker exits.
+"""
+import logging
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable
+
+import numpy as np
+
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+SEGMENTS = registry.gauge("shared_array_segments", "Shared memory segments of this process in use")
+SEGMENT_BYTES = registry.gauge("shared_array_bytes", "Bytes of shared memory segments of this process in use")
+
+
+@dataclass(frozen=True)
+class ArrayDescriptor:
+    """What a worker needs to map a shared array: segment name, shape and dtype."""
+
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+
+
+class SharedArray:
+    """
+    A NumPy array in a reference-counted shared memory segment (owner process side).
+
+    Starts with one reference, held by the creator; `release()` (or leaving
+    the `with` block) drops it. The segment is unlinked when the last
+    reference is dropped.
+
+    Args:
+        shape: Array shape.
+        dtype: Array dtype.
+    """
+
+    def __init__(self, shape: tuple[int, ...], dtype: Any = np.uint8):
+        dtype = np.dtype(dtype)
+        nbytes = max(1, int(np.prod(shape)) * dtype.itemsize)  # Segments cannot be empty
+        self._memory = shared_memory.SharedMemory(create=True, size=nbytes)
+        self._array = np.ndarray(shape, dtype=dtype, buffer=self._memory.buf)
+        self.descriptor = ArrayDescriptor(self._memory.name, tuple(shape), dtype.str)
+        self.nbytes = nbytes
+        self._refs = 1
+        self._lock = threading.Lock()
+        SEGMENTS.inc()
+        SEGMENT_BYTES.inc(nbytes)
+
+    @classmethod
+    def copy_of(cls, array: np.ndarray) -> "SharedArray":
+        """A new shared array holding a copy of `array`."""
+        shared = cls(array.shape, array.dtype)
+        shared.array[...] = array
+        return shared
+
+    @property
+    def array(self) -> np.ndarray:
+        """The array, in this process. Do not keep views of it past the last `release()`."""
+        if self._array is None:
+            raise ValueError(f"Shared array {self.descriptor.name} was released")
+        return self._array
+
+    @property
+    def refs(self) -> int:
+        return self._refs
+
+    def acquire(self) -> "SharedArray":
+        """Take another reference."""
+        with self._lock:
+            if self._refs == 0:
+                raise ValueError(f"Shared array {self.descriptor.name} was released")
+            self._refs += 1
+        return self
+
+    def release(self) -> None:
+        """Drop a reference; the last one unlinks the segment."""
+        with self._lock:
+            if self._refs == 0:
+                return
+            self._refs -= 1
+            if self._refs:
+                return
+            self._array = None
+        try:
+            self._memory.close()
+        except BufferError:
+            # Views of the array are still alive; the mapping goes with the last of them
+            logger.debug("shared array %s unlinked while still mapped", self.descriptor.name)
+        self._memory.unlink()
+        SEGMENTS.dec()
+        SEGMENT_BYTES.dec(self.nbytes)
+
+    def __enter__(self) -> "SharedArray":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+    def __reduce__(self):
+        raise TypeError("SharedArray cannot be pickled; submit it through SharedArrayExecutor")
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Open an existing segment without registering it with the resource tracker."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _run(fn: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+    """Worker side: map descriptor arguments to arrays, call `fn`, unmap."""
+    attached: list[shared_memory.SharedMemory] = []
+
+    def resolve(value: Any) -> Any:
+        if not isinstance(value, ArrayDescriptor):
+            return value
+        memory = _attach(value.name)
+        attached.append(memory)
+        return np.ndarray(value.shape, dtype=np.dtype(value.dtype), buffer=memory.buf)
+
+    args = tuple(resolve(value) for value in args)
+    kwargs = {key: resolve(value) for key, value in kwargs.items()}
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        del args, kwargs
+        for memory in attached:
+            try:
+                memory.close()
+            except BufferError:
+                pass  # The result is a view of the segment; unmapped once it is sent
+
+
+class SharedArrayExecutor(ProcessPoolExecutor):
+    """
+    Process pool that passes `SharedArray` arguments to tasks by descriptor.
+
+    `SharedArray` positional and keyword arguments of `submit` reach the
+    task as ndarrays mapped from the same segment; the segment is kept alive
+    until the task finishes. Other arguments are pickled as usual.
+    """
+
+    def share(self, array: np.ndarray) -> SharedArray:
+        """Copy an array into a new shared segment (one reference, held by the caller)."""
+        return SharedArray.copy_of(array)
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        shared = [value for value in (*args, *kwargs.values()) if isinstance(value, SharedArray)]
+        for array in shared:
+            array.acquire()
+        describe = lambda value: value.descriptor if isinstance(value, SharedArray) else value  # noqa: E731
+        try:
+            future = super().submit(
+                _run, fn, tuple(describe(value) for value in args), {key: describe(value) for key, value in kwargs.items()}
+            )
+        except BaseException:
+            _release_all(shared)
+            raise
+        future.add_done_callback(lambda _: _release_all(shared))
+        return future
+
+
+def _release_all(arrays: list[SharedArray]) -> None:
+    for array in arrays:
+        array.release()
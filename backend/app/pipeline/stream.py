@@ -0,0 +1,374 @@
+"""Memory-bounded streaming of images through pipeline stages.
+
+Albums are never held in memory as a whole. A producer thread loads
+images one at a time into a bounded queue (backpressure: it stops reading
+when the consumer falls behind), and the consumer takes them in batches.
+Every decoded image is charged against a process-wide `MemoryBudget`:
+
+- while the budget has room, images stay in memory;
+- once it is exhausted, new images are spilled to `.npy` files and read
+  back through read-only memory maps, so their pages are file-backed and
+  can be dropped by the kernel under pressure;
+- when the spill space is exhausted too, the producer blocks until frames
+  are released, and the consumer hands over the partial batch it holds
+  (the frames it is waiting for cannot be admitted before it does);
+- batch sizes shrink while the budget is under pressure and grow back
+  when it is not (additive increase, multiplicative decrease), and never
+  exceed what the budget plus spill space can hold.
+
+Peak RSS therefore depends on the budget, batch size and image size, not
+on album length.
+"""
+import logging
+import queue
+import threading
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional, TypeVar
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+HIGH_PRESSURE = 0.8
+LOW_PRESSURE = 0.5
+_POLL_SECONDS = 0.1
+
+
+class MemoryBudget:
+    """
+    Thread-safe byte budget for in-flight images.
+
+    Args:
+        limit_bytes: Bytes of decoded images allowed in memory at once.
+    """
+
+    def __init__(self, limit_bytes: int):
+        self.limit_bytes = limit_bytes
+        self.in_use = 0
+        self.peak = 0
+        self._condition = threading.Condition()
+
+    def try_reserve(self, nbytes: int) -> bool:
+        """Reserve `nbytes` if they fit; never blocks."""
+        with self._condition:
+            # A single image larger than the whole budget is admitted when nothing else is held
+            if self.in_use + nbytes > self.limit_bytes and self.in_use > 0:
+                return False
+            self.in_use += nbytes
+            self.peak = max(self.peak, self.in_use)
+            return True
+
+    def reserve(self, nbytes: int, timeout: Optional[float] = None) -> bool:
+        """Reserve `nbytes`, waiting up to `timeout` seconds (forever if None) for room."""
+        with self._condition:
+            fits = lambda: self.in_use + nbytes <= self.limit_bytes or self.in_use == 0  # noqa: E731
+            if not self._condition.wait_for(fits, timeout=timeout):
+                return False
+            self.in_use += nbytes
+            self.peak = max(self.peak, self.in_use)
+            return True
+
+    def release(self, nbytes: int) -> None:
+        with self._condition:
+            self.in_use = max(0, self.in_use - nbytes)
+            self._condition.notify_all()
+
+    @property
+    def pressure(self) -> float:
+        """Share of the budget in use, 0-1."""
+        return min(1.0, self.in_use / self.limit_bytes) if self.limit_bytes else 1.0
+
+
+@dataclass
+class Frame:
+    """
+    One image in flight: in memory (charged to the budget) or spilled to disk.
+
+    `array` returns the image; for spilled frames it is a read-only memory map.
+    Call `release()` (or use the frame as a context manager) when done.
+    """
+
+    key: Any
+    charged_bytes: int = 0  # Against the memory budget
+    spilled_bytes: int = 0  # Against the pool's spill limit
+    error: Optional[str] = None
+    spill_path: Optional[Path] = None
+    _array: Optional[np.ndarray] = field(default=None, repr=False)
+    _pool: Optional["FramePool"] = field(default=None, repr=False)
+
+    @property
+    def spilled(self) -> bool:
+        return self.spill_path is not None
+
+    @property
+    def array(self) -> np.ndarray:
+        if self._array is None and self.spill_path is not None:
+            return np.load(self.spill_path, mmap_mode="r")
+        if self._array is None:
+            raise ValueError(f"Frame {self.key!r} has no image: {self.error}")
+        return self._array
+
+    def release(self) -> None:
+        if self._pool is not None:
+            self._pool._release(self)
+            self._pool = None
+        self._array = None
+
+    def __enter__(self) -> "Frame":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+
+class FramePool:
+    """
+    Creates frames against a budget, spilling to disk once the budget is full.
+
+    Args:
+        budget: Memory budget shared by all pools in the process.
+        spill_dir: Directory for spill files (one subdirectory per pool).
+        spill_limit_bytes: Bytes of spill files allowed at once for this pool;
+            beyond that, `put` waits for memory instead.
+    """
+
+    def __init__(self, budget: MemoryBudget, spill_dir: str, spill_limit_bytes: int):
+        self.budget = budget
+        self.spill_limit_bytes = spill_limit_bytes
+        self.spill_dir = Path(spill_dir) / uuid.uuid4().hex
+        self.spilled_bytes = 0
+        self.spills = 0
+        self.waiting = False  # `put` is blocked on memory
+        self._lock = threading.Lock()
+
+    def put(self, key: Any, image: np.ndarray, stop: Optional[threading.Event] = None) -> Optional[Frame]:
+        """
+        Admit an image, in memory if the budget allows, else spilled to disk.
+
+        Blocks while both memory and spill space are full. Returns None if
+        `stop` is set while waiting.
+        """
+        nbytes = image.nbytes
+        if self.budget.try_reserve(nbytes):
+            return Frame(key=key, charged_bytes=nbytes, _array=image, _pool=self)
+
+        with self._lock:
+            can_spill = self.spilled_bytes + nbytes <= self.spill_limit_bytes
+            if can_spill:
+                self.spilled_bytes += nbytes
+                self.spills += 1
+        if can_spill:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            path = self.spill_dir / f"{uuid.uuid4().hex}.npy"
+            np.save(path, image)  # Plain write: the pages are not mapped into this process
+            return Frame(key=key, spilled_bytes=nbytes, spill_path=path, _pool=self)
+
+        self.waiting = True
+        try:
+            while not self.budget.reserve(nbytes, timeout=_POLL_SECONDS):
+                if stop is not None and stop.is_set():
+                    return None
+        finally:
+            self.waiting = False
+        return Frame(key=key, charged_bytes=nbytes, _array=image, _pool=self)
+
+    def _release(self, frame: Frame) -> None:
+        if frame.spill_path is not None:
+            frame.spill_path.unlink(missing_ok=True)
+            with self._lock:
+                self.spilled_bytes -= frame.spilled_bytes
+            frame.spilled_bytes = 0
+        if frame.charged_bytes:
+            self.budget.release(frame.charged_bytes)
+            frame.charged_bytes = 0
+
+    def close(self) -> None:
+        """Remove any spill files left behind."""
+        if self.spill_dir.exists():
+            for path in self.spill_dir.glob("*.npy"):
+                path.unlink(missing_ok=True)
+            self.spill_dir.rmdir()
+
+
+class AdaptiveBatchSize:
+    """
+    Batch size that halves under memory pressure and grows by one when relaxed.
+
+    Args:
+        initial: Starting batch size.
+        minimum: Smallest batch size.
+        maximum: Largest batch size.
+    """
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int = 64):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.size = max(minimum, min(initial, maximum))
+
+    def cap(self, maximum: int) -> None:
+        """Lower the maximum (e.g. to the frames that fit in memory plus spill space)."""
+        self.maximum = max(self.minimum, min(self.maximum, maximum))
+        self.size = min(self.size, self.maximum)
+
+    def update(self, pressure: float, spilled: bool = False) -> int:
+        if spilled or pressure >= HIGH_PRESSURE:
+            self.size = max(self.minimum, self.size // 2)
+        elif pressure < LOW_PRESSURE:
+            self.size = min(self.maximum, self.size + 1)
+        return self.size
+
+
+@dataclass
+class StreamStats:
+    """Counters for one `stream_batches` run."""
+
+    items: int = 0
+    failed: int = 0
+    spilled: int = 0
+    batches: int = 0
+    min_batch: int = 0
+    max_batch: int = 0
+
+
+_DONE = object()
+
+
+def stream_batches(
+    source: Iterable[T],
+    load: Callable[[T], tuple[Any, np.ndarray]],
+    budget: Optional[MemoryBudget] = None,
+    batch_size: Optional[int] = None,
+    prefetch: Optional[int] = None,
+    spill_dir: Optional[str] = None,
+    spill_limit_bytes: Optional[int] = None,
+    stats: Optional[StreamStats] = None,
+) -> Iterator[list[Frame]]:
+    """
+    Stream images from `source` in memory-bounded, adaptively sized batches.
+
+    A producer thread calls `load(item)` for each source item; it returns
+    (key, image). Load failures become frames with `error` set (and no
+    image), so one bad photo does not stop the album. Frames in a yielded
+    batch are released when the consumer asks for the next batch (or
+    closes the generator); copy out anything that must outlive the batch.
+
+    Args:
+        source: Items to load (e.g. media items), consumed lazily.
+        load: Returns (key, RGB array) for an item; runs in the producer thread.
+        budget: Memory budget; defaults to the process-wide `pipeline_budget`.
+        batch_size: Initial and maximum batch size (PIPELINE_MAX_BATCH).
+        prefetch: Frames queued ahead of the consumer (PIPELINE_PREFETCH).
+        spill_dir: Spill directory (PIPELINE_SPILL_DIR).
+        spill_limit_bytes: Spill space for this stream (PIPELINE_SPILL_LIMIT_MB).
+        stats: Optional counters to fill in.
+
+    Yields:
+        Lists of Frame.
+    """
+    budget = budget or pipeline_budget
+    batch_size = batch_size or settings.pipeline_max_batch
+    prefetch = prefetch or settings.pipeline_prefetch
+    pool = FramePool(
+        budget,
+        spill_dir or settings.pipeline_spill_dir,
+        spill_limit_bytes if spill_limit_bytes is not None else settings.pipeline_spill_limit_mb * 2**20,
+    )
+    stats = stats if stats is not None else StreamStats()
+    sizer = AdaptiveBatchSize(batch_size, maximum=batch_size)
+    frames: queue.Queue = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+    failure: list[BaseException] = []
+
+    def offer(value) -> bool:
+        while not stop.is_set():
+            try:
+                frames.put(value, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in source:
+                if stop.is_set():
+                    return
+                try:
+                    key, image = load(item)
+                except Exception as e:
+                    logger.warning("pipeline load failed item=%r error=%s", item, e)
+                    frame = Frame(key=item, error=str(e))
+                else:
+                    frame = pool.put(key, image, stop)
+                    del image
+                    if frame is None:
+                        return
+                if not offer(frame):
+                    frame.release()
+                    return
+        except BaseException as e:  # Source iteration itself failed
+            failure.append(e)
+        finally:
+            offer(_DONE)
+
+    producer = threading.Thread(target=produce, name="pipeline-stream", daemon=True)
+    producer.start()
+    batch: list[Frame] = []
+    try:
+        done = False
+        while not done:
+            batch = []
+            while len(batch) < sizer.size:
+                try:
+                    value = frames.get(timeout=_POLL_SECONDS)
+                except queue.Empty:
+                    if batch and pool.waiting:
+                        break  # The producer needs memory held by this batch: hand it over now
+                    continue
+                if value is _DONE:
+                    done = True
+                    break
+                nbytes = value.charged_bytes + value.spilled_bytes
+                if nbytes:
+                    sizer.cap((budget.limit_bytes + pool.spill_limit_bytes) // nbytes)
+                batch.append(value)
+            if not batch:
+                break
+            spilled = sum(frame.spilled for frame in batch)
+            stats.items += len(batch)
+            stats.failed += sum(frame.error is not None for frame in batch)
+            stats.spilled += spilled
+            stats.batches += 1
+            stats.min_batch = min(stats.min_batch or len(batch), len(batch))
+            stats.max_batch = max(stats.max_batch, len(batch))
+            yield batch
+            for frame in batch:
+                frame.release()
+            batch = []
+            sizer.update(budget.pressure, spilled=spilled > 0)
+        if failure:
+            raise failure[0]
+    finally:
+        stop.set()
+        for frame in batch:
+            frame.release()
+        while True:  # Drain so the producer can exit and queued frames are released
+            try:
+                value = frames.get_nowait()
+            except queue.Empty:
+                if not producer.is_alive():
+                    break
+                producer.join(timeout=_POLL_SECONDS)
+                continue
+            if isinstance(value, Frame):
+                value.release()
+        pool.close()
+
+
+pipeline_budget = MemoryBudget(settings.pipeline_memory_budget_mb * 2**20)
@@ -0,0 +1,105 @@
+"""Horizon tilt detection and correction (`correcting_tilts` stage)."""
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+from app.core.config import settings
+from app.pipeline.images import resize_max, to_grayscale
+
+MIN_CONFIDENCE = 0.5
+MIN_CORRECTION_DEGREES = 0.5
+ANALYSIS_MAX_SIDE = 512  # Downscaling averages out sensor noise and fine texture
+INLIER_TOLERANCE_PX = 2.0
+FIT_ITERATIONS = 3
+
+@dataclass
+class TiltEstimate:
+    """Estimated horizon tilt for an image."""
+
+    angle: float  # Degrees, counterclockwise positive (horizon rises to the right)
+    confidence: float  # Share of near-horizontal edge energy supporting the angle, 0-1
+
+    @property
+    def should_correct(self) -> bool:
+        """Whether the estimate is confident and large enough to act on."""
+        return self.confidence >= MIN_CONFIDENCE and abs(self.angle) >= MIN_CORRECTION_DEGREES
+
+
+def estimate_tilt(image: np.ndarray, max_angle: Optional[float] = None) -> TiltEstimate:
+    """
+    Estimate the horizon angle.
+
+    Finds the strongest vertical intensity step in every column (the
+    sky/ground boundary candidate), then fits a line through those points,
+    trimming outliers between iterations.
+
+    Args:
+        image: RGB or grayscale uint8 array (analysed at ANALYSIS_MAX_SIDE).
+        max_angle: Largest tilt considered, in degrees. Defaults to settings.max_tilt_degrees.
+
+    Returns:
+        TiltEstimate with angle and confidence (share of columns on the fitted line).
+    """
+    if max_angle is None:
+        max_angle = settings.max_tilt_degrees
+
+    gray = to_grayscale(resize_max(image, ANALYSIS_MAX_SIDE))
+    step = np.abs(gray[2:] - gray[:-2])
+    # Smooth along rows so single noisy pixels don't win the per-column argmax
+    padded = np.pad(step, ((0, 0), (2, 2)), mode="edge")
+    step = sum(padded[:, offset : offset + step.shape[1]] for offset in range(5)) / 5
+
+    rows = np.argmax(step, axis=0).astype(np.float64) + 1
+    strength = step[rows.astype(int) - 1, np.arange(step.shape[1])]
+    columns = np.nonzero(strength >= np.median(strength))[0]
+    if len(columns) < 10:
+        return TiltEstimate(angle=0.0, confidence=0.0)
+
+    xs, ys = columns.astype(np.float64), rows[columns]
+    for _ in range(FIT_ITERATIONS):
+        slope, intercept = np.polyfit(xs, ys, 1)
+        residuals = np.abs(ys - (slope * xs + intercept))
+        keep = residuals <= max(INLIER_TOLERANCE_PX, np.percentile(residuals, 70))
+        if keep.sum() < 10:
+            break
+        xs, ys = xs[keep], ys[keep]
+
+    slope, intercept = np.polyfit(xs, ys, 1)
+    all_xs = np.arange(step.shape[1], dtype=np.float64)
+    inliers = np.abs(rows - (slope * all_xs + intercept)) <= INLIER_TOLERANCE_PX
+    # Image rows grow downwards, so a negative slope means the horizon rises to the right
+    angle = float(np.degrees(np.arctan(-slope)))
+    if abs(angle) > max_angle:
+        return TiltEstimate(angle=0.0, confidence=0.0)
+    return TiltEstimate(angle=angle, confidence=float(inliers.mean()))
+
+
+def correct_tilt(image: np.ndarray, angle: float) -> np.ndarray:
+    """
+    Rotate an image to level the horizon and crop minimally.
+
+    The crop is the largest centered rectangle with the original aspect ratio
+    that contains no rotation borders.
+
+    Args:
+        image: RGB uint8 array.
+        angle: Tilt from `estimate_tilt` (degrees, counterclockwise positive).
+
+    Returns:
+        Leveled and cropped RGB array.
+    """
+    if angle == 0:
+        return image
+
+    height, width = image.shape[:2]
+    rotated = Image.fromarray(image).rotate(-angle, resample=Image.Resampling.BICUBIC)
+
+    theta = math.radians(abs(angle))
+    cos_t, sin_t = math.cos(theta), math.sin(theta)
+    scale = min(width / (width * cos_t + height * sin_t), height / (width * sin_t + height * cos_t))
+    crop_w, crop_h = int(width * scale), int(height * scale)
+    left, top = (width - crop_w) // 2, (height - crop_h) // 2
+    return np.asarray(rotated.crop((left, top, left + crop_w, top + crop_h)))
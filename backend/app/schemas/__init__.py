@@ -0,0 +1,34 @@
+"""API response schemas."""
+from app.schemas.auth import UserProfile
+from app.schemas.jobs import JobStatus
+from app.schemas.photos import (
+    Album,
+    AlbumList,
+    IngestionStatus,
+    PickerBatchStatusRequest,
+    PickerBatchStatusResponse,
+    PickerBatchStatusResult,
+    PickerMediaItem,
+    PickerMediaItemList,
+    PickerPollingConfig,
+    PickerSession,
+    PickerSessionStatus,
+    SessionId,
+)
+
+__all__ = [
+    "Album",
+    "AlbumList",
+    "IngestionStatus",
+    "JobStatus",
+    "PickerBatchStatusRequest",
+    "PickerBatchStatusResponse",
+    "PickerBatchStatusResult",
+    "PickerMediaItem",
+    "PickerMediaItemList",
+    "PickerPollingConfig",
+    "PickerSession",
+    "PickerSessionStatus",
+    "SessionId",
+    "UserProfile",
+]
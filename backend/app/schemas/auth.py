@@ -0,0 +1,9 @@
+"""Response models for the auth endpoints."""
+from app.schemas.base import APIModel
+
+
+class UserProfile(APIModel):
+    """The authenticated user."""
+
+    id: str
+    email: str
@@ -0,0 +1,13 @@
+"""Shared base for API response models.
+
+Fields are snake_case in Python and camelCase on the wire, matching the
+Google APIs the frontend already mirrors.
+"""
+from pydantic import BaseModel, ConfigDict
+from pydantic.alias_generators import to_camel
+
+
+class APIModel(BaseModel):
+    """Base for response models: camelCase aliases, construction by field name."""
+
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
@@ -0,0 +1,25 @@
+"""Response models for the job endpoints.
+
+Unlike the Picker models, these keep snake_case on the wire, as specified
+for `GET /api/jobs/{jobId}` in docs/api.md.
+"""
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class JobStatus(BaseModel):
+    """Status and progress of a processing job."""
+
+    job_id: str
+    status: str
+    stage: Optional[str] = None
+    progress: float = 0.0
+    input_photo_count: int = 0
+    output_photo_count: int = 0
+    google_album_id: Optional[str] = None
+    output_album_id: Optional[str] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    error_message: Optional[str] = None
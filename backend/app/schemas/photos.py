@@ -0,0 +1,110 @@
+"""Request and response models for the Picker and Google Photos endpoints."""
+from datetime import datetime
+from typing import Annotated, Any, Optional
+
+from pydantic import Field, StringConstraints
+
+from app.schemas.base import APIModel
+
+MAX_BATCH_SESSIONS = 50
+
+# Session ids are interpolated into Google API paths (and ingest cache paths), so only id characters are allowed
+SESSION_ID_PATTERN = r"^[A-Za-z0-9_-]{1,128}$"
+SessionId = Annotated[str, StringConstraints(pattern=SESSION_ID_PATTERN)]
+
+
+class PickerSession(APIModel):
+    """A newly created Picker session."""
+
+    session_id: Optional[str] = None
+    picker_uri: Optional[str] = None
+
+
+class PickerPollingConfig(APIModel):
+    """How often and how long Google asks clients to poll a session."""
+
+    poll_interval: Optional[str] = None  # Duration string, e.g. "5s"
+    timeout_in: Optional[str] = None
+
+
+class PickerSessionStatus(APIModel):
+    """Picker session state as reported by the Picker API."""
+
+    session_id: Optional[str] = None
+    media_items_set: bool = False
+    state: Optional[str] = None  # PENDING, ACTIVE, COMPLETED, EXPIRED
+    polling_config: Optional[PickerPollingConfig] = None
+
+    @property
+    def is_final(self) -> bool:
+        """Whether the session will not change any more (selection made or session over)."""
+        return self.media_items_set or self.state in ("COMPLETED", "EXPIRED")
+
+
+class PickerBatchStatusRequest(APIModel):
+    """Session ids to look up in one call."""
+
+    session_ids: list[SessionId] = Field(min_length=1, max_length=MAX_BATCH_SESSIONS)
+
+
+class PickerBatchStatusResult(APIModel):
+    """Status of one session in a batch, or the error that prevented fetching it."""
+
+    session_id: str
+    status: Optional[PickerSessionStatus] = None
+    error: Optional[str] = None
+
+
+class PickerBatchStatusResponse(APIModel):
+    """Per-session results, in request order."""
+
+    results: list[PickerBatchStatusResult]
+
+
+class PickerMediaItem(APIModel):
+    """A media item selected in a Picker session."""
+
+    id: Optional[str] = None
+    filename: str = ""
+    mime_type: str = ""
+    media_metadata: dict[str, Any] = {}
+    base_url: str = ""  # Includes =d for full-resolution download
+    type: str = ""  # PHOTO or VIDEO
+    create_time: str = ""
+
+
+class PickerMediaItemList(APIModel):
+    """One page of Picker media items."""
+
+    media_items: list[PickerMediaItem]
+    next_page_token: Optional[str] = None
+
+
+class IngestionStatus(APIModel):
+    """Progress of the background ingestion of a session's selection."""
+
+    session_id: str
+    state: str  # pending, running, completed, failed
+    items_total: int = 0
+    proxies_done: int = 0
+    skipped: int = 0
+    failed: int = 0
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class Album(APIModel):
+    """A Google Photos album."""
+
+    id: Optional[str] = None
+    title: str = ""
+    media_item_count: int = 0
+    product_url: str = ""
+
+
+class AlbumList(APIModel):
+    """One page of Google Photos albums."""
+
+    albums: list[Album]
+    next_page_token: Optional[str] = None
@@ -0,0 +1,396 @@
+"""Client for the external image enhancement API (technical-spec §6.2).
+
+The provider is called over HTTP with the API key as a bearer token:
+
+    POST {ENHANCEMENT_API_URL}/v1/enhance?<params>
+        body: image bytes -> enhanced image bytes
+    POST {ENHANCEMENT_API_URL}/v1/enhance:batch          (ENHANCEMENT_BATCH_SIZE > 1)
+        {"params": {...}, "images": [{"id", "data": base64}]}
+        -> {"results": [{"id", "data": base64} | {"id", "error"}]}
+
+Calls run on a bounded thread pool (ENHANCEMENT_CONCURRENCY) with a per-call
+timeout and retries on transient errors. Any failure falls back to the local
+CPU enhancer (ENHANCEMENT_LOCAL_FALLBACK), or else to the original image.
+Results are cached in the blob store, keyed by (content hash, params) in the
+`enhancement_renders` table, and identical images in flight share one call,
+so re-runs (also after a restart or in another worker process of the host)
+and duplicates never pay twice. Latency, outcome, cache and cost counters are
+exported through `app.core.metrics`.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.blob_store import BlobNotFoundError, BlobStore, get_blob_store
+from app.core.config import settings
+from app.core.database import get_engine
+from app.core.http_retry import post_with_retries
+from app.core.metrics import registry
+from app.models.enhancement_render import EnhancementRender
+from app.pipeline.enhance import EnhancementResult, Enhancer, fallback_result
+from app.pipeline.local_enhance import local_enhancer
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+RETRY_BACKOFF_SECONDS = 0.5
+MAX_RETRY_BACKOFF_SECONDS = 4.0
+
+REQUESTS = registry.counter(
+    "enhancement_requests_total", "Enhancement provider calls by kind and outcome", ("kind", "outcome")
+)
+REQUEST_SECONDS = registry.histogram(
+    "enhancement_request_seconds", "Enhancement provider call latency", ("kind",)
+)
+IMAGES = registry.counter(
+    "enhancement_images_total", "Images by where their enhancement came from", ("source",)
+)
+COST = registry.counter("enhancement_cost_usd_total", "Estimated enhancement provider spend (USD)")
+IN_FLIGHT = registry.gauge("enhancement_in_flight", "Enhancement provider calls in progress")
+
+
+def cache_key(data: bytes, params: dict[str, Any]) -> str:
+    """Key for an (image content, enhancement params) pair."""
+    canonical = json.dumps(params, sort_keys=True, separators=(",", ":"))
+    return f"{hashlib.sha256(data).hexdigest()}:{hashlib.sha256(canonical.encode()).hexdigest()[:16]}"
+
+
+class EnhancementCache:
+    """
+    Enhanced results stored in the blob store, indexed by cache key.
+
+    The index is the `enhancement_renders` table, so results survive restarts
+    and are shared by the worker processes of a host, which share the local
+    blob store's directory. Other instances find the row but not the blob,
+    which is a miss: with the local backend the cache is per host. A bounded
+    in-memory LRU in front of the table saves the lookup for recent keys.
+    Results themselves are ordinary (unreferenced) blobs, so the store's
+    quota can evict them, which also turns into a miss (the row is replaced
+    by the next render). Index errors are logged and count as misses: the
+    cache never fails a call.
+
+    Args:
+        store: Blob store holding the results.
+        max_entries: Keys kept in the in-memory LRU.
+        engine_factory: Returns the engine for the index; None keeps the index in memory only.
+    """
+
+    def __init__(self, store: BlobStore, max_entries: int, engine_factory: Optional[Callable[[], Engine]] = get_engine):
+        self.store = store
+        self.max_entries = max_entries
+        self.engine_factory = engine_factory
+        self._index: OrderedDict[str, str] = OrderedDict()  # cache key -> result digest
+        self._lock = threading.Lock()
+
+    def _remember(self, key: str, digest: str) -> None:
+        with self._lock:
+            self._index[key] = digest
+            self._index.move_to_end(key)
+            while len(self._index) > self.max_entries:
+                self._index.popitem(last=False)
+
+    def _lookup(self, keys: list[str]) -> dict[str, str]:
+        """Result digests of `keys` in the persistent index."""
+        if not keys or self.engine_factory is None:
+            return {}
+        table = EnhancementRender.__table__
+        try:
+            with self.engine_factory().connect() as connection:
+                rows = connection.execute(
+                    select(table.c.cache_key, table.c.output_digest).where(table.c.cache_key.in_(keys))
+                )
+                return {row.cache_key: row.output_digest for row in rows}
+        except SQLAlchemyError as e:
+            logger.warning("enhancement cache lookup failed keys=%d error=%s", len(keys), e)
+            return {}
+
+    def get_many(self, keys: Sequence[str]) -> dict[str, bytes]:
+        """Cached results of the given keys (missing keys are left out)."""
+        digests: dict[str, str] = {}
+        with self._lock:
+            for key in keys:
+                digest = self._index.get(key)
+                if digest is not None:
+                    self._index.move_to_end(key)
+                    digests[key] = digest
+        for key, digest in self._lookup([key for key in keys if key not in digests]).items():
+            self._remember(key, digest)
+            digests[key] = digest
+
+        results = {}
+        for key, digest in digests.items():
+            try:
+                results[key] = self.store.read(digest)
+            except BlobNotFoundError:
+                with self._lock:
+                    self._index.pop(key, None)
+        return results
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key]).get(key)
+
+    def put_many(self, results: dict[str, bytes]) -> None:
+        """Store results and index them (in one statement)."""
+        digests = {key: self.store.put(data).digest for key, data in results.items()}
+        for key, digest in digests.items():
+            self._remember(key, digest)
+        if not digests or self.engine_factory is None:
+            return
+        statement = insert(EnhancementRender.__table__).values(
+            [{"cache_key": key, "output_digest": digest} for key, digest in digests.items()]
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=["cache_key"], set_={"output_digest": statement.excluded.output_digest}
+        )
+        try:
+            with self.engine_factory().begin() as connection:
+                connection.execute(statement)
+        except SQLAlchemyError as e:
+            logger.warning("enhancement cache index write failed keys=%d error=%s", len(digests), e)
+
+    def put(self, key: str, data: bytes) -> None:
+        self.put_many({key: data})
+
+
+class EnhancementClient:
+    """
+    Bounded-concurrency, batching, caching enhancement client. Thread-safe.
+
+    Args:
+        api_url: Provider base URL; enhancement is disabled if None.
+        api_key: Provider API key.
+        concurrency: Provider calls in flight at once.
+        batch_size: Images per provider call (1 disables the batch endpoint).
+        timeout: Seconds per provider call.
+        max_retries: Retries on timeouts, connection errors and retryable statuses.
+        cost_per_image: Provider price per image, for the cost counter.
+        cache: Result cache; None disables caching.
+        fallback: Enhancer for images the provider could not enhance (e.g.
+            the local CPU enhancer); None returns the originals.
+    """
+
+    def __init__(
+        self,
+        api_url: Optional[str],
+        api_key: Optional[str],
+        concurrency: int,
+        batch_size: int,
+        timeout: float,
+        max_retries: int,
+        cost_per_image: float,
+        cache: Optional[EnhancementCache],
+        fallback: Optional[Enhancer] = None,
+    ):
+        self.api_url = api_url.rstrip("/") if api_url else None
+        self.api_key = api_key
+        self.batch_size = max(1, batch_size)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.cost_per_image = cost_per_image
+        self.cache = cache
+        self.fallback = fallback
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="enhance")
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_url and self.api_key)
+
+    def enhance(self, data: bytes, params: Optional[dict[str, Any]] = None) -> EnhancementResult:
+        """Enhance one image (falls back to the original on failure)."""
+        return self.enhance_many([data], params)[0]
+
+    def enhance_many(self, images: Sequence[bytes], params: Optional[dict[str, Any]] = None) -> list[EnhancementResult]:
+        """
+        Enhance several images with the same params.
+
+        Cache hits are returned directly; identical images (here or in other
+        threads' calls) share one provider call; the remaining images are sent
+        in batches of `batch_size`, at most `concurrency` calls at a time.
+
+        Returns:
+            One EnhancementResult per input, in order. Images the provider
+            could not enhance carry the fallback enhancer's output
+            (`local=True`) or the original bytes (`enhanced=False`), with the
+            provider error.
+        """
+        params = params or {}
+        if not self.enabled:
+            return [self._fallback(data, "enhancement disabled") for data in images]
+
+        keys = [cache_key(data, params) for data in images]
+        outcomes: dict[str, tuple[Optional[bytes], Optional[str]]] = {}  # key -> (enhanced bytes, error)
+        sources: dict[str, str] = {}
+        waiting: dict[str, Future] = {}
+        owned: list[tuple[str, bytes]] = []
+
+        cached = self.cache.get_many(list(dict.fromkeys(keys))) if self.cache is not None else {}
+        try:
+            for key, data in zip(keys, images):
+                if key in sources:
+                    continue
+                if key in cached:
+                    outcomes[key], sources[key] = (cached[key], None), "cache"
+                    continue
+                with self._lock:
+                    future = self._inflight.get(key)
+                    if future is None:
+                        self._inflight[key] = Future()
+                        owned.append((key, data))
+                        sources[key] = "api"
+                    else:
+                        waiting[key] = future
+                        sources[key] = "shared"
+
+            batches = [owned[start : start + self.batch_size] for start in range(0, len(owned), self.batch_size)]
+            for call in [self._executor.submit(self._call, batch, params) for batch in batches]:
+                call.result()  # _call never raises; it resolves the in-flight futures
+        except BaseException as e:
+            # Other callers may be waiting on the keys this call registered: never leave them unresolved
+            self._abandon([key for key, _ in owned], f"enhancement call aborted: {e!r}")
+            raise
+        for key, _ in owned:
+            with self._lock:
+                outcomes[key] = self._inflight.pop(key).result()
+        for key, future in waiting.items():
+            outcomes[key] = future.result()
+
+        output = []
+        seen: set[str] = set()
+        for key, data in zip(keys, images):
+            enhanced, error = outcomes[key]
+            if enhanced is None:
+                output.append(self._fallback(data, error))
+            else:
+                source = "shared" if key in seen else sources[key]
+                output.append(EnhancementResult(data=enhanced, enhanced=True, cached=source == "cache"))
+                IMAGES.inc(source=source)
+            seen.add(key)
+        return output
+
+    def _abandon(self, keys: list[str], error: str) -> None:
+        """Resolve the in-flight futures of `keys` still pending with `error` and unregister them."""
+        with self._lock:
+            for key in keys:
+                future = self._inflight.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_result((None, error))
+
+    def _fallback(self, data: bytes, error: str) -> EnhancementResult:
+        result = fallback_result(data, self.fallback, error)
+        IMAGES.inc(source="local" if result.local else "fallback")
+        return result
+
+    def _call(self, batch: list[tuple[str, bytes]], params: dict[str, Any]) -> None:
+        """Run one provider call and resolve its images' in-flight futures with (bytes, error)."""
+        kind = "batch" if len(batch) > 1 else "single"
+        outcomes: dict[str, tuple[Optional[bytes], Optional[str]]] = {}
+        IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            if kind == "single":
+                key, data = batch[0]
+                outcomes[key] = (self._post_single(data, params), None)
+            else:
+                outcomes = self._post_batch(batch, params)
+            REQUESTS.inc(kind=kind, outcome="ok")
+        except Exception as e:
+            outcome = "timeout" if "timeout" in type(e).__name__.lower() else "error"
+            REQUESTS.inc(kind=kind, outcome=outcome)
+            logger.warning("enhancement call failed, using originals kind=%s images=%d error=%s", kind, len(batch), e)
+            outcomes = {key: (None, str(e)) for key, _ in batch}
+        finally:
+            IN_FLIGHT.dec()
+            REQUEST_SECONDS.observe(time.perf_counter() - started, kind=kind)
+
+        resolved = {}
+        for key, _ in batch:
+            enhanced, error = outcomes.get(key, (None, "missing from provider response"))
+            if enhanced:
+                COST.inc(self.cost_per_image)
+            else:
+                enhanced, error = None, error or "empty enhancement result"
+            resolved[key] = (enhanced, error)
+        if self.cache is not None:
+            try:
+                self.cache.put_many({key: enhanced for key, (enhanced, _) in resolved.items() if enhanced})
+            except Exception as e:  # _call never raises: the futures below must be resolved
+                logger.warning("enhancement cache write failed error=%s", e)
+        for key, (enhanced, error) in resolved.items():
+            with self._lock:
+                future = self._inflight.get(key)
+                if future is not None and not future.done():  # Not abandoned by an aborted caller
+                    future.set_result((enhanced, error))
+
+    def _post(self, path: str, **kwargs) -> requests.Response:
+        return post_with_retries(
+            f"{self.api_url}{path}",
+            self.max_retries,
+            backoff=RETRY_BACKOFF_SECONDS,
+            max_backoff=MAX_RETRY_BACKOFF_SECONDS,
+            headers={"Authorization": f"Bearer {self.api_key}", **kwargs.pop("headers", {})},
+            timeout=self.timeout,
+            **kwargs,
+        )
+
+    def _post_single(self, data: bytes, params: dict[str, Any]) -> bytes:
+        response = self._post(
+            "/v1/enhance", params=params, data=data, headers={"Content-Type": "application/octet-stream"}
+        )
+        return response.content
+
+    def _post_batch(
+        self, batch: list[tuple[str, bytes]], params: dict[str, Any]
+    ) -> dict[str, tuple[Optional[bytes], Optional[str]]]:
+        payload = {
+            "params": params,
+            "images": [{"id": key, "data": base64.b64encode(data).decode()} for key, data in batch],
+        }
+        response = self._post("/v1/enhance:batch", json=payload)
+        outcomes = {}
+        for result in response.json().get("results", []):
+            if result.get("data"):
+                outcomes[result["id"]] = (base64.b64decode(result["data"]), None)
+            else:
+                outcomes[result.get("id")] = (None, result.get("error") or "empty enhancement result")
+        return outcomes
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_client: Optional[EnhancementClient] = None
+
+
+def get_enhancement_client() -> EnhancementClient:
+    """Get or create the process-wide enhancement client from settings."""
+    global _client
+    if _client is None:
+        _client = EnhancementClient(
+            api_url=settings.enhancement_api_url,
+            api_key=settings.enhancement_api_key,
+            concurrency=settings.enhancement_concurrency,
+            batch_size=settings.enhancement_batch_size,
+            timeout=settings.enhancement_timeout_seconds,
+            max_retries=settings.enhancement_max_retries,
+            cost_per_image=settings.enhancement_cost_per_image,
+            cache=EnhancementCache(get_blob_store(), settings.enhancement_cache_entries),
+            fallback=local_enhancer() if settings.enhancement_local_fallback else None,
+        )
+    return _client
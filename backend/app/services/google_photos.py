@@ -1,16 +1,26 @@
 """Google Photos API service."""
-from typing import Optional
-import requests
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
 
 from app.core.config import settings
 from app.core.encryption import decrypt_token
+from app.core.http_retry import post_with_retries
 from app.core.oauth import refresh_access_token, OAuthError
 from app.models import User, OAuthCredential
+from app.schemas import Album, AlbumList
 from sqlalchemy.orm import Session
 
-GOOGLE_PHOTOS_API_BASE = "https://photoslibrary.googleapis.com/v1"
+if TYPE_CHECKING:
+    import requests
+    from google.oauth2.credentials import Credentials
+
+GOOGLE_PHOTOS_API_BASE = settings.photos_library_api_base
+
+# Technical-spec §10: no more than 5 retries per upload
+MAX_UPLOAD_RETRIES = 5
+UPLOAD_RETRY_BACKOFF_SECONDS = 0.5
+UPLOAD_CHUNK_GRANULARITY = 256 * 1024  # Resumable chunks are multiples of this (except the last)
 
 
 class GooglePhotosError(Exception):
@@ -68,7 +78,7 @@ def get_user_credentials(user: User, db: Session) -> Credentials:
         raise GooglePhotosError(f"Failed to refresh credentials: {e}") from e
 
 
-def list_albums(user: User, db: Session, page_token: Optional[str] = None) -> dict:
+def list_albums(user: User, db: Session, page_token: Optional[str] = None) -> AlbumList:
     """
     List user's Google Photos albums.
 
@@ -78,11 +88,14 @@ def list_albums(user: User, db: Session, page_token: Optional[str] = None) -> di
         page_token: Optional page token for pagination.
 
     Returns:
-        Dict with 'albums' list and optional 'nextPageToken'.
+        AlbumList with albums and optional next_page_token.
 
     Raises:
         GooglePhotosError: If API call fails.
     """
+    import requests
+    from google.auth.transport.requests import Request
+
     credentials = get_user_credentials(user, db)
 
     # Get access token
@@ -108,23 +121,212 @@ def list_albums(user: User, db: Session, page_token: Optional[str] = None) -> di
         data = response.json()
 
         # Transform to our API format
-        albums = []
-        for album in data.get("albums", []):
-            albums.append(
-                {
-                    "id": album.get("id"),
-                    "title": album.get("title", ""),
-                    "mediaItemCount": int(album.get("mediaItemsCount", 0)),
-                    "productUrl": album.get("productUrl", ""),
-                }
+        albums = [
+            Album(
+                id=album.get("id"),
+                title=album.get("title", ""),
+                media_item_count=int(album.get("mediaItemsCount", 0)),
+                product_url=album.get("productUrl", ""),
             )
+            for album in data.get("albums", [])
+        ]
 
-        return {
-            "albums": albums,
-            "nextPageToken": data.get("nextPageToken"),
-        }
+        return AlbumList(albums=albums, next_page_token=data.get("nextPageToken"))
     except requests.exceptions.RequestException as e:
         raise GooglePhotosError(f"Google Photos API error: {e}") from e
     except Exception as e:
         raise GooglePhotosError(f"Failed to list albums: {e}") from e
 
+
+def _upload_post(url: str, max_retries: int = MAX_UPLOAD_RETRIES, **kwargs) -> requests.Response:
+    """POST under the upload retry policy (technical-spec §10)."""
+    return post_with_retries(url, max_retries, backoff=UPLOAD_RETRY_BACKOFF_SECONDS, **kwargs)
+
+
+def upload_media(credentials: Credentials, data: bytes, mime_type: str) -> str:
+    """
+    Upload raw media bytes to Google Photos.
+
+    Args:
+        credentials: Valid OAuth credentials.
+        data: Encoded media bytes.
+        mime_type: MIME type of the media (e.g. image/jpeg).
+
+    Returns:
+        Upload token to pass to `batch_create_media_items`.
+
+    Raises:
+        GooglePhotosError: If the upload fails after retries.
+    """
+    import requests
+
+    headers = {
+        "Authorization": f"Bearer {credentials.token}",
+        "Content-Type": "application/octet-stream",
+        "X-Goog-Upload-Content-Type": mime_type,
+        "X-Goog-Upload-Protocol": "raw",
+    }
+    try:
+        response = _upload_post(f"{GOOGLE_PHOTOS_API_BASE}/uploads", headers=headers, data=data, timeout=120)
+        return response.text
+    except requests.exceptions.RequestException as e:
+        raise GooglePhotosError(f"Google Photos upload error: {e}") from e
+
+
+def batch_create_media_items(
+    credentials: Credentials, upload_tokens: list[str], album_id: Optional[str] = None
+) -> list[dict]:
+    """
+    Create media items from upload tokens, optionally adding them to an album.
+
+    Args:
+        credentials: Valid OAuth credentials.
+        upload_tokens: Tokens returned by `upload_media` (at most 50 per call).
+        album_id: Optional app-created album to add the items to.
+
+    Returns:
+        List of newMediaItemResults from the API.
+
+    Raises:
+        GooglePhotosError: If the API call fails.
+    """
+    import requests
+
+    payload = {
+        "newMediaItems": [{"simpleMediaItem": {"uploadToken": token}} for token in upload_tokens],
+    }
+    if album_id:
+        payload["albumId"] = album_id
+    headers = {
+        "Authorization": f"Bearer {credentials.token}",
+        "Content-Type": "application/json",
+    }
+    try:
+        response = _upload_post(
+            f"{GOOGLE_PHOTOS_API_BASE}/mediaItems:batchCreate", headers=headers, json=payload, timeout=60
+        )
+        return response.json().get("newMediaItemResults", [])
+    except requests.exceptions.RequestException as e:
+        raise GooglePhotosError(f"Google Photos batchCreate error: {e}") from e
+
+
+def _upload_headers(credentials: Credentials, command: str, extra: dict) -> dict:
+    from google.auth.transport.requests import Request
+
+    if not credentials.valid:
+        credentials.refresh(Request())  # Long uploads outlive the access token
+    return {"Authorization": f"Bearer {credentials.token}", "X-Goog-Upload-Command": command, **extra}
+
+
+def start_resumable_upload(credentials: Credentials, mime_type: str, size: Optional[int] = None) -> tuple[str, int]:
+    """
+    Open a resumable upload session.
+
+    Args:
+        credentials: Valid OAuth credentials.
+        mime_type: MIME type of the media.
+        size: Total bytes, if known.
+
+    Returns:
+        (upload URL for `upload_chunk` and `query_resumable_upload`, chunk granularity in bytes).
+
+    Raises:
+        GooglePhotosError: If the session cannot be opened.
+    """
+    import requests
+
+    headers = _upload_headers(
+        credentials,
+        "start",
+        {"Content-Length": "0", "X-Goog-Upload-Content-Type": mime_type, "X-Goog-Upload-Protocol": "resumable"},
+    )
+    if size is not None:
+        headers["X-Goog-Upload-Raw-Size"] = str(size)
+    try:
+        response = _upload_post(f"{GOOGLE_PHOTOS_API_BASE}/uploads", headers=headers, timeout=60)
+    except requests.exceptions.RequestException as e:
+        raise GooglePhotosError(f"Google Photos upload session error: {e}") from e
+    upload_url = response.headers.get("X-Goog-Upload-URL")
+    if not upload_url:
+        raise GooglePhotosError("Google Photos did not return an upload URL")
+    granularity = int(response.headers.get("X-Goog-Upload-Chunk-Granularity", UPLOAD_CHUNK_GRANULARITY))
+    return upload_url, granularity
+
+
+def query_resumable_upload(
+    credentials: Credentials, upload_url: str, max_retries: int = MAX_UPLOAD_RETRIES
+) -> tuple[str, int, Optional[str]]:
+    """
+    Ask how much of a resumable upload Google has received.
+
+    Args:
+        credentials: Valid OAuth credentials.
+        upload_url: From `start_resumable_upload`.
+        max_retries: Retries on transient errors (0 when the caller has its own retry loop).
+
+    Returns:
+        (status: "active", "final" or "cancelled", bytes received, upload token if final).
+
+    Raises:
+        GooglePhotosError: If the query fails after retries.
+    """
+    import requests
+
+    headers = _upload_headers(credentials, "query", {"Content-Length": "0"})
+    try:
+        response = _upload_post(upload_url, max_retries, headers=headers, timeout=60)
+    except requests.exceptions.RequestException as e:
+        raise GooglePhotosError(f"Google Photos upload query error: {e}") from e
+    status = response.headers.get("X-Goog-Upload-Status", "active")
+    received = int(response.headers.get("X-Goog-Upload-Size-Received", "0"))
+    return status, received, response.text if status == "final" else None
+
+
+class _ChunkBody:
+    """File-like view of a chunk, so requests streams it without copying the whole chunk."""
+
+    def __init__(self, view: memoryview):
+        self._view = view
+        self._position = 0
+
+    def __len__(self) -> int:
+        return len(self._view) - self._position
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._view) if size is None or size < 0 else min(len(self._view), self._position + size)
+        data = bytes(self._view[self._position : end])
+        self._position = end
+        return data
+
+
+def upload_chunk(
+    credentials: Credentials, upload_url: str, offset: int, data: memoryview, finalize: bool = False
+) -> Optional[str]:
+    """
+    Send one chunk of a resumable upload (a single attempt; resume with `query_resumable_upload`).
+
+    Args:
+        credentials: Valid OAuth credentials.
+        upload_url: From `start_resumable_upload`.
+        offset: Position of the chunk in the media.
+        data: Chunk bytes; a multiple of the granularity unless `finalize`.
+        finalize: Whether this is the last chunk.
+
+    Returns:
+        Upload token after the last chunk, else None.
+
+    Raises:
+        requests.exceptions.RequestException: If the chunk was not accepted.
+    """
+    import requests
+
+    headers = _upload_headers(
+        credentials,
+        "upload, finalize" if finalize else "upload",
+        {"X-Goog-Upload-Offset": str(offset), "Content-Type": "application/octet-stream"},
+    )
+    body = _ChunkBody(data) if len(data) else b""
+    response = requests.post(upload_url, headers=headers, data=body, timeout=300)
+    response.raise_for_status()
+    return response.text if finalize else None
+
@@ -0,0 +1,286 @@
+"""Eager background ingestion of Picker selections.
+
+As soon as the backend sees a session's `mediaItemsSet` turn true (from the
+status endpoint or the status poller), it starts ingesting the selection
+in the background: pages through the items (filling the picker catalog so
+item requests are served from cache), downloads a bounded-size proxy of
+every photo to the local ingest cache, and computes its dedup hash and
+similarity signature. By the time the user starts processing, most of the
+download latency has already been paid.
+
+A failed ingestion is restarted by a later status observation only after
+a backoff (INGEST_RETRY_BACKOFF_SECONDS, doubling), and at most
+INGEST_MAX_ATTEMPTS runs are made per session, so a session that keeps
+failing is not re-ingested on every poll.
+
+State is kept in memory per process and bounded to the most recent
+sessions; evicted sessions have their cached proxies removed.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+import shutil
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from app.core.config import settings
+from app.core.http_retry import backoff_seconds
+from app.schemas import PickerMediaItem, PickerSessionStatus
+from app.schemas.photos import SESSION_ID_PATTERN
+from app.services.picker_api import (
+    PickerAPIError,
+    call_for_user,
+    download_media,
+    fetch_session_items,
+    get_user_credentials,
+    media_url,
+)
+from app.services.picker_catalog import picker_catalog
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+IngestionKey = tuple[uuid.UUID, str]
+
+MAX_RETRY_BACKOFF_SECONDS = 30 * 60
+
+_SESSION_ID = re.compile(SESSION_ID_PATTERN)
+
+
+@dataclass
+class IngestedItem:
+    """Proxy and hashes for one photo."""
+
+    media_item_id: str
+    proxy_path: str
+    width: int
+    height: int
+    dhash: int
+    signature: np.ndarray
+
+
+@dataclass
+class IngestionState:
+    """Progress of one session's ingestion."""
+
+    user_id: uuid.UUID
+    session_id: str
+    state: str = "pending"  # pending, running, completed, failed
+    attempt: int = 1  # Runs of this session's ingestion, this one included
+    items_total: int = 0
+    proxies_done: int = 0
+    skipped: int = 0  # Videos (no proxy needed for analysis)
+    failed: int = 0
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    items: dict[str, IngestedItem] = field(default_factory=dict)
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("completed", "failed")
+
+
+def _ingest_item(credentials, item: PickerMediaItem, proxy_dir: Path, max_side: int) -> IngestedItem:
+    """Download, store and hash one photo's proxy (runs in the ingestion thread pool)."""
+    from app.pipeline.dedup import dhash, similarity_signature
+    from app.pipeline.images import decode_image
+
+    data = download_media(credentials, media_url(item.base_url, max_side))
+    proxy_path = proxy_dir / f"{item.id}.jpg"
+    temp_path = proxy_path.with_suffix(".tmp")
+    temp_path.write_bytes(data)
+    os.replace(temp_path, proxy_path)
+
+    image = decode_image(data)
+    return IngestedItem(
+        media_item_id=item.id,
+        proxy_path=str(proxy_path),
+        width=image.shape[1],
+        height=image.shape[0],
+        dhash=dhash(image),
+        signature=similarity_signature(image),
+    )
+
+
+class IngestionManager:
+    """
+    Starts and tracks one background ingestion per (user, session).
+
+    Args:
+        concurrency: Proxies downloaded and hashed in parallel.
+        proxy_max_side: Longest side of downloaded proxies, in pixels.
+        cache_dir: Directory holding proxies (one subdirectory per session).
+        max_sessions: Ingestion states kept; the oldest finished ones are evicted.
+        max_attempts: Runs per session, the first included (failed runs are restarted up to this).
+        retry_backoff: Seconds after a failure before a restart, doubled after each further failure.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        proxy_max_side: int,
+        cache_dir: str,
+        max_sessions: int,
+        max_attempts: int = 3,
+        retry_backoff: float = 30.0,
+    ):
+        self.concurrency = concurrency
+        self.proxy_max_side = proxy_max_side
+        self.cache_dir = Path(cache_dir)
+        self.max_sessions = max_sessions
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self._states: OrderedDict[IngestionKey, IngestionState] = OrderedDict()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def on_status(self, user_id: uuid.UUID, session_id: str, status: PickerSessionStatus) -> None:
+        """Start ingestion when a session's selection is observed to be set."""
+        if settings.eager_ingestion_enabled and status.media_items_set:
+            self.start(user_id, session_id)
+
+    def start(self, user_id: uuid.UUID, session_id: str) -> IngestionState:
+        """
+        Start ingesting a session unless it is already running or done. Idempotent.
+
+        A failed ingestion is restarted once its retry backoff has passed, until
+        `max_attempts` runs have been made; until then its failed state is returned.
+
+        Raises:
+            ValueError: If `session_id` is not a Picker session id (it names a cache directory).
+        """
+        if not _SESSION_ID.match(session_id):
+            raise ValueError(f"Invalid Picker session id: {session_id!r}")
+        key = (user_id, session_id)
+        state = self._states.get(key)
+        if state is not None and not self._may_restart(state):
+            return state
+
+        attempt = state.attempt + 1 if state is not None else 1
+        state = IngestionState(user_id=user_id, session_id=session_id, attempt=attempt)
+        self._states[key] = state
+        self._states.move_to_end(key)
+        self._evict()
+        state.task = asyncio.create_task(self._run(state), name=f"ingest-{session_id}")
+        return state
+
+    def _may_restart(self, state: IngestionState) -> bool:
+        if state.state != "failed" or state.attempt >= self.max_attempts:
+            return False
+        wait = backoff_seconds(state.attempt - 1, self.retry_backoff, MAX_RETRY_BACKOFF_SECONDS)
+        return state.finished_at is not None and (datetime.now(timezone.utc) - state.finished_at).total_seconds() >= wait
+
+    def get(self, user_id: uuid.UUID, session_id: str) -> Optional[IngestionState]:
+        return self._states.get((user_id, session_id))
+
+    def _session_dir(self, state: IngestionState) -> Path:
+        return self.cache_dir / str(state.user_id) / state.session_id
+
+    def _evict(self) -> None:
+        finished = [key for key, state in self._states.items() if state.finished]
+        while len(self._states) > self.max_sessions and finished:
+            state = self._states.pop(finished.pop(0))
+            shutil.rmtree(self._session_dir(state), ignore_errors=True)
+
+    async def _run(self, state: IngestionState) -> None:
+        state.state = "running"
+        state.started_at = datetime.now(timezone.utc)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="ingest")
+        proxy_dir = self._session_dir(state)
+        proxy_dir.mkdir(parents=True, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+
+        async def worker(credentials) -> None:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                try:
+                    ingested = await loop.run_in_executor(
+                        self._executor, _ingest_item, credentials, item, proxy_dir, self.proxy_max_side
+                    )
+                    state.items[item.id] = ingested
+                    state.proxies_done += 1
+                except Exception as e:
+                    state.failed += 1
+                    logger.warning("ingestion item failed session_id=%s item_id=%s error=%s", state.session_id, item.id, e)
+
+        workers: list[asyncio.Task] = []
+        try:
+            credentials = await asyncio.to_thread(call_for_user, state.user_id, get_user_credentials)
+            workers = [asyncio.create_task(worker(credentials)) for _ in range(self.concurrency)]
+
+            page_token: Optional[str] = None
+            while True:
+                cached = picker_catalog.get(state.user_id, state.session_id, page_token)
+                if cached is not None:
+                    page = cached.page
+                else:
+                    page = await asyncio.to_thread(fetch_session_items, credentials, state.session_id, page_token)
+                    picker_catalog.put(state.user_id, state.session_id, page_token, page)
+                for item in page.media_items:
+                    state.items_total += 1
+                    if item.type == "VIDEO" or item.mime_type.startswith("video/"):
+                        state.skipped += 1
+                        continue
+                    await queue.put(item)
+                page_token = page.next_page_token
+                if not page_token:
+                    break
+
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+            state.state = "completed"
+            logger.info(
+                "ingestion completed session_id=%s items=%d proxies=%d failed=%d",
+                state.session_id, state.items_total, state.proxies_done, state.failed,
+            )
+        except PickerAPIError as e:
+            state.state = "failed"
+            state.error = str(e)
+            logger.warning("ingestion failed session_id=%s error=%s", state.session_id, e)
+        except Exception as e:
+            state.state = "failed"
+            state.error = f"Ingestion failed: {e}"
+            logger.exception("ingestion failed session_id=%s", state.session_id)
+        finally:
+            for task in workers:
+                task.cancel()
+            if state.state == "running":  # Cancelled
+                state.state = "failed"
+                state.error = "Ingestion cancelled"
+            state.finished_at = datetime.now(timezone.utc)
+
+    async def close(self) -> None:
+        """Cancel running ingestions (application shutdown)."""
+        tasks = [state.task for state in self._states.values() if state.task is not None and not state.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+ingestion_manager = IngestionManager(
+    concurrency=settings.ingest_concurrency,
+    proxy_max_side=settings.ingest_proxy_max_side,
+    cache_dir=settings.ingest_cache_dir,
+    max_sessions=settings.ingest_max_sessions,
+    max_attempts=settings.ingest_max_attempts,
+    retry_backoff=settings.ingest_retry_backoff_seconds,
+)
@@ -0,0 +1,297 @@
+"""In-memory job progress with throttled writes to the jobs table.
+
+Pipeline stages report progress per photo, which would mean one `jobs` row
+update per photo. Instead, progress is kept in memory per job and a single
+flusher task writes the dirty jobs in one batched UPDATE, at most every
+`JOB_PROGRESS_FLUSH_MS` per job unless `JOB_PROGRESS_FLUSH_ITEMS` items
+have accumulated. Stage changes and terminal states are written right away.
+
+`GET /api/jobs/{jobId}` reads the in-memory state when the job runs in this
+process and falls back to the database otherwise. Finished jobs are dropped
+from memory once their final state is written.
+"""
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from sqlalchemy.engine import Engine
+
+from app.core import partitions
+from app.core.bulk import update_rows
+from app.core.config import settings
+from app.core.database import get_engine
+from app.models.job import Job
+from app.schemas import JobStatus
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages in order (technical-spec §4.2); overall progress is spread evenly across them
+JOB_STAGES = (
+    "importing_album",
+    "deduping_photos",
+    "enhancing_photos",
+    "sharpening_images",
+    "correcting_tilts",
+    "cropping_images",
+    "selecting_hero_images",
+    "selecting_album_cover",
+    "restyling_hero_images",
+    "uploading_to_google_photos",
+)
+TERMINAL_STATUSES = ("completed", "failed")
+
+FLUSH_COLUMNS = (
+    "status",
+    "stage",
+    "progress",
+    "input_photo_count",
+    "output_photo_count",
+    "output_album_id",
+    "error_message",
+    "started_at",
+    "completed_at",
+)
+
+
+@dataclass
+class JobProgress:
+    """Live state of one job running in this process."""
+
+    job_id: uuid.UUID
+    user_id: uuid.UUID
+    status: str
+    created_at: Optional[datetime] = None  # Partition key of the jobs row
+    stage: Optional[str] = None
+    stage_done: int = 0
+    stage_total: int = 0
+    input_photo_count: int = 0
+    output_photo_count: int = 0
+    google_album_id: Optional[str] = None
+    output_album_id: Optional[str] = None
+    error_message: Optional[str] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    # Flush bookkeeping
+    dirty: bool = False
+    urgent: bool = False
+    unflushed_items: int = 0
+    last_flush: float = field(default_factory=time.monotonic)
+
+    @property
+    def progress(self) -> float:
+        if self.status == "completed":
+            return 1.0
+        if self.stage not in JOB_STAGES:
+            return 0.0
+        within = self.stage_done / self.stage_total if self.stage_total else 0.0
+        return round((JOB_STAGES.index(self.stage) + min(within, 1.0)) / len(JOB_STAGES), 4)
+
+    def row(self) -> tuple:
+        values = {**{column: getattr(self, column) for column in FLUSH_COLUMNS}, "progress": self.progress}
+        return (self.job_id, *(values[column] for column in FLUSH_COLUMNS))
+
+    def snapshot(self) -> JobStatus:
+        return JobStatus(
+            job_id=str(self.job_id),
+            status=self.status,
+            stage=self.stage,
+            progress=self.progress,
+            input_photo_count=self.input_photo_count,
+            output_photo_count=self.output_photo_count,
+            google_album_id=self.google_album_id,
+            output_album_id=self.output_album_id,
+            started_at=self.started_at,
+            completed_at=self.completed_at,
+            error_message=self.error_message,
+        )
+
+
+class JobProgressTracker:
+    """
+    Coalesces progress updates for the jobs running in this process.
+
+    Update methods are thread-safe and never touch the database; the
+    flusher task started with `start()` does the writes.
+
+    Args:
+        flush_interval: Seconds between writes of a job that keeps changing.
+        flush_items: Items advanced since the last write that force an early write.
+        engine_factory: Returns the engine to write with.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float,
+        flush_items: int,
+        engine_factory: Callable[[], Engine] = get_engine,
+    ):
+        self.flush_interval = flush_interval
+        self.flush_items = flush_items
+        self.engine_factory = engine_factory
+        self.updates = 0
+        self.rows_written = 0
+        self.flushes = 0
+        self._jobs: dict[uuid.UUID, JobProgress] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, job: Job) -> JobProgress:
+        """Start tracking a job picked up by this process."""
+        state = JobProgress(
+            job_id=job.id,
+            user_id=job.user_id,
+            status=job.status,
+            created_at=job.created_at,
+            stage=job.stage,
+            input_photo_count=job.input_photo_count or 0,
+            output_photo_count=job.output_photo_count or 0,
+            google_album_id=job.google_album_id,
+            output_album_id=job.output_album_id,
+            started_at=job.started_at or datetime.now(timezone.utc),
+        )
+        with self._lock:
+            self._jobs[job.id] = state
+            self._mark(state, urgent=True)
+        return state
+
+    def get(self, job_id: uuid.UUID) -> Optional[JobProgress]:
+        return self._jobs.get(job_id)
+
+    def start_stage(self, job_id: uuid.UUID, stage: str, total: int) -> None:
+        """Move a job to a new stage with `total` items to process."""
+        with self._lock:
+            state = self._jobs[job_id]
+            state.status = state.stage = stage
+            state.stage_done, state.stage_total = 0, total
+            self._mark(state, urgent=True)
+
+    def advance(self, job_id: uuid.UUID, items: int = 1) -> None:
+        """Record `items` more items processed in the current stage."""
+        with self._lock:
+            state = self._jobs[job_id]
+            state.stage_done += items
+            state.unflushed_items += items
+            self._mark(state, urgent=state.unflushed_items >= self.flush_items)
+
+    def set_counts(
+        self, job_id: uuid.UUID, input_photo_count: Optional[int] = None, output_photo_count: Optional[int] = None
+    ) -> None:
+        with self._lock:
+            state = self._jobs[job_id]
+            if input_photo_count is not None:
+                state.input_photo_count = input_photo_count
+            if output_photo_count is not None:
+                state.output_photo_count = output_photo_count
+            self._mark(state)
+
+    def complete(self, job_id: uuid.UUID, output_album_id: Optional[str] = None) -> None:
+        with self._lock:
+            state = self._jobs[job_id]
+            state.status, state.stage = "completed", None
+            state.output_album_id = output_album_id or state.output_album_id
+            state.completed_at = datetime.now(timezone.utc)
+            self._mark(state, urgent=True)
+
+    def fail(self, job_id: uuid.UUID, error_message: str) -> None:
+        with self._lock:
+            state = self._jobs[job_id]
+            state.status, state.error_message = "failed", error_message
+            state.completed_at = datetime.now(timezone.utc)
+            self._mark(state, urgent=True)
+
+    def _mark(self, state: JobProgress, urgent: bool = False) -> None:
+        state.dirty = True
+        state.urgent = state.urgent or urgent
+        self.updates += 1
+        if state.urgent and self._loop is not None and self._wakeup is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:  # Loop closed
+                pass
+
+    def flush(self, force: bool = False) -> int:
+        """
+        Write due jobs (all dirty jobs if `force`) in one transaction, one statement per creation month.
+
+        Returns:
+            Number of jobs written.
+        """
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                state
+                for state in self._jobs.values()
+                if state.dirty and (force or state.urgent or now - state.last_flush >= self.flush_interval)
+            ]
+            # One statement per month, bounded by it so only that jobs partition is scanned
+            months: dict[Optional[datetime], list[tuple]] = {}
+            for state in due:
+                month = partitions.month_start(state.created_at) if state.created_at is not None else None
+                months.setdefault(month, []).append(state.row())
+            for state in due:
+                state.dirty = state.urgent = False
+                state.unflushed_items = 0
+                state.last_flush = now
+        if not due:
+            return 0
+        try:
+            with self.engine_factory().begin() as connection:
+                for month, rows in months.items():
+                    ranges = {"created_at": (month, partitions.add_months(month, 1))} if month is not None else None
+                    update_rows(connection, Job.__table__, ("id",), FLUSH_COLUMNS, rows, ranges=ranges)
+        except Exception:
+            with self._lock:
+                for state in due:
+                    state.dirty = True
+            raise
+        with self._lock:
+            for state in due:
+                if state.status in TERMINAL_STATUSES and not state.dirty:
+                    self._jobs.pop(state.job_id, None)
+        self.rows_written += len(due)
+        self.flushes += 1
+        return len(due)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                logger.warning("job progress flush failed error=%s", e)
+
+    def start(self) -> None:
+        """Start the flusher task on the running loop (application startup)."""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="job-progress-flusher")
+
+    async def close(self) -> None:
+        """Stop the flusher and write everything pending (application shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = self._loop = self._wakeup = None
+        try:
+            await asyncio.to_thread(self.flush, True)
+        except Exception as e:
+            logger.warning("final job progress flush failed error=%s", e)
+
+
+job_progress = JobProgressTracker(
+    flush_interval=settings.job_progress_flush_ms / 1000,
+    flush_items=settings.job_progress_flush_items,
+)
@@ -0,0 +1,214 @@
+"""People coverage scoring for hero and album-cover selection (technical-spec §6.4/§6.5).
+
+`score_people` runs incrementally per job:
+
+- photos already clustered for the job (`face_clusters`) are skipped;
+- faces of new photos come from `face_embeddings` by content hash when any
+  job has analysed the same bytes, otherwise from `FaceAnalyzer` on a proxy;
+- new faces join the job's identity clusters (`IdentityClusterer`);
+- `people_coverage_score` (identities in the photo / identities in the
+  album) is written in bulk for every photo whose score changed.
+
+Work is linear in new faces; photos are processed in chunks of
+PEOPLE_CHUNK_PHOTOS, with one cache lookup and one cache write per chunk.
+"""
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.database import get_engine
+from app.models.face_cluster import FaceCluster
+from app.models.face_embedding import FaceEmbedding
+from app.pipeline.faces import FaceAnalyzer, IdentityClusterer
+from app.pipeline.images import decode_image
+from app.services.photo_store import PhotoWriteBuffer
+
+logger = logging.getLogger(__name__)
+
+PEOPLE_CHUNK_PHOTOS = 256
+STAGE = "selecting_hero_images"
+
+_analyzers = threading.local()
+
+
+def get_face_analyzer() -> FaceAnalyzer:
+    """This thread's face analyzer, configured from settings (OpenCV models are not thread-safe)."""
+    analyzer = getattr(_analyzers, "analyzer", None)
+    if analyzer is None:
+        analyzer = FaceAnalyzer(settings.face_detector_model, settings.face_recognizer_model)
+        _analyzers.analyzer = analyzer
+    return analyzer
+
+
+@dataclass
+class PeopleStats:
+    """What one `score_people` run did."""
+
+    photos_new: int = 0  # Photos not clustered for this job before
+    photos_analyzed: int = 0  # New photos run through face detection
+    photos_cached: int = 0  # New photos whose faces came from the embedding cache
+    faces: int = 0  # Faces in new photos
+    identities: int = 0  # Identities in the album after the run
+    scores_written: int = 0
+    seconds: float = 0.0
+
+
+def coverage_scores(assignments: dict[str, list[int]], identities: int) -> dict[str, float]:
+    """People coverage per photo: distinct identities in it over identities in the album."""
+    if identities == 0:
+        return {media_item_id: 0.0 for media_item_id in assignments}
+    return {media_item_id: len(set(ids)) / identities for media_item_id, ids in assignments.items()}
+
+
+def _load_cluster(engine: Engine, job_id: uuid.UUID, analyzer: FaceAnalyzer) -> tuple[IdentityClusterer, dict]:
+    table = FaceCluster.__table__
+    with engine.connect() as connection:
+        row = connection.execute(
+            select(table.c.model, table.c.state, table.c.assignments).where(table.c.job_id == job_id)
+        ).first()
+    if row is None or row.model != analyzer.model_id:
+        if row is not None:
+            logger.info("face model changed, re-clustering job_id=%s old=%s new=%s", job_id, row.model, analyzer.model_id)
+        return IdentityClusterer(analyzer.match_threshold), {}
+    return IdentityClusterer.from_bytes(row.state, analyzer.match_threshold), dict(row.assignments)
+
+
+def _save_cluster(
+    engine: Engine, job_id: uuid.UUID, analyzer: FaceAnalyzer, clusterer: IdentityClusterer, assignments: dict
+) -> None:
+    values = {
+        "job_id": job_id,
+        "model": analyzer.model_id,
+        "state": clusterer.to_bytes(),
+        "assignments": assignments,
+        "updated_at": datetime.now(timezone.utc),
+    }
+    statement = insert(FaceCluster.__table__).values(**values)
+    statement = statement.on_conflict_do_update(
+        index_elements=["job_id"], set_={key: statement.excluded[key] for key in values if key != "job_id"}
+    )
+    with engine.begin() as connection:
+        connection.execute(statement)
+
+
+def _cached_embeddings(engine: Engine, digests: list[str], model: str) -> dict[str, np.ndarray]:
+    if not digests:
+        return {}
+    table = FaceEmbedding.__table__
+    statement = select(table.c.content_digest, table.c.face_count, table.c.embeddings).where(
+        table.c.model == model, table.c.content_digest.in_(digests)
+    )
+    with engine.connect() as connection:
+        rows = connection.execute(statement).all()
+    return {
+        row.content_digest: (
+            np.frombuffer(row.embeddings, dtype=np.float32).reshape(row.face_count, -1)
+            if row.face_count
+            else np.zeros((0, 1), np.float32)
+        )
+        for row in rows
+    }
+
+
+def _store_embeddings(engine: Engine, found: dict[str, np.ndarray], model: str) -> None:
+    if not found:
+        return
+    rows = [
+        {
+            "content_digest": digest,
+            "model": model,
+            "face_count": len(embeddings),
+            "embeddings": np.ascontiguousarray(embeddings, dtype=np.float32).tobytes(),
+            "created_at": datetime.now(timezone.utc),
+        }
+        for digest, embeddings in found.items()
+    ]
+    with engine.begin() as connection:
+        connection.execute(insert(FaceEmbedding.__table__).values(rows).on_conflict_do_nothing())
+
+
+def score_people(
+    job_id: uuid.UUID,
+    photos: Iterable[tuple[str, bytes]],
+    analyzer: Optional[FaceAnalyzer] = None,
+    engine_factory: Callable[[], Engine] = get_engine,
+) -> PeopleStats:
+    """
+    Cluster the faces of a job's new photos and write people coverage scores.
+
+    Args:
+        job_id: Job whose photos are scored (rows must exist in `photos`).
+        photos: (media item id, encoded image) for the job's photos; photos
+            already clustered for the job are skipped without decoding.
+        analyzer: Face analyzer; this thread's default one if None.
+        engine_factory: Returns the engine for cache, cluster and score writes.
+
+    Returns:
+        PeopleStats for the run.
+
+    Raises:
+        RuntimeError: If OpenCV is not installed.
+        ValueError: If FACE_RECOGNIZER_MODEL is set without FACE_DETECTOR_MODEL.
+    """
+    started = time.perf_counter()
+    analyzer = analyzer or get_face_analyzer()
+    engine = engine_factory()
+    stats = PeopleStats()
+    clusterer, assignments = _load_cluster(engine, job_id, analyzer)
+    identities_before = clusterer.identities
+    scores_before = coverage_scores(assignments, identities_before)
+
+    new_photos = ((media_item_id, data) for media_item_id, data in photos if media_item_id not in assignments)
+    while True:
+        chunk = list(islice(new_photos, PEOPLE_CHUNK_PHOTOS))
+        if not chunk:
+            break
+        digests = [hashlib.sha256(data).hexdigest() for _, data in chunk]
+        cached = _cached_embeddings(engine, list(set(digests)), analyzer.model_id)
+        found: dict[str, np.ndarray] = {}
+        for (media_item_id, data), digest in zip(chunk, digests):
+            embeddings = cached.get(digest)
+            if embeddings is None:
+                embeddings = found.get(digest)
+            if embeddings is None:
+                embeddings = analyzer.analyze(decode_image(data)).embeddings
+                found[digest] = embeddings
+                stats.photos_analyzed += 1
+            else:
+                stats.photos_cached += 1
+            assignments[media_item_id] = clusterer.assign(embeddings)
+            stats.faces += len(embeddings)
+            stats.photos_new += 1
+        _store_embeddings(engine, found, analyzer.model_id)
+
+    scores = coverage_scores(assignments, clusterer.identities)
+    changed = {
+        media_item_id: score for media_item_id, score in scores.items() if scores_before.get(media_item_id) != score
+    }
+    with PhotoWriteBuffer(job_id, STAGE, engine_factory=engine_factory) as buffer:
+        for media_item_id, score in changed.items():
+            buffer.update(media_item_id, people_coverage_score=score)
+    if stats.photos_new or clusterer.identities != identities_before:
+        _save_cluster(engine, job_id, analyzer, clusterer, assignments)
+
+    stats.identities = clusterer.identities
+    stats.scores_written = len(changed)
+    stats.seconds = time.perf_counter() - started
+    logger.info(
+        "people scored job_id=%s new=%d analyzed=%d cached=%d faces=%d identities=%d scores=%d ms=%.0f",
+        job_id, stats.photos_new, stats.photos_analyzed, stats.photos_cached, stats.faces,
+        stats.identities, stats.scores_written, stats.seconds * 1000,
+    )
+    return stats
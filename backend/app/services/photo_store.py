@@ -0,0 +1,183 @@
+"""Buffered bulk persistence of per-photo rows.
+
+Each pipeline stage writes through its own `PhotoWriteBuffer`. Inserts and
+updates are collected in memory and written in one transaction when the
+buffer reaches `max_rows`, when `max_delay` seconds have passed since the
+oldest pending write, or on `flush()` / `close()`. Inserts use COPY;
+updates are grouped by the set of columns they touch and applied with
+`app.core.bulk.update_rows`. Photos are addressed by
+(job_id, original_media_item_id), so stages never need row ids.
+
+Rows also carry the job's `created_at` as `job_created_at`, the partition
+key of `photos` (see `app.core.partitions`). The buffer looks it up once
+per job, sets it on inserts and adds it to updates as a constant, so every
+write only touches the job's month partition.
+
+Inserts are flushed before updates, but buffers are independent: a stage
+that updates rows another stage inserts should run after that stage's
+buffer is flushed.
+"""
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.bulk import copy_rows, update_rows
+from app.core.config import settings
+from app.core.database import get_engine
+from app.models.job import Job
+from app.models.photo import Photo
+
+logger = logging.getLogger(__name__)
+
+PHOTO_TABLE = Photo.__table__
+KEY_COLUMNS = ("job_id", "original_media_item_id")
+PARTITION_COLUMN = "job_created_at"
+WRITABLE_COLUMNS = frozenset(PHOTO_TABLE.c.keys()) - {"id", "created_at", PARTITION_COLUMN, *KEY_COLUMNS}
+
+
+def _check_columns(values: dict[str, Any]) -> None:
+    unknown = set(values) - WRITABLE_COLUMNS
+    if unknown:
+        raise ValueError(f"Unknown photo columns: {', '.join(sorted(unknown))}")
+
+
+class PhotoWriteBuffer:
+    """
+    Write buffer for one stage of one job. Thread-safe.
+
+    Args:
+        job_id: Job whose photos are written.
+        stage: Stage name (for logs).
+        max_rows: Pending writes that trigger a flush.
+        max_delay: Seconds a write may stay pending before the next write or
+            `flush_if_due()` flushes it.
+        engine_factory: Returns the engine to write with.
+        job_created_at: The job's `created_at`; looked up at the first flush if None.
+    """
+
+    def __init__(
+        self,
+        job_id: uuid.UUID,
+        stage: str,
+        max_rows: Optional[int] = None,
+        max_delay: Optional[float] = None,
+        engine_factory: Callable[[], Engine] = get_engine,
+        job_created_at: Optional[datetime] = None,
+    ):
+        self.job_id = job_id
+        self.job_created_at = job_created_at
+        self.stage = stage
+        self.max_rows = max_rows if max_rows is not None else settings.photo_write_buffer_rows
+        self.max_delay = max_delay if max_delay is not None else settings.photo_write_buffer_seconds
+        self.engine_factory = engine_factory
+        self.rows_inserted = 0
+        self.rows_updated = 0
+        self.flushes = 0
+        self._inserts: dict[str, dict[str, Any]] = {}
+        self._updates: dict[str, dict[str, Any]] = {}
+        self._oldest: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return len(self._inserts) + len(self._updates)
+
+    def insert(self, media_item_id: str, **values: Any) -> None:
+        """Queue a new photo row; columns not given get their server defaults."""
+        _check_columns(values)
+        with self._lock:
+            self._inserts[media_item_id] = values
+            self._added()
+
+    def update(self, media_item_id: str, **values: Any) -> None:
+        """Queue column updates for a photo; repeated updates to one photo are merged."""
+        _check_columns(values)
+        if not values:
+            return
+        with self._lock:
+            pending_insert = self._inserts.get(media_item_id)
+            if pending_insert is not None:
+                pending_insert.update(values)
+            else:
+                self._updates.setdefault(media_item_id, {}).update(values)
+            self._added()
+
+    def _added(self) -> None:
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        if self.pending >= self.max_rows or time.monotonic() - self._oldest >= self.max_delay:
+            self._flush_locked()
+
+    def flush_if_due(self) -> None:
+        """Flush if the oldest pending write has waited `max_delay` seconds."""
+        with self._lock:
+            if self._oldest is not None and time.monotonic() - self._oldest >= self.max_delay:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """Write everything pending now."""
+        with self._lock:
+            self._flush_locked()
+
+    def _partition_key(self, connection: Connection) -> datetime:
+        if self.job_created_at is None:
+            created_at = connection.execute(select(Job.created_at).where(Job.id == self.job_id)).scalar()
+            if created_at is None:
+                raise ValueError(f"Job not found: {self.job_id}")
+            self.job_created_at = created_at
+        return self.job_created_at
+
+    def _flush_locked(self) -> None:
+        if not self.pending:
+            self._oldest = None
+            return
+        inserts, updates = self._inserts, self._updates
+        started = time.perf_counter()
+
+        inserted = updated = 0
+        with self.engine_factory().begin() as connection:
+            partition_key = self._partition_key(connection)
+            insert_groups: dict[tuple[str, ...], list[tuple]] = {}
+            for media_item_id, values in inserts.items():
+                columns = tuple(sorted(values))
+                insert_groups.setdefault(columns, []).append(
+                    (self.job_id, media_item_id, partition_key, *(values[c] for c in columns))
+                )
+            update_groups: dict[tuple[str, ...], list[tuple]] = {}
+            for media_item_id, values in updates.items():
+                columns = tuple(sorted(values))
+                update_groups.setdefault(columns, []).append((self.job_id, media_item_id, *(values[c] for c in columns)))
+
+            for columns, rows in insert_groups.items():
+                inserted += copy_rows(connection, PHOTO_TABLE, [*KEY_COLUMNS, PARTITION_COLUMN, *columns], rows)
+            for columns, rows in update_groups.items():
+                updated += update_rows(
+                    connection, PHOTO_TABLE, KEY_COLUMNS, columns, rows, where={PARTITION_COLUMN: partition_key}
+                )
+
+        # Only drop pending writes once they are committed, so a failed flush can be retried
+        self._inserts, self._updates, self._oldest = {}, {}, None
+        self.rows_inserted += inserted
+        self.rows_updated += updated
+        self.flushes += 1
+        logger.debug(
+            "photo buffer flushed job_id=%s stage=%s inserted=%d updated=%d ms=%.1f",
+            self.job_id, self.stage, inserted, updated, (time.perf_counter() - started) * 1000,
+        )
+
+    def close(self) -> None:
+        """Flush remaining writes."""
+        self.flush()
+
+    def __enter__(self) -> "PhotoWriteBuffer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
@@ -1,16 +1,28 @@
 """Google Photos Picker API service."""
-from typing import Optional
-import requests
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
+from __future__ import annotations
+
+import uuid
+from typing import TYPE_CHECKING, Any, Callable, Optional
 
 from app.core.config import settings
+from app.core.database import SessionLocal
 from app.core.encryption import decrypt_token
 from app.core.oauth import refresh_access_token, OAuthError
 from app.models import User, OAuthCredential
+from app.schemas import (
+    PickerMediaItem,
+    PickerMediaItemList,
+    PickerPollingConfig,
+    PickerSession,
+    PickerSessionStatus,
+)
 from sqlalchemy.orm import Session
 
-PICKER_API_BASE = "https://photospicker.googleapis.com/v1"
+if TYPE_CHECKING:
+    import requests
+    from google.oauth2.credentials import Credentials
+
+PICKER_API_BASE = settings.picker_api_base
 
 
 class PickerAPIError(Exception):
@@ -68,7 +80,52 @@ def get_user_credentials(user: User, db: Session) -> Credentials:
         raise PickerAPIError(f"Failed to refresh credentials: {e}") from e
 
 
-def create_picker_session(user: User, db: Session) -> dict:
+def call_for_user(user_id: uuid.UUID, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run `fn(user, db, *args, **kwargs)` with its own database session.
+
+    For work that outlives or is shared between requests (coalesced calls,
+    background pollers), which must not borrow a request's session.
+
+    Raises:
+        PickerAPIError: If the user no longer exists.
+    """
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        if user is None:
+            raise PickerAPIError("User not found")
+        return fn(user, db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+def to_media_item(item: dict) -> PickerMediaItem:
+    """
+    Convert a Picker API media item to our API format.
+
+    Picker API structure: item.mediaFile.baseUrl, item.mediaFile.mimeType, etc.
+    Note: baseUrl needs =d parameter appended for full resolution download.
+    """
+    media_file = item.get("mediaFile", {})
+    base_url = media_file.get("baseUrl", "")
+    # Append =d for full resolution download (or =wXXX-hYYY for specific dimensions)
+    # If already has parameters, don't add =d
+    if base_url and "=" not in base_url:
+        base_url = base_url + "=d"
+
+    return PickerMediaItem(
+        id=item.get("id"),
+        filename=media_file.get("filename", ""),
+        mime_type=media_file.get("mimeType", ""),
+        media_metadata=media_file.get("mediaFileMetadata", {}),
+        base_url=base_url,
+        type=item.get("type", ""),
+        create_time=item.get("createTime", ""),
+    )
+
+
+def create_picker_session(user: User, db: Session) -> PickerSession:
     """
     Create a new Picker API session.
 
@@ -77,11 +134,14 @@ def create_picker_session(user: User, db: Session) -> dict:
         db: Database session.
 
     Returns:
-        Dict with session_id and pickerUri.
+        PickerSession with session_id and picker_uri.
 
     Raises:
         PickerAPIError: If session creation fails.
     """
+    import requests
+    from google.auth.transport.requests import Request
+
     credentials = get_user_credentials(user, db)
 
     # Get access token
@@ -102,17 +162,79 @@ def create_picker_session(user: User, db: Session) -> dict:
 
         data = response.json()
 
-        return {
-            "sessionId": data.get("id"),  # API returns "id", not "sessionId"
-            "pickerUri": data.get("pickerUri"),
-        }
+        return PickerSession(
+            session_id=data.get("id"),  # API returns "id", not "sessionId"
+            picker_uri=data.get("pickerUri"),
+        )
     except requests.exceptions.RequestException as e:
         raise PickerAPIError(f"Picker API error: {e}") from e
     except Exception as e:
         raise PickerAPIError(f"Failed to create picker session: {e}") from e
 
 
-def get_picker_session_status(user: User, db: Session, session_id: str) -> dict:
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse a Google protobuf Duration string (e.g. "5s", "1.5s") into seconds."""
+    if not value or not value.endswith("s"):
+        return None
+    try:
+        return float(value[:-1])
+    except ValueError:
+        return None
+
+
+def fetch_session_status(credentials: Credentials, session_id: str) -> PickerSessionStatus:
+    """
+    Fetch the status of a Picker API session with already-resolved credentials.
+
+    Args:
+        credentials: OAuth credentials (refreshed here if expired).
+        session_id: Picker session ID.
+
+    Returns:
+        PickerSessionStatus with session status information.
+
+    Raises:
+        PickerAPIError: If status check fails.
+    """
+    import requests
+    from google.auth.transport.requests import Request
+
+    try:
+        # Get access token
+        if not credentials.valid:
+            request = Request()
+            credentials.refresh(request)
+
+        url = f"{PICKER_API_BASE}/sessions/{session_id}"
+        headers = {
+            "Authorization": f"Bearer {credentials.token}",
+            "Content-Type": "application/json",
+        }
+
+        response = requests.get(url, headers=headers, timeout=30)
+        response.raise_for_status()
+
+        data = response.json()
+
+        polling_config = data.get("pollingConfig")
+        return PickerSessionStatus(
+            session_id=data.get("id"),  # API returns "id", not "sessionId"
+            media_items_set=data.get("mediaItemsSet", False),
+            state=data.get("state"),
+            polling_config=PickerPollingConfig(
+                poll_interval=polling_config.get("pollInterval"),
+                timeout_in=polling_config.get("timeoutIn"),
+            )
+            if polling_config
+            else None,
+        )
+    except requests.exceptions.RequestException as e:
+        raise PickerAPIError(f"Picker API error: {e}") from e
+    except Exception as e:
+        raise PickerAPIError(f"Failed to get session status: {e}") from e
+
+
+def get_picker_session_status(user: User, db: Session, session_id: str) -> PickerSessionStatus:
     """
     Get the status of a Picker API session.
 
@@ -122,44 +244,73 @@ def get_picker_session_status(user: User, db: Session, session_id: str) -> dict:
         session_id: Picker session ID.
 
     Returns:
-        Dict with session status information.
+        PickerSessionStatus with session status information.
 
     Raises:
         PickerAPIError: If status check fails.
     """
     credentials = get_user_credentials(user, db)
+    return fetch_session_status(credentials, session_id)
 
-    # Get access token
-    if not credentials.valid:
-        request = Request()
-        credentials.refresh(request)
 
-    url = f"{PICKER_API_BASE}/sessions/{session_id}"
-    headers = {
-        "Authorization": f"Bearer {credentials.token}",
-        "Content-Type": "application/json",
-    }
+def fetch_session_items(
+    credentials: Credentials, session_id: str, page_token: Optional[str] = None
+) -> PickerMediaItemList:
+    """
+    Fetch one page of a Picker session's media items with already-resolved credentials.
+
+    Args:
+        credentials: OAuth credentials (refreshed here if expired).
+        session_id: Picker session ID.
+        page_token: Optional page token for pagination.
+
+    Returns:
+        PickerMediaItemList with media_items and optional next_page_token.
+
+    Raises:
+        PickerAPIError: If fetching items fails.
+    """
+    import requests
+    from google.auth.transport.requests import Request
 
     try:
-        response = requests.get(url, headers=headers, timeout=30)
+        # Get access token
+        if not credentials.valid:
+            request = Request()
+            credentials.refresh(request)
+
+        # Picker API: GET /v1/mediaItems?sessionId={sessionId}
+        # sessionId must be a query parameter, not in the path
+        url = f"{PICKER_API_BASE}/mediaItems"
+        headers = {
+            "Authorization": f"Bearer {credentials.token}",
+            "Content-Type": "application/json",
+        }
+        params = {
+            "sessionId": session_id,  # Required: sessionId as query param
+            "pageSize": 50,
+        }
+        if page_token:
+            params["pageToken"] = page_token
+
+        response = requests.get(url, headers=headers, params=params, timeout=30)
         response.raise_for_status()
 
         data = response.json()
 
-        return {
-            "sessionId": data.get("id"),  # API returns "id", not "sessionId"
-            "mediaItemsSet": data.get("mediaItemsSet", False),
-            "state": data.get("state"),  # PENDING, ACTIVE, COMPLETED, EXPIRED
-        }
+        return PickerMediaItemList(
+            media_items=[to_media_item(item) for item in data.get("mediaItems", [])],
+            next_page_token=data.get("nextPageToken"),
+        )
     except requests.exceptions.RequestException as e:
         raise PickerAPIError(f"Picker API error: {e}") from e
     except Exception as e:
-        raise PickerAPIError(f"Failed to get session status: {e}") from e
+        raise PickerAPIError(f"Failed to get session items: {e}") from e
 
 
 def get_picker_session_items(
     user: User, db: Session, session_id: str, page_token: Optional[str] = None
-) -> dict:
+) -> PickerMediaItemList:
     """
     Get media items selected in a Picker API session.
 
@@ -170,69 +321,53 @@ def get_picker_session_items(
         page_token: Optional page token for pagination.
 
     Returns:
-        Dict with mediaItems list and optional nextPageToken.
+        PickerMediaItemList with media_items and optional next_page_token.
 
     Raises:
         PickerAPIError: If fetching items fails.
     """
     credentials = get_user_credentials(user, db)
+    return fetch_session_items(credentials, session_id, page_token)
 
-    # Get access token
-    if not credentials.valid:
-        request = Request()
-        credentials.refresh(request)
 
-    # Picker API: GET /v1/mediaItems?sessionId={sessionId}
-    # sessionId must be a query parameter, not in the path
-    url = f"{PICKER_API_BASE}/mediaItems"
-    headers = {
-        "Authorization": f"Bearer {credentials.token}",
-        "Content-Type": "application/json",
-    }
-    params = {
-        "sessionId": session_id,  # Required: sessionId as query param
-        "pageSize": 50,
-    }
-    if page_token:
-        params["pageToken"] = page_token
+def media_url(base_url: str, max_side: Optional[int] = None) -> str:
+    """
+    Build a download URL from a media item's baseUrl.
 
-    try:
-        response = requests.get(url, headers=headers, params=params, timeout=30)
-        
-        response.raise_for_status()
+    Args:
+        base_url: `PickerMediaItem.base_url` (may already end in "=d").
+        max_side: Bound both dimensions to this many pixels (aspect ratio is kept);
+            None downloads the full-resolution original.
+    """
+    if base_url.endswith("=d"):
+        base_url = base_url[:-2]
+    return f"{base_url}=w{max_side}-h{max_side}" if max_side else f"{base_url}=d"
 
-        data = response.json()
 
-        # Transform to our API format
-        # Picker API structure: item.mediaFile.baseUrl, item.mediaFile.mimeType, etc.
-        # Note: baseUrl needs =d parameter appended for full resolution download
-        media_items = []
-        for item in data.get("mediaItems", []):
-            media_file = item.get("mediaFile", {})
-            base_url = media_file.get("baseUrl", "")
-            # Append =d for full resolution download (or =wXXX-hYYY for specific dimensions)
-            # If already has parameters, don't add =d
-            if base_url and "=" not in base_url:
-                base_url = base_url + "=d"
-            
-            media_items.append(
-                {
-                    "id": item.get("id"),
-                    "filename": media_file.get("filename", ""),
-                    "mimeType": media_file.get("mimeType", ""),
-                    "mediaMetadata": media_file.get("mediaFileMetadata", {}),
-                    "baseUrl": base_url,  # Now includes =d for full resolution
-                    "type": item.get("type", ""),  # PHOTO or VIDEO
-                    "createTime": item.get("createTime", ""),
-                }
-            )
+def video_url(base_url: str) -> str:
+    """Build the download URL of a video's original bytes ("=dv") from its baseUrl."""
+    if base_url.endswith("=d"):
+        base_url = base_url[:-2]
+    return f"{base_url}=dv"
 
-        return {
-            "mediaItems": media_items,
-            "nextPageToken": data.get("nextPageToken"),
-        }
+
+def download_media(credentials: Credentials, url: str) -> bytes:
+    """
+    Download media bytes from a Picker baseUrl (which requires the OAuth token).
+
+    Raises:
+        PickerAPIError: If the download fails.
+    """
+    import requests
+    from google.auth.transport.requests import Request
+
+    try:
+        if not credentials.valid:
+            credentials.refresh(Request())
+        response = requests.get(url, headers={"Authorization": f"Bearer {credentials.token}"}, timeout=60)
+        response.raise_for_status()
+        return response.content
     except requests.exceptions.RequestException as e:
-        raise PickerAPIError(f"Picker API error: {e}") from e
+        raise PickerAPIError(f"Media download error: {e}") from e
     except Exception as e:
-        raise PickerAPIError(f"Failed to get session items: {e}") from e
-
+        raise PickerAPIError(f"Failed to download media: {e}") from e
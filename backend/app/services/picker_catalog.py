@@ -0,0 +1,93 @@
+"""In-memory catalog of Picker media-item pages.
+
+Once a Picker session's selection is set, its item pages do not change, so
+each page fetched from Google is kept here (serialized, with its ETag) and
+served again without contacting Google, including 304s on revalidation.
+
+Entries expire before Google's media `baseUrl`s do (they are valid for 60
+minutes), and the catalog is bounded by page count with LRU eviction.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.config import settings
+from app.core.etag import compute_etag
+from app.schemas import PickerMediaItemList
+
+CatalogKey = tuple[uuid.UUID, str, Optional[str]]
+
+
+@dataclass(frozen=True)
+class CatalogPage:
+    """A cached page of session items."""
+
+    page: PickerMediaItemList
+    body: bytes  # JSON as served to clients
+    etag: str
+    expires_at: float
+
+
+class PickerCatalog:
+    """
+    Thread-safe LRU cache of Picker item pages keyed by (user, session, page token).
+
+    Args:
+        ttl_seconds: Lifetime of a page.
+        max_pages: Maximum number of pages kept.
+    """
+
+    def __init__(self, ttl_seconds: float, max_pages: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_pages = max_pages
+        self._pages: OrderedDict[CatalogKey, CatalogPage] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: uuid.UUID, session_id: str, page_token: Optional[str] = None) -> Optional[CatalogPage]:
+        """Return the cached page, or None if missing or expired."""
+        key = (user_id, session_id, page_token)
+        with self._lock:
+            entry = self._pages.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._pages[key]
+                return None
+            self._pages.move_to_end(key)
+            return entry
+
+    def put(
+        self, user_id: uuid.UUID, session_id: str, page_token: Optional[str], page: PickerMediaItemList
+    ) -> CatalogPage:
+        """Serialize and store a page fetched from Google."""
+        body = page.model_dump_json(by_alias=True).encode()
+        entry = CatalogPage(
+            page=page, body=body, etag=compute_etag(body), expires_at=time.monotonic() + self.ttl_seconds
+        )
+        if self.max_pages <= 0:
+            return entry
+        key = (user_id, session_id, page_token)
+        with self._lock:
+            self._pages[key] = entry
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        return entry
+
+    def invalidate_session(self, user_id: uuid.UUID, session_id: str) -> None:
+        """Drop all pages of a session."""
+        with self._lock:
+            for key in [key for key in self._pages if key[:2] == (user_id, session_id)]:
+                del self._pages[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pages.clear()
+
+
+picker_catalog = PickerCatalog(
+    ttl_seconds=settings.picker_catalog_ttl_seconds, max_pages=settings.picker_catalog_max_pages
+)
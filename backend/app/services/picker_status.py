@@ -0,0 +1,195 @@
+"""Shared Picker session status polling with fan-out to subscribers.
+
+Each (user, session) has at most one poller per process, no matter how many
+clients subscribe. The poller resolves the user's credentials once, then
+polls Google at an adaptive interval: never faster than the session's
+`pollingConfig.pollInterval`, backing off while nothing changes and resetting
+when the status changes. Every change is pushed to all subscribers. Polling
+stops when the session is final, when `pollingConfig.timeoutIn` elapses, or
+when the last subscriber leaves.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from app.core.config import settings
+from app.schemas import PickerSessionStatus
+from app.services.ingestion import ingestion_manager
+from app.services.picker_api import (
+    PickerAPIError,
+    call_for_user,
+    fetch_session_status,
+    get_user_credentials,
+    parse_duration,
+)
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_FACTOR = 1.5
+MAX_CONSECUTIVE_ERRORS = 5
+
+PollerKey = tuple[uuid.UUID, str]
+
+
+@dataclass(frozen=True)
+class StatusEvent:
+    """A message delivered to subscribers: a status update or a terminal error."""
+
+    status: Optional[PickerSessionStatus] = None
+    error: Optional[str] = None
+
+    @property
+    def is_last(self) -> bool:
+        return self.error is not None or (self.status is not None and self.status.is_final)
+
+
+class _SessionPoller:
+    """Polls one Picker session and fans events out to subscriber queues."""
+
+    def __init__(self, hub: "SessionStatusHub", user_id: uuid.UUID, session_id: str):
+        self.hub = hub
+        self.user_id = user_id
+        self.session_id = session_id
+        self.subscribers: set[asyncio.Queue] = set()
+        self.last_event: Optional[StatusEvent] = None
+        self.polls = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self.task = asyncio.create_task(self._run(), name=f"picker-status-{self.session_id}")
+
+    def add(self, queue: asyncio.Queue) -> None:
+        self.subscribers.add(queue)
+        if self.last_event is not None:
+            _offer(queue, self.last_event)
+
+    def _publish(self, event: StatusEvent) -> None:
+        self.last_event = event
+        for queue in self.subscribers:
+            _offer(queue, event)
+
+    def _next_interval(self, interval: float, status: PickerSessionStatus, changed: bool) -> float:
+        floor = settings.picker_poll_min_interval_seconds
+        if status.polling_config is not None:
+            floor = max(floor, parse_duration(status.polling_config.poll_interval) or 0.0)
+        if changed:
+            return floor
+        return max(floor, min(interval * BACKOFF_FACTOR, settings.picker_poll_max_interval_seconds))
+
+    async def _run(self) -> None:
+        try:
+            await self._poll()
+        except Exception:
+            # Anything unexpected (e.g. a database error while loading credentials) still ends the stream;
+            # the details stay in the log
+            logger.exception("picker status poller failed session_id=%s", self.session_id)
+            self._publish(StatusEvent(error="Picker session status polling failed"))
+        finally:
+            self.hub._finished(self)
+
+    async def _poll(self) -> None:
+        try:
+            credentials = await asyncio.to_thread(call_for_user, self.user_id, get_user_credentials)
+        except PickerAPIError as e:
+            self._publish(StatusEvent(error=str(e)))
+            return
+
+        interval = settings.picker_poll_min_interval_seconds
+        deadline: Optional[float] = None
+        errors = 0
+        previous: Optional[PickerSessionStatus] = None
+        while True:
+            try:
+                status = await asyncio.to_thread(fetch_session_status, credentials, self.session_id)
+                self.polls += 1
+                errors = 0
+            except PickerAPIError as e:
+                errors += 1
+                if errors >= MAX_CONSECUTIVE_ERRORS:
+                    self._publish(StatusEvent(error=str(e)))
+                    return
+                logger.warning("picker status poll failed session_id=%s error=%s", self.session_id, e)
+                await asyncio.sleep(min(interval * BACKOFF_FACTOR**errors, settings.picker_poll_max_interval_seconds))
+                continue
+
+            changed = status != previous
+            if changed:
+                self._publish(StatusEvent(status=status))
+                ingestion_manager.on_status(self.user_id, self.session_id, status)
+                previous = status
+            if status.is_final:
+                return
+
+            if deadline is None and status.polling_config is not None:
+                timeout = parse_duration(status.polling_config.timeout_in)
+                if timeout is not None:
+                    deadline = time.monotonic() + timeout
+            if deadline is not None and time.monotonic() >= deadline:
+                self._publish(StatusEvent(error="Picker session polling timed out"))
+                return
+
+            interval = self._next_interval(interval, status, changed)
+            await asyncio.sleep(interval)
+
+
+def _offer(queue: asyncio.Queue, event: StatusEvent) -> None:
+    """Deliver the latest event, dropping an undelivered older one (only the newest status matters)."""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+class SessionStatusHub:
+    """Registry of per-session pollers for this process."""
+
+    def __init__(self):
+        self._pollers: dict[PollerKey, _SessionPoller] = {}
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: uuid.UUID, session_id: str) -> AsyncIterator[asyncio.Queue]:
+        """
+        Subscribe to status events for a session, starting its poller if needed.
+
+        Yields:
+            Queue of StatusEvent; the last event has `is_last` set.
+        """
+        key = (user_id, session_id)
+        poller = self._pollers.get(key)
+        if poller is None:
+            poller = _SessionPoller(self, user_id, session_id)
+            self._pollers[key] = poller
+            poller.start()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        poller.add(queue)
+        try:
+            yield queue
+        finally:
+            poller.subscribers.discard(queue)
+            if not poller.subscribers and poller.task is not None and not poller.task.done():
+                poller.task.cancel()
+                # Unregister now so a subscriber arriving before the task unwinds gets a fresh poller
+                self._finished(poller)
+
+    def _finished(self, poller: _SessionPoller) -> None:
+        key = (poller.user_id, poller.session_id)
+        if self._pollers.get(key) is poller:
+            del self._pollers[key]
+
+    @property
+    def active_pollers(self) -> int:
+        return len(self._pollers)
+
+    async def close(self) -> None:
+        """Cancel all pollers (application shutdown)."""
+        tasks = [poller.task for poller in self._pollers.values() if poller.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._pollers.clear()
+
+
+status_hub = SessionStatusHub()
@@ -0,0 +1,289 @@
+"""Restyle stage for hero images (technical-spec §6.6).
+
+Only hero images are sent to the restyle provider, each in one style. The
+provider is called over HTTP with RESTYLE_API_KEY as a bearer token:
+
+    POST {RESTYLE_API_URL}/v1/restyle?style=<style>
+        body: image bytes -> restyled image bytes
+
+Originals and restyled outputs are stored side by side in the blob store,
+referenced by the job. Every render is recorded in `restyle_renders` by
+(source content hash, style), so re-running a job, or a job whose hero
+selection changed, only calls the provider for pairs never rendered before.
+Concurrent requests for the same pair share one call, and at most
+RESTYLE_CONCURRENCY calls are in flight per process.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Engine
+
+from app.core.blob_store import BlobStore, get_blob_store
+from app.core.config import settings
+from app.core.database import get_engine
+from app.core.http_retry import post_with_retries
+from app.core.metrics import registry
+from app.models.restyle_render import RestyleRender
+from app.services.enhancement import MAX_RETRY_BACKOFF_SECONDS, RETRY_BACKOFF_SECONDS
+
+logger = logging.getLogger(__name__)
+
+STYLES = ("anime", "ghibli")
+
+REQUESTS = registry.counter("restyle_requests_total", "Restyle provider calls by style and outcome", ("style", "outcome"))
+REQUEST_SECONDS = registry.histogram("restyle_request_seconds", "Restyle provider call latency", ("style",))
+IMAGES = registry.counter(
+    "restyle_images_total", "Restyle stage images by where the render came from", ("source",)
+)
+
+
+class RestyleError(Exception):
+    """Raised when the restyle provider is not configured or fails."""
+
+    pass
+
+
+@dataclass
+class RestyleItem:
+    """One photo offered to the restyle stage."""
+
+    media_item_id: str
+    data: bytes  # Original encoded image
+    is_hero: bool
+    style: Optional[str] = None  # Overrides the stage's style for this photo
+
+
+@dataclass
+class RestyleOutcome:
+    """Result of the restyle stage for one hero image."""
+
+    media_item_id: str
+    style: str
+    original_digest: str
+    restyled_digest: Optional[str]  # None if restyling failed
+    source: str  # "api", "cache", "shared" (same pair earlier in the run or in flight) or "failed"
+    error: Optional[str] = None
+
+
+class RestyleClient:
+    """
+    Restyle provider client with a per-process concurrency cap.
+
+    Args:
+        api_url: Provider base URL; restyling is disabled if None.
+        api_key: Provider API key.
+        concurrency: Provider calls in flight at once.
+        timeout: Seconds per provider call.
+        max_retries: Retries on timeouts, connection errors and retryable statuses.
+    """
+
+    def __init__(self, api_url: Optional[str], api_key: Optional[str], concurrency: int, timeout: float, max_retries: int):
+        self.api_url = api_url.rstrip("/") if api_url else None
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._slots = asyncio.Semaphore(concurrency)
+        self._inflight: dict[tuple[str, str], asyncio.Future] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_url and self.api_key)
+
+    def _post(self, data: bytes, style: str) -> bytes:
+        started = time.perf_counter()
+        try:
+            response = post_with_retries(
+                f"{self.api_url}/v1/restyle",
+                self.max_retries,
+                backoff=RETRY_BACKOFF_SECONDS,
+                max_backoff=MAX_RETRY_BACKOFF_SECONDS,
+                params={"style": style},
+                data=data,
+                headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/octet-stream"},
+                timeout=self.timeout,
+            )
+        except Exception:
+            REQUESTS.inc(style=style, outcome="error")
+            raise
+        finally:
+            REQUEST_SECONDS.observe(time.perf_counter() - started, style=style)
+        if not response.content:
+            REQUESTS.inc(style=style, outcome="error")
+            raise RestyleError("empty restyle result")
+        REQUESTS.inc(style=style, outcome="ok")
+        return response.content
+
+    async def restyle(self, source_digest: str, data: bytes, style: str) -> tuple[bytes, bool]:
+        """
+        Restyle an image, sharing the call with concurrent requests for the same (content, style).
+
+        Returns:
+            (restyled bytes, whether the result came from another caller's call).
+        """
+        if not self.enabled:
+            raise RestyleError("restyle provider not configured")
+        key = (source_digest, style)
+        future = self._inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            async with self._slots:
+                result = await asyncio.to_thread(self._post, data, style)
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # Retrieved here, so unshared failures are not logged twice
+            raise
+        finally:
+            del self._inflight[key]
+
+
+_client: Optional[RestyleClient] = None
+
+
+def get_restyle_client() -> RestyleClient:
+    """Get or create the process-wide restyle client from settings."""
+    global _client
+    if _client is None:
+        _client = RestyleClient(
+            api_url=settings.restyle_api_url,
+            api_key=settings.restyle_api_key,
+            concurrency=settings.restyle_concurrency,
+            timeout=settings.restyle_timeout_seconds,
+            max_retries=settings.restyle_max_retries,
+        )
+    return _client
+
+
+def _lookup_renders(engine: Engine, pairs: list[tuple[str, str]]) -> dict[tuple[str, str], str]:
+    """Known output digests for (source digest, style) pairs."""
+    if not pairs:
+        return {}
+    table = RestyleRender.__table__
+    statement = select(table.c.source_digest, table.c.style, table.c.output_digest).where(
+        tuple_(table.c.source_digest, table.c.style).in_(pairs)
+    )
+    with engine.connect() as connection:
+        return {(row.source_digest, row.style): row.output_digest for row in connection.execute(statement)}
+
+
+def _record_renders(engine: Engine, renders: dict[tuple[str, str], str]) -> None:
+    """Upsert renders (a pair re-rendered after its output was evicted gets the new digest)."""
+    if not renders:
+        return
+    statement = insert(RestyleRender.__table__).values(
+        [{"source_digest": source, "style": style, "output_digest": output} for (source, style), output in renders.items()]
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["source_digest", "style"], set_={"output_digest": statement.excluded.output_digest}
+    )
+    with engine.begin() as connection:
+        connection.execute(statement)
+
+
+def _keep_existing(store: BlobStore, known: dict[tuple[str, str], str], owner: str) -> dict[tuple[str, str], str]:
+    """Reference known outputs still in the store for `owner`; drop evicted ones."""
+    kept = {}
+    for pair, digest in known.items():
+        if store.exists(digest):
+            store.add_ref(digest, owner)
+            kept[pair] = digest
+    return kept
+
+
+async def restyle_heroes(
+    job_id: uuid.UUID,
+    items: Sequence[RestyleItem],
+    style: str,
+    client: Optional[RestyleClient] = None,
+    store: Optional[BlobStore] = None,
+    engine_factory: Callable[[], Engine] = get_engine,
+) -> list[RestyleOutcome]:
+    """
+    Run the `restyling_hero_images` stage.
+
+    Non-hero items are skipped without any work. Hero originals are stored in
+    the blob store for the job; (content, style) pairs with a stored render
+    are reused, and the rest are restyled concurrently (duplicates within
+    the run share one call). New renders are recorded in one statement.
+
+    Args:
+        job_id: Job owning the stored blobs.
+        items: Photos of the job, with hero flags.
+        style: Style for heroes without their own (one of STYLES).
+        client: Restyle client; the process-wide one if None.
+        store: Blob store; the process-wide one if None.
+        engine_factory: Returns the engine for render lookups and writes.
+
+    Returns:
+        One outcome per hero, in input order.
+
+    Raises:
+        ValueError: If a style is not supported.
+    """
+    client = client or get_restyle_client()
+    store = store or get_blob_store()
+    owner = str(job_id)
+    heroes = [item for item in items if item.is_hero]
+    IMAGES.inc(len(items) - len(heroes), source="skipped")
+    styles = [item.style or style for item in heroes]
+    unsupported = set(styles) - set(STYLES)
+    if unsupported:
+        raise ValueError(f"Unsupported restyle styles: {', '.join(sorted(unsupported))}")
+
+    originals = await asyncio.to_thread(lambda: [store.put(item.data, owner=owner).digest for item in heroes])
+    pairs = list(dict.fromkeys(zip(originals, styles)))
+    known = await asyncio.to_thread(_lookup_renders, engine_factory(), pairs)
+    outputs = await asyncio.to_thread(_keep_existing, store, known, owner)
+    sources = {pair: "cache" for pair in outputs}
+    errors: dict[tuple[str, str], str] = {}
+
+    data_by_digest = {digest: item.data for digest, item in zip(originals, heroes)}
+    missing = [pair for pair in pairs if pair not in outputs]
+
+    async def render(pair: tuple[str, str]) -> None:
+        source_digest, pair_style = pair
+        try:
+            data, shared = await client.restyle(source_digest, data_by_digest[source_digest], pair_style)
+            outputs[pair] = (await asyncio.to_thread(store.put, data, owner)).digest
+            sources[pair] = "shared" if shared else "api"
+        except Exception as e:
+            logger.warning(
+                "restyle failed job_id=%s source=%s style=%s error=%s", job_id, source_digest[:12], pair_style, e
+            )
+            errors[pair] = str(e)
+
+    await asyncio.gather(*(render(pair) for pair in missing))
+    new_renders = {pair: outputs[pair] for pair in missing if pair in outputs}
+    await asyncio.to_thread(_record_renders, engine_factory(), new_renders)
+
+    outcomes = []
+    seen: set[tuple[str, str]] = set()
+    for item, digest, item_style in zip(heroes, originals, styles):
+        pair = (digest, item_style)
+        if pair in outputs:
+            source = "shared" if pair in seen else sources[pair]
+            outcomes.append(RestyleOutcome(item.media_item_id, item_style, digest, outputs[pair], source))
+        else:
+            source = "failed"
+            outcomes.append(RestyleOutcome(item.media_item_id, item_style, digest, None, source, errors.get(pair)))
+        IMAGES.inc(source=source)
+        seen.add(pair)
+    logger.info(
+        "restyle stage done job_id=%s heroes=%d skipped=%d provider_calls=%d",
+        job_id, len(heroes), len(items) - len(heroes), sum(1 for pair in missing if sources.get(pair) == "api"),
+    )
+    return outcomes
@@ -0,0 +1,183 @@
+"""Partition maintenance and retention of jobs and photos.
+
+`jobs` and `photos` are partitioned by creation month (see
+`app.core.partitions`). Every PARTITION_MAINTENANCE_INTERVAL_S, one
+process (whichever takes the advisory lock):
+
+- creates the partitions of the current month and PARTITION_MONTHS_AHEAD
+  months after it, so new rows never land in the default partitions;
+- purges every month older than JOB_RETENTION_MONTHS full months: the
+  blob references of its jobs are released first (`BlobStore.release_owner`,
+  so their temp blobs become evictable), then the job's face clusters are
+  deleted and the month's photos and jobs partitions are dropped.
+
+Blob release is idempotent, so a purge that fails after it (e.g. the DDL
+timed out waiting for a lock) is simply repeated on the next run.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.engine import Connection, Engine
+
+from app.core import partitions
+from app.core.blob_store import BlobStore, get_blob_store
+from app.core.config import settings
+from app.core.database import get_engine
+from app.core.metrics import registry
+from app.models.face_cluster import FaceCluster
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+ADVISORY_LOCK_KEY = 0x766F7961  # Serializes maintenance across processes
+LOCK_TIMEOUT_MS = 2000  # Partition DDL gives up rather than queue traffic behind it
+
+PARTITIONS_CREATED = registry.counter("partitions_created_total", "Month partitions created")
+PARTITIONS_DROPPED = registry.counter("partitions_dropped_total", "Month partitions dropped by retention")
+JOBS_PURGED = registry.counter("retention_jobs_purged_total", "Jobs removed by retention")
+
+
+@dataclass
+class MaintenanceStats:
+    """What one `maintain_partitions` run did."""
+
+    skipped: bool = False  # Another process holds the maintenance lock
+    created: list[str] = field(default_factory=list)
+    dropped: list[str] = field(default_factory=list)
+    jobs_purged: int = 0
+    blob_refs_released: int = 0
+    seconds: float = 0.0
+
+
+def _lock(connection: Connection) -> bool:
+    """Take the maintenance lock for this transaction; False if another process has it."""
+    connection.exec_driver_sql(f"SET LOCAL lock_timeout = {LOCK_TIMEOUT_MS}")
+    return bool(connection.exec_driver_sql(f"SELECT pg_try_advisory_xact_lock({ADVISORY_LOCK_KEY})").scalar())
+
+
+def expired_before(retention_months: int, now: Optional[datetime] = None) -> datetime:
+    """Start of the oldest month kept: months before it are purged."""
+    return partitions.add_months(partitions.month_start(now or datetime.now(timezone.utc)), -retention_months)
+
+
+def purge_month(engine: Engine, month: datetime, store: BlobStore, stats: MaintenanceStats) -> None:
+    """Release the blob references of a month's jobs, then drop the month with its photos."""
+    end = partitions.add_months(month, 1)
+    with engine.connect() as connection:
+        job_ids = connection.execute(
+            select(Job.id).where(Job.created_at >= month, Job.created_at < end)
+        ).scalars().all()
+    for job_id in job_ids:
+        stats.blob_refs_released += store.release_owner(str(job_id))
+
+    with engine.begin() as connection:
+        if not _lock(connection):
+            stats.skipped = True
+            return
+        if job_ids:
+            connection.execute(delete(FaceCluster.__table__).where(FaceCluster.job_id.in_(job_ids)))
+        dropped = partitions.drop_month(connection, month)
+    stats.dropped += dropped
+    stats.jobs_purged += len(job_ids)
+    PARTITIONS_DROPPED.inc(len(dropped))
+    JOBS_PURGED.inc(len(job_ids))
+
+
+def maintain_partitions(
+    retention_months: Optional[int] = None,
+    months_ahead: Optional[int] = None,
+    now: Optional[datetime] = None,
+    engine_factory: Callable[[], Engine] = get_engine,
+    store_factory: Callable[[], BlobStore] = get_blob_store,
+) -> MaintenanceStats:
+    """
+    Create upcoming month partitions and purge expired months.
+
+    Args:
+        retention_months: Full months kept before the current one (0 = keep
+            everything); JOB_RETENTION_MONTHS if None.
+        months_ahead: Months after the current one to create; PARTITION_MONTHS_AHEAD if None.
+        now: Current time (for tests and backfills).
+        engine_factory: Returns the engine to use.
+        store_factory: Returns the blob store whose references purged jobs drop.
+
+    Returns:
+        MaintenanceStats for the run.
+    """
+    started = time.perf_counter()
+    retention_months = settings.job_retention_months if retention_months is None else retention_months
+    months_ahead = settings.partition_months_ahead if months_ahead is None else months_ahead
+    engine = engine_factory()
+    stats = MaintenanceStats()
+
+    with engine.begin() as connection:
+        if not _lock(connection):
+            stats.skipped = True
+            return stats
+        stats.created = partitions.ensure_partitions(connection, months_ahead, now)
+        expired = []
+        if retention_months > 0:
+            cutoff = expired_before(retention_months, now)
+            expired = [
+                partition.month for partition in partitions.list_partitions(connection, "jobs") if partition.month < cutoff
+            ]
+        default_rows = connection.exec_driver_sql("SELECT EXISTS (SELECT 1 FROM jobs_default)").scalar()
+    PARTITIONS_CREATED.inc(len(stats.created))
+    if default_rows:
+        logger.warning("jobs_default partition has rows: they are never purged; create their month partitions")
+
+    store = store_factory() if expired else None
+    for month in expired:
+        purge_month(engine, month, store, stats)
+        if stats.skipped:
+            break
+
+    stats.seconds = time.perf_counter() - started
+    if stats.created or stats.dropped or stats.skipped:
+        logger.info(
+            "partition maintenance created=%s dropped=%s jobs_purged=%d blob_refs=%d skipped=%s ms=%.0f",
+            ",".join(stats.created) or "-", ",".join(stats.dropped) or "-", stats.jobs_purged,
+            stats.blob_refs_released, stats.skipped, stats.seconds * 1000,
+        )
+    return stats
+
+
+class PartitionMaintainer:
+    """
+    Runs `maintain_partitions` in the background every `interval` seconds.
+
+    Args:
+        interval: Seconds between runs.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(maintain_partitions)
+            except Exception as e:
+                # Usually a lock timeout behind a long transaction; retried next run
+                logger.warning("partition maintenance failed error=%s", e)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start maintenance on the running loop, with a first run right away (application startup)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="partition-maintenance")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+partition_maintainer = PartitionMaintainer(interval=settings.partition_maintenance_interval_s)
@@ -0,0 +1,265 @@
+"""Weighted fair scheduling of job work across users.
+
+Jobs are split into per-photo work units (blocking callables). Units run on
+a shared pool of SCHEDULER_WORKERS threads, and which unit runs next is
+decided per tenant (user):
+
+- users are served in order of virtual time, which advances by 1/weight
+  per unit dispatched, so with equal weights every active user gets an
+  equal share of workers however large their jobs are (start-time fair
+  queuing; a user becoming active starts at the current virtual time, so
+  idle periods do not bank credit);
+- a user never has more than SCHEDULER_USER_MAX_CONCURRENCY units running;
+- within a user, the job with the fewest remaining units goes first, so
+  small jobs finish quickly even behind a large one.
+
+A user's state is dropped once they have nothing queued or running, so
+memory follows active users only (a returning user starts at the current
+virtual time, as above). `tenant_stats()` reports active users; wait times
+per job are on its `JobRun`. Metrics are labelled by priority class
+(`priority_class` of the user's weight), never by user, so their label
+sets stay bounded.
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Sequence
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+QUEUE_DEPTH = registry.gauge("scheduler_queue_depth", "Work units waiting, per priority class", ("priority",))
+RUNNING = registry.gauge("scheduler_running_units", "Work units running, per priority class", ("priority",))
+WAIT_SECONDS = registry.histogram(
+    "scheduler_unit_wait_seconds", "Time work units waited in the queue, per priority class", ("priority",)
+)
+
+WorkUnit = Callable[[], Any]
+
+
+def priority_class(weight: float) -> str:
+    """Metrics label of a scheduling weight: "high" above 1, "low" below 1, else "normal"."""
+    if weight > 1.0:
+        return "high"
+    return "low" if weight < 1.0 else "normal"
+
+
+@dataclass
+class JobRun:
+    """A submitted job: its units, results and completion."""
+
+    job_id: uuid.UUID
+    user_id: uuid.UUID
+    total: int
+    submitted_at: float
+    done: int = 0
+    failed: int = 0
+    results: list = field(default_factory=list)  # Per unit: its return value, or the exception it raised
+    finished_at: Optional[float] = None
+    wait_seconds_total: float = 0.0  # Queue wait of the units dispatched so far
+    max_wait_seconds: float = 0.0
+    _pending: deque = field(default_factory=deque, repr=False)
+    _future: Optional[asyncio.Future] = field(default=None, repr=False)
+
+    @property
+    def remaining(self) -> int:
+        return self.total - self.done
+
+    @property
+    def mean_wait_seconds(self) -> float:
+        dispatched = self.total - len(self._pending)
+        return self.wait_seconds_total / dispatched if dispatched else 0.0
+
+    async def wait(self) -> "JobRun":
+        """Wait until every unit has run."""
+        await asyncio.shield(self._future)
+        return self
+
+
+@dataclass
+class TenantStats:
+    """Scheduling state of one user."""
+
+    queued: int = 0
+    running: int = 0
+    weight: float = 1.0
+    served: int = 0
+    wait_seconds_total: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    @property
+    def mean_wait_seconds(self) -> float:
+        return self.wait_seconds_total / self.served if self.served else 0.0
+
+
+@dataclass
+class _Tenant:
+    user_id: uuid.UUID
+    stats: TenantStats
+    virtual_time: float = 0.0
+    jobs: list = field(default_factory=list)  # JobRuns with pending units
+
+
+class FairScheduler:
+    """
+    Weighted fair scheduler of work units across users. Use from one event loop.
+
+    Args:
+        workers: Units running at once overall.
+        user_max_concurrency: Units running at once per user.
+    """
+
+    def __init__(self, workers: int, user_max_concurrency: int):
+        self.workers = workers
+        self.user_max_concurrency = user_max_concurrency
+        self._tenants: dict[uuid.UUID, _Tenant] = {}
+        self._weights: dict[uuid.UUID, float] = {}
+        self._virtual_time = 0.0
+        self._running = 0
+        self._tasks: set[asyncio.Task] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def set_weight(self, user_id: uuid.UUID, weight: float) -> None:
+        """Share of workers for a user relative to others (default 1.0)."""
+        if weight <= 0:
+            raise ValueError("Scheduler weight must be positive")
+        self._weights[user_id] = weight
+        tenant = self._tenants.get(user_id)
+        if tenant is not None:
+            old, new = priority_class(tenant.stats.weight), priority_class(weight)
+            if old != new:  # Move the tenant's units to the gauges of its new class
+                QUEUE_DEPTH.dec(tenant.stats.queued, priority=old)
+                RUNNING.dec(tenant.stats.running, priority=old)
+                QUEUE_DEPTH.inc(tenant.stats.queued, priority=new)
+                RUNNING.inc(tenant.stats.running, priority=new)
+            tenant.stats.weight = weight
+
+    def submit(self, job_id: uuid.UUID, user_id: uuid.UUID, units: Sequence[WorkUnit]) -> JobRun:
+        """
+        Queue a job's work units.
+
+        Returns:
+            JobRun; await `run.wait()` for completion. Results are in unit order.
+        """
+        now = time.monotonic()
+        run = JobRun(job_id=job_id, user_id=user_id, total=len(units), submitted_at=now)
+        run.results = [None] * len(units)
+        run._pending = deque((index, unit, now) for index, unit in enumerate(units))
+        run._future = asyncio.get_running_loop().create_future()
+        if not units:
+            run.finished_at = now
+            run._future.set_result(None)
+            return run
+
+        tenant = self._tenants.get(user_id)
+        if tenant is None:
+            # Active again (or for the first time): no credit for the time away
+            tenant = _Tenant(
+                user_id=user_id,
+                stats=TenantStats(weight=self._weights.get(user_id, 1.0)),
+                virtual_time=self._virtual_time,
+            )
+            self._tenants[user_id] = tenant
+        tenant.jobs.append(run)
+        tenant.stats.queued += len(units)
+        QUEUE_DEPTH.inc(len(units), priority=priority_class(tenant.stats.weight))
+        self._dispatch()
+        return run
+
+    def tenant_stats(self) -> dict[uuid.UUID, TenantStats]:
+        """Per-user queue depth, running units and wait times, for users with work queued or running."""
+        return {user_id: tenant.stats for user_id, tenant in self._tenants.items()}
+
+    def _next(self) -> Optional[tuple[uuid.UUID, _Tenant]]:
+        best = None
+        for user_id, tenant in self._tenants.items():
+            if not tenant.stats.queued or tenant.stats.running >= self.user_max_concurrency:
+                continue
+            if best is None or tenant.virtual_time < best[1].virtual_time:
+                best = (user_id, tenant)
+        return best
+
+    def _dispatch(self) -> None:
+        while self._running < self.workers:
+            chosen = self._next()
+            if chosen is None:
+                return
+            user_id, tenant = chosen
+            run = min(tenant.jobs, key=lambda job: len(job._pending))
+            index, unit, queued_at = run._pending.popleft()
+            if not run._pending:
+                tenant.jobs.remove(run)
+
+            self._virtual_time = tenant.virtual_time
+            tenant.virtual_time += 1.0 / tenant.stats.weight
+            waited = time.monotonic() - queued_at
+            stats = tenant.stats
+            stats.queued -= 1
+            stats.running += 1
+            stats.served += 1
+            stats.wait_seconds_total += waited
+            stats.max_wait_seconds = max(stats.max_wait_seconds, waited)
+            run.wait_seconds_total += waited
+            run.max_wait_seconds = max(run.max_wait_seconds, waited)
+            self._running += 1
+            label = priority_class(stats.weight)
+            QUEUE_DEPTH.dec(priority=label)
+            RUNNING.inc(priority=label)
+            WAIT_SECONDS.observe(waited, priority=label)
+
+            task = asyncio.create_task(self._run_unit(tenant, run, index, unit))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_unit(self, tenant: _Tenant, run: JobRun, index: int, unit: WorkUnit) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job-unit")
+        try:
+            run.results[index] = await asyncio.get_running_loop().run_in_executor(self._executor, unit)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            run.results[index] = e
+            run.failed += 1
+            logger.warning("work unit failed job_id=%s unit=%d error=%s", run.job_id, index, e)
+        finally:
+            self._running -= 1
+            tenant.stats.running -= 1
+            RUNNING.dec(priority=priority_class(tenant.stats.weight))
+            if not tenant.stats.queued and not tenant.stats.running and self._tenants.get(tenant.user_id) is tenant:
+                del self._tenants[tenant.user_id]  # Idle: keep no state for users without work
+            run.done += 1
+            if run.done == run.total and not run._future.done():
+                run.finished_at = time.monotonic()
+                run._future.set_result(None)
+            self._dispatch()
+
+    async def close(self) -> None:
+        """Cancel running units and drop queued ones (application shutdown)."""
+        for tenant in self._tenants.values():
+            for run in tenant.jobs:
+                if not run._future.done():
+                    run._future.cancel()
+            tenant.jobs.clear()
+            QUEUE_DEPTH.dec(tenant.stats.queued, priority=priority_class(tenant.stats.weight))
+            tenant.stats.queued = 0
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+job_scheduler = FairScheduler(
+    workers=settings.scheduler_workers or os.cpu_count() or 1,
+    user_max_concurrency=settings.scheduler_user_max_concurrency,
+)
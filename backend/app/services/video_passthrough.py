@@ -0,0 +1,278 @@
+"""Video passthrough (technical-spec §5.2: videos are copied unchanged).
+
+Videos can be gigabytes, so they are never held in memory as a whole. The
+bytes are streamed from the Picker video download (`=dv`) into a Google
+Photos resumable upload session, one chunk at a time:
+
+    POST {PHOTOS_LIBRARY_API_BASE}/uploads   X-Goog-Upload-Command: start
+    POST {upload URL}                       X-Goog-Upload-Command: upload[, finalize]
+                                            X-Goog-Upload-Offset: <bytes sent before>
+    POST {upload URL}                       X-Goog-Upload-Command: query
+
+Chunks are VIDEO_UPLOAD_CHUNK_MB, rounded down to the session's chunk
+granularity (256 KiB), and filled into one reused buffer. When a chunk
+fails, the session is queried for the bytes Google has confirmed and the
+upload resumes there: from the chunk still in memory, or (if the confirmed
+offset lies outside it) by re-opening the download with an HTTP Range. The
+download is re-opened the same way when it breaks mid-stream. A failed
+passthrough raises `VideoPassthroughError` with its upload URL, which a
+later attempt passes back to continue from the confirmed offset instead
+of from zero.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+from app.core.config import settings
+from app.core.http_retry import backoff_seconds, is_retryable
+from app.core.metrics import registry
+from app.services.google_photos import (
+    MAX_UPLOAD_RETRIES,
+    UPLOAD_CHUNK_GRANULARITY,
+    UPLOAD_RETRY_BACKOFF_SECONDS,
+    GooglePhotosError,
+    query_resumable_upload,
+    start_resumable_upload,
+    upload_chunk,
+)
+from app.services.picker_api import video_url
+
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+
+logger = logging.getLogger(__name__)
+
+READ_SIZE = 1 << 20  # Bytes read from the download at a time
+DOWNLOAD_TIMEOUT_SECONDS = 60  # Connect and per-read timeout
+
+BYTES = registry.counter("video_passthrough_bytes_total", "Video bytes confirmed by Google Photos")
+RESUMES = registry.counter(
+    "video_passthrough_resumes_total", "Video passthrough recoveries, by the side that failed", ("side",)
+)
+
+
+class VideoPassthroughError(Exception):
+    """
+    Raised when a video could not be passed through.
+
+    `upload_url` (if a session was opened) resumes the upload in a later
+    `passthrough_video` call.
+    """
+
+    def __init__(self, message: str, upload_url: Optional[str] = None):
+        super().__init__(message)
+        self.upload_url = upload_url
+
+
+@dataclass
+class VideoUpload:
+    """Result of one `passthrough_video` call."""
+
+    upload_url: str
+    upload_token: str = ""  # For `batch_create_media_items`
+    size: int = 0  # Bytes of the video
+    resumed_from: int = 0  # Bytes confirmed before this call started
+    chunks: int = 0  # Chunk requests accepted
+    upload_resumes: int = 0  # Failed chunk requests resumed from the confirmed offset
+    download_restarts: int = 0
+    seconds: float = 0.0
+
+
+class _Download:
+    """Sequential reader of a video download that re-opens at any offset with an HTTP Range."""
+
+    def __init__(self, credentials: Credentials, url: str):
+        self.credentials = credentials
+        self.url = url
+        self.size: Optional[int] = None
+        self.restarts = 0
+        self._response = None
+        self._position = 0
+
+    def open(self, offset: int = 0) -> None:
+        """(Re-)open the download at `offset`; learns the video size when the server reports it."""
+        import requests
+        from google.auth.transport.requests import Request
+
+        self.close()
+        if not self.credentials.valid:
+            self.credentials.refresh(Request())
+        headers = {"Authorization": f"Bearer {self.credentials.token}", "Accept-Encoding": "identity"}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+        response = requests.get(self.url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT_SECONDS)
+        response.raise_for_status()
+        self._response = response
+        if response.status_code == 206:
+            total = response.headers.get("Content-Range", "").rpartition("/")[2]
+            self.size = int(total) if total.isdigit() else self.size
+            self._position = offset
+            return
+        if "Content-Length" in response.headers:
+            self.size = int(response.headers["Content-Length"])
+        self._position = 0
+        while self._position < offset:  # Range not honoured: skip ahead without keeping the bytes
+            skipped = len(response.raw.read(min(READ_SIZE, offset - self._position)))
+            if not skipped:
+                raise requests.exceptions.ChunkedEncodingError(
+                    f"Video download ended at {self._position} bytes, before offset {offset}"
+                )
+            self._position += skipped
+
+    def readinto(self, view: memoryview, offset: int) -> int:
+        """
+        Fill `view` with the video bytes starting at `offset`.
+
+        Returns:
+            Bytes filled; fewer than len(view) only at the end of the video.
+        """
+        import requests
+
+        filled = 0
+        failures = 0
+        while filled < len(view):
+            try:
+                if self._response is None or self._position != offset + filled:
+                    self.open(offset + filled)
+                read = self._response.raw.readinto(view[filled : filled + READ_SIZE])
+                if not read and self.size is not None and self._position < self.size:
+                    raise requests.exceptions.ChunkedEncodingError(
+                        f"Video download cut at {self._position} of {self.size} bytes"
+                    )
+            except Exception as e:
+                self.close()
+                failures += 1
+                if failures > MAX_UPLOAD_RETRIES or not is_retryable(e):
+                    raise
+                self.restarts += 1
+                RESUMES.inc(side="download")
+                logger.info("video download restarting offset=%d error=%s", offset + filled, e)
+                time.sleep(backoff_seconds(failures - 1, UPLOAD_RETRY_BACKOFF_SECONDS))
+                continue
+            if not read:
+                break
+            filled += read
+            self._position += read
+        return filled
+
+    def close(self) -> None:
+        if self._response is not None:
+            self._response.close()
+            self._response = None
+
+
+def _send_chunk(
+    credentials: Credentials, upload: VideoUpload, chunk: memoryview, offset: int, last: bool
+) -> tuple[Optional[str], int]:
+    """
+    Send the chunk starting at `offset`, resuming from the confirmed offset after failures.
+
+    Returns:
+        (upload token if the upload is complete, offset of the next byte to read).
+    """
+    sent = offset  # First byte Google has not confirmed
+    failures = 0
+    resync = False  # The last attempt failed: ask Google where the upload stands first
+    while True:
+        try:
+            if resync:
+                # A single attempt: failures count against this loop's retries, not a nested loop's
+                status, confirmed, token = query_resumable_upload(credentials, upload.upload_url, max_retries=0)
+                resync = False
+                upload.upload_resumes += 1
+                RESUMES.inc(side="upload")
+                if status == "final":
+                    return token, confirmed
+                if status != "active":
+                    raise VideoPassthroughError(f"Upload session is {status}", upload.upload_url)
+                if not offset <= confirmed <= offset + len(chunk):
+                    return None, confirmed  # Outside the chunk in memory: read again from the download
+                BYTES.inc(confirmed - sent)
+                sent = confirmed
+            token = upload_chunk(credentials, upload.upload_url, sent, chunk[sent - offset :], finalize=last)
+        except Exception as e:
+            failures += 1
+            if failures > MAX_UPLOAD_RETRIES or not is_retryable(e):
+                raise
+            logger.info("video upload chunk failed offset=%d attempt=%d error=%s", sent, failures, e)
+            time.sleep(backoff_seconds(failures - 1, UPLOAD_RETRY_BACKOFF_SECONDS))
+            resync = True
+            continue
+        BYTES.inc(offset + len(chunk) - sent)
+        upload.chunks += 1
+        if last and not token:
+            raise GooglePhotosError("Google Photos returned no upload token")
+        return token, offset + len(chunk)
+
+
+def passthrough_video(
+    credentials: Credentials,
+    base_url: str,
+    mime_type: str,
+    upload_url: Optional[str] = None,
+    chunk_bytes: Optional[int] = None,
+) -> VideoUpload:
+    """
+    Copy a picked video into Google Photos unchanged, streaming it chunk by chunk.
+
+    At most one chunk is held in memory. Each chunk gets up to
+    MAX_UPLOAD_RETRIES retries (each resuming from the confirmed offset),
+    and reading it up to as many download restarts.
+
+    Args:
+        credentials: Valid OAuth credentials (for both the download and the upload).
+        base_url: Picker media item baseUrl of the video.
+        mime_type: Video MIME type (e.g. video/mp4).
+        upload_url: `VideoPassthroughError.upload_url` of an earlier attempt, to resume it.
+        chunk_bytes: Chunk size; VIDEO_UPLOAD_CHUNK_MB if None.
+
+    Returns:
+        VideoUpload with the upload token for `batch_create_media_items`.
+
+    Raises:
+        VideoPassthroughError: If the video could not be copied.
+    """
+    started = time.perf_counter()
+    download = _Download(credentials, video_url(base_url))
+    upload = VideoUpload(upload_url=upload_url or "")
+    try:
+        if upload_url is None:
+            download.open()
+            upload.upload_url, granularity = start_resumable_upload(credentials, mime_type, download.size)
+            offset = 0
+        else:
+            status, offset, token = query_resumable_upload(credentials, upload_url)
+            if status == "final":
+                upload.upload_token, upload.size, upload.resumed_from = token, offset, offset
+                return upload
+            if status != "active":
+                raise VideoPassthroughError(f"Upload session is {status}", upload_url)
+            granularity = UPLOAD_CHUNK_GRANULARITY
+            upload.resumed_from = offset
+
+        chunk_size = (chunk_bytes or settings.video_upload_chunk_mb * 2**20) // granularity * granularity
+        buffer = memoryview(bytearray(max(granularity, chunk_size)))
+        token = None
+        while token is None:
+            length = download.readinto(buffer, offset)
+            last = length < len(buffer) or download.size == offset + length
+            token, offset = _send_chunk(credentials, upload, buffer[:length], offset, last)
+        upload.upload_token, upload.size = token, offset
+    except VideoPassthroughError:
+        raise
+    except Exception as e:
+        raise VideoPassthroughError(f"Video passthrough failed: {e}", upload.upload_url or None) from e
+    finally:
+        download.close()
+        upload.download_restarts = download.restarts
+        upload.seconds = time.perf_counter() - started
+
+    logger.info(
+        "video passed through size=%d resumed_from=%d chunks=%d upload_resumes=%d download_restarts=%d ms=%.0f",
+        upload.size, upload.resumed_from, upload.chunks, upload.upload_resumes,
+        upload.download_restarts, upload.seconds * 1000,
+    )
+    return upload
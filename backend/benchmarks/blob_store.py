@@ -0,0 +1,97 @@
+"""
+Local blob store throughput.
+
+Writes N blobs of a given size into a fresh `LocalBlobStore`, then reads
+them back three ways:
+
+- read:      `read()` into a bytes object
+- mmap:      `open_mmap()` and touch every page (zero-copy)
+- sendfile:  `sendfile()` into a socket drained by another thread (kernel copy),
+             compared with read + `socket.sendall`
+
+Usage (from backend/):
+    python -m benchmarks.blob_store
+    python -m benchmarks.blob_store --blobs 500 --size-kb 2048 --output blobs.json
+"""
+import argparse
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+
+from app.core.blob_store import LocalBlobStore
+from benchmarks.common import result_envelope, write_results
+
+PAGE = 4096
+
+
+def _drain(sock: socket.socket, stop: threading.Event) -> None:
+    sock.settimeout(0.2)
+    while not stop.is_set():
+        try:
+            if not sock.recv(1 << 20):
+                return
+        except socket.timeout:
+            continue
+
+
+def _timed(label: str, total_bytes: int, fn) -> dict:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    result = {"seconds": round(elapsed, 3), "mb_per_s": round(total_bytes / 2**20 / elapsed, 1)}
+    print(f"{label:18} {result['seconds']:>8.3f}s {result['mb_per_s']:>9.1f} MB/s")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blobs", type=int, default=200)
+    parser.add_argument("--size-kb", type=int, default=1024)
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="voyage-blob-bench-")
+    store = LocalBlobStore(root, quota_bytes=2**40)
+    payloads = [os.urandom(args.size_kb * 1024) for _ in range(args.blobs)]
+    total = sum(len(payload) for payload in payloads)
+    digests: list[str] = []
+    results = {}
+    try:
+        results["put"] = _timed("put", total, lambda: digests.extend(store.put(p).digest for p in payloads))
+        results["read"] = _timed("read", total, lambda: [store.read(d) for d in digests])
+
+        def touch_mmaps() -> None:
+            for digest in digests:
+                mapped = store.open_mmap(digest)
+                sum(mapped[i] for i in range(0, len(mapped), PAGE))
+                mapped.close()
+
+        results["mmap"] = _timed("mmap", total, touch_mmaps)
+
+        for label, send in (
+            ("read+sendall", lambda sock, digest: sock.sendall(store.read(digest))),
+            ("sendfile", lambda sock, digest: store.sendfile(digest, sock.fileno())),
+        ):
+            sender, receiver = socket.socketpair()
+            stop = threading.Event()
+            drainer = threading.Thread(target=_drain, args=(receiver, stop))
+            drainer.start()
+            try:
+                results[label] = _timed(label, total, lambda: [send(sender, d) for d in digests])
+            finally:
+                stop.set()
+                sender.close()
+                drainer.join()
+                receiver.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    config = {"blobs": args.blobs, "size_kb": args.size_kb}
+    write_results(args.output, result_envelope("blob_store", config, results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Photo row persistence benchmark: ORM vs bulk writes.
+
+Creates a throwaway user and job, then writes N photo rows and one score
+update per row through each strategy:
+
+- orm_per_step:  `db.add` per photo and a commit per photo (the pattern used
+                 by the auth routes), then per-object attribute updates with a
+                 commit per photo. Every commit expires the whole identity map,
+                 so this grows quadratically; it runs on `--per-step-photos` rows.
+- orm_batched:   `db.add` per photo and one commit, then per-object updates and one commit
+- bulk:          `PhotoWriteBuffer` (COPY inserts, `UPDATE ... FROM (VALUES ...)`
+                 or temp-table merge for updates), flushing every
+                 PHOTO_WRITE_BUFFER_ROWS rows
+
+Requires a migrated database at DATABASE_URL. All rows are deleted afterwards.
+
+Usage (from backend/):
+    python -m benchmarks.bulk_writes
+    python -m benchmarks.bulk_writes --photos 10000 --skip orm_per_step --output bulk.json
+"""
+import argparse
+import random
+import time
+import uuid
+
+from sqlalchemy import delete, select
+
+from app.core.database import SessionLocal, get_engine
+from app.models import Job, Photo, User
+from app.services.photo_store import PhotoWriteBuffer
+from benchmarks.common import result_envelope, write_results
+
+STRATEGIES = ["orm_per_step", "orm_batched", "bulk"]
+
+
+def _media_ids(count: int) -> list[str]:
+    return [f"media-{i:06d}" for i in range(count)]
+
+
+def run_orm(job: Job, media_ids: list[str], scores: list[float], commit_each: bool) -> tuple[float, float]:
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        photos = []
+        for media_id in media_ids:
+            photo = Photo(job_id=job.id, job_created_at=job.created_at, original_media_item_id=media_id)
+            db.add(photo)
+            photos.append(photo)
+            if commit_each:
+                db.commit()
+        db.commit()
+        insert_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        photos = db.scalars(select(Photo).where(Photo.job_id == job.id)).all()
+        by_media = {photo.original_media_item_id: photo for photo in photos}
+        for media_id, score in zip(media_ids, scores):
+            by_media[media_id].aesthetic_score = score
+            if commit_each:
+                db.commit()
+        db.commit()
+        return insert_s, time.perf_counter() - started
+    finally:
+        db.close()
+
+
+def run_bulk(job_id: uuid.UUID, media_ids: list[str], scores: list[float]) -> tuple[float, float]:
+    started = time.perf_counter()
+    with PhotoWriteBuffer(job_id, "import") as buffer:
+        for media_id in media_ids:
+            buffer.insert(media_id)
+    insert_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with PhotoWriteBuffer(job_id, "quality") as buffer:
+        for media_id, score in zip(media_ids, scores):
+            buffer.update(media_id, aesthetic_score=score)
+    return insert_s, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--photos", type=int, default=10000)
+    parser.add_argument("--per-step-photos", type=int, default=1000, help="Rows for orm_per_step")
+    parser.add_argument("--skip", default="", help="Comma-separated strategies to skip")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    skip = {name for name in args.skip.split(",") if name}
+    media_ids = _media_ids(args.photos)
+    rng = random.Random(0)
+    scores = [rng.random() for _ in media_ids]
+
+    db = SessionLocal()
+    user = User(google_user_id=f"bench-{uuid.uuid4().hex}", email="bench@example.com")
+    db.add(user)
+    db.commit()
+
+    results = {}
+    try:
+        for strategy in STRATEGIES:
+            if strategy in skip:
+                continue
+            count = min(args.per_step_photos, args.photos) if strategy == "orm_per_step" else args.photos
+            job = Job(user_id=user.id)
+            db.add(job)
+            db.commit()
+            if strategy == "bulk":
+                insert_s, update_s = run_bulk(job.id, media_ids[:count], scores[:count])
+            else:
+                insert_s, update_s = run_orm(
+                    job, media_ids[:count], scores[:count], commit_each=strategy == "orm_per_step"
+                )
+
+            stored = db.scalars(select(Photo.aesthetic_score).where(Photo.job_id == job.id)).all()
+            assert len(stored) == count and sorted(stored) == sorted(scores[:count]), strategy
+            db.commit()
+            results[strategy] = {
+                "photos": count,
+                "insert_s": round(insert_s, 3),
+                "update_s": round(update_s, 3),
+                "insert_rows_per_s": round(count / insert_s),
+                "update_rows_per_s": round(count / update_s),
+            }
+            row = results[strategy]
+            print(
+                f"{strategy:14} {count:>6} rows   insert {insert_s:7.3f}s ({row['insert_rows_per_s']:>8} rows/s)"
+                f"   update {update_s:7.3f}s ({row['update_rows_per_s']:>8} rows/s)"
+            )
+    finally:
+        db.execute(delete(User).where(User.id == user.id))  # Cascades to jobs and photos
+        db.commit()
+        db.close()
+        get_engine().dispose()
+
+    config = {"photos": args.photos, "per_step_photos": args.per_step_photos}
+    write_results(args.output, result_envelope("bulk_writes", config, results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Shared helpers for benchmark scripts (stats, result files, comparisons)."""
+import json
+import math
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted sequence.
+
+    Args:
+        sorted_values: Values sorted ascending.
+        pct: Percentile in the range 0-100.
+
+    Returns:
+        The percentile value, or 0.0 for an empty sequence.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize_latencies(latencies_ms: Iterable[float]) -> dict:
+    """Summarize a set of latencies (ms) into mean/p50/p95/p99/max."""
+    values = sorted(latencies_ms)
+    if not values:
+        return {"mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    return {
+        "mean_ms": round(sum(values) / len(values), 3),
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "max_ms": round(values[-1], 3),
+    }
+
+
+def git_revision() -> Optional[str]:
+    """Return the current git commit SHA, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def result_envelope(benchmark: str, config: dict, results: dict) -> dict:
+    """Wrap benchmark results with metadata needed to compare runs across commits."""
+    return {
+        "benchmark": benchmark,
+        "git_revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": config,
+        "results": results,
+    }
+
+
+def write_results(path: Optional[str], envelope: dict) -> None:
+    """Write results as JSON to `path` (no-op if path is None)."""
+    if not path:
+        return
+    Path(path).write_text(json.dumps(envelope, indent=2, sort_keys=True) + "\n")
+    print(f"\nResults written to {path}")
+
+
+def load_results(path: str) -> dict:
+    """Load a results file written by `write_results`."""
+    return json.loads(Path(path).read_text())
+
+
+def compare_metric(
+    name: str, baseline: float, current: float, tolerance: float, higher_is_better: bool
+) -> Optional[str]:
+    """
+    Compare one metric against a baseline.
+
+    Returns:
+        A human-readable regression message, or None if within tolerance.
+    """
+    if baseline <= 0:
+        return None
+    change = (current - baseline) / baseline
+    regressed = change < -tolerance if higher_is_better else change > tolerance
+    if not regressed:
+        return None
+    return f"{name}: {baseline:.3f} -> {current:.3f} ({change:+.1%})"
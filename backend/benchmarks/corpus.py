@@ -0,0 +1,155 @@
+"""
+Synthetic trip-photo corpus for pipeline benchmarks.
+
+Images are generated deterministically from a seed, one at a time, so
+corpora of 10k+ images never need to be held in memory. The mix mimics a
+messy trip album:
+
+- scene:        distinct landscape shots
+- burst:        near-duplicate bursts (small noise and a 1-2px shift)
+- tilted:       horizon rotated by a known angle within ±12 degrees
+- blurred:      heavily defocused shots
+- underexposed: shots at ~25% brightness
+"""
+import random
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+# Share of each kind in the corpus (bursts are emitted in groups)
+KIND_WEIGHTS = {
+    "scene": 0.40,
+    "burst": 0.25,
+    "tilted": 0.15,
+    "blurred": 0.10,
+    "underexposed": 0.10,
+}
+BURST_SIZE = (3, 5)
+TEXTURE_POOL_SIZE = 8
+MAX_SYNTHETIC_TILT = 12.0
+
+
+@dataclass
+class SyntheticImage:
+    """One generated image plus the ground truth benchmarks check against."""
+
+    index: int
+    kind: str
+    image: np.ndarray
+    tilt: float = 0.0
+    burst_id: Optional[int] = None
+
+
+def _texture(rng: np.random.Generator, width: int, height: int, cell: int) -> np.ndarray:
+    """Smooth random texture: low-resolution noise upsampled to full size."""
+    small = rng.integers(0, 256, size=(max(2, height // cell), max(2, width // cell), 3), dtype=np.uint8)
+    return np.asarray(Image.fromarray(small).resize((width, height), Image.Resampling.BILINEAR), dtype=np.float32)
+
+
+def render_scene(
+    rng: np.random.Generator,
+    width: int,
+    height: int,
+    tilt: float = 0.0,
+    texture: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Render a landscape: sky gradient over textured ground, split by a horizon.
+
+    Args:
+        rng: Random generator (determines the scene).
+        width: Image width in pixels.
+        height: Image height in pixels.
+        tilt: Horizon angle in degrees (counterclockwise positive).
+        texture: Optional precomputed ground texture (H, W, 3) float32 to reuse;
+            it is randomly shifted and flipped so scenes stay distinct.
+
+    Returns:
+        RGB uint8 array.
+    """
+    ys = np.arange(height, dtype=np.float32)[:, None]
+    xs = np.arange(width, dtype=np.float32)[None, :]
+    slope = np.float32(np.tan(np.radians(tilt)))
+    horizon = np.float32(height * rng.uniform(0.35, 0.65)) - slope * (xs - np.float32(width / 2))
+    sky_mask = (ys < horizon)[..., None]
+
+    gradient = (ys / np.float32(height))[..., None]
+    sky_top = rng.uniform([40, 90, 160], [120, 170, 255]).astype(np.float32)
+    sky_bottom = rng.uniform([150, 180, 200], [230, 230, 255]).astype(np.float32)
+    sky = sky_top * (1 - gradient) + sky_bottom * gradient
+
+    if texture is None:
+        texture = _texture(rng, width, height, int(rng.integers(8, 48)))
+    else:
+        texture = np.roll(texture, shift=(int(rng.integers(height)), int(rng.integers(width))), axis=(0, 1))
+        if rng.random() < 0.5:
+            texture = texture[:, ::-1]
+    ground_tint = rng.uniform([40, 50, 20], [130, 130, 90]).astype(np.float32)
+    ground = ground_tint * np.float32(0.5) + texture * np.float32(0.5)
+
+    image = np.where(sky_mask, sky, ground)
+    # A few low-contrast "objects" (buildings, people, boats) give each scene coarse structure
+    for _ in range(int(rng.integers(3, 7))):
+        w, h = int(rng.integers(width // 12, width // 3)), int(rng.integers(height // 10, height // 2))
+        x, y = int(rng.integers(0, width - w)), int(rng.integers(height // 3, height - h))
+        on_ground = ~sky_mask[y : y + h, x : x + w, 0]
+        image[y : y + h, x : x + w][on_ground] = np.clip(ground_tint + rng.uniform(-35, 35, size=3), 0, 255)
+    image += rng.integers(-12, 13, size=(height, width, 1), dtype=np.int16)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def _burst_variant(rng: np.random.Generator, base: np.ndarray) -> np.ndarray:
+    """Near-duplicate of `base`: small sensor noise and a 1-2px camera shift."""
+    shifted = np.roll(base, shift=(int(rng.integers(-2, 3)), int(rng.integers(-2, 3))), axis=(0, 1))
+    noise = rng.integers(-4, 5, size=base.shape, dtype=np.int16)
+    return np.clip(shifted.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def generate_corpus(count: int, width: int, height: int, seed: int = 0) -> Iterator[SyntheticImage]:
+    """
+    Lazily generate `count` synthetic trip photos.
+
+    Args:
+        count: Number of images.
+        width: Image width in pixels.
+        height: Image height in pixels.
+        seed: Seed; the same (count, size, seed) always yields the same corpus.
+
+    Yields:
+        SyntheticImage instances in album order.
+    """
+    picker = random.Random(seed)
+    rng = np.random.default_rng(seed)
+    kinds, weights = zip(*KIND_WEIGHTS.items())
+    index = 0
+    burst_id = 0
+    textures = [_texture(rng, width, height, int(rng.integers(8, 48))) for _ in range(TEXTURE_POOL_SIZE)]
+
+    def scene(tilt: float = 0.0) -> np.ndarray:
+        return render_scene(rng, width, height, tilt=tilt, texture=textures[picker.randrange(len(textures))])
+
+    while index < count:
+        kind = picker.choices(kinds, weights=weights)[0]
+        if kind == "burst":
+            base = scene()
+            for _ in range(min(picker.randint(*BURST_SIZE), count - index)):
+                yield SyntheticImage(index, "burst", _burst_variant(rng, base), burst_id=burst_id)
+                index += 1
+            burst_id += 1
+            continue
+
+        if kind == "tilted":
+            tilt = picker.uniform(2.0, MAX_SYNTHETIC_TILT) * picker.choice((-1, 1))
+            yield SyntheticImage(index, kind, scene(tilt=tilt), tilt=tilt)
+        elif kind == "blurred":
+            radius = max(width, height) / 150
+            image = Image.fromarray(scene()).filter(ImageFilter.GaussianBlur(radius))
+            yield SyntheticImage(index, kind, np.asarray(image))
+        elif kind == "underexposed":
+            image = scene().astype(np.float32) * 0.25
+            yield SyntheticImage(index, kind, image.astype(np.uint8))
+        else:
+            yield SyntheticImage(index, kind, scene())
+        index += 1
@@ -0,0 +1,428 @@
+"""
+Local stand-in for the Google endpoints the backend talks to.
+
+Serves the OAuth token endpoint, the Picker API (`/sessions`, paginated
+`/mediaItems`) and the Library API (albums, uploads, batchCreate) with
+configurable latency and error rates, so the backend can be load-tested
+without touching Google.
+
+Routes are mounted as:
+    POST /token                          -> OAuth token refresh
+    /picker/v1/...                       -> Picker API
+    /library/v1/...                      -> Library API (raw and resumable uploads)
+    GET /media/{id}=wW-hH                -> media bytes behind Picker baseUrls ("=dv": video, with Range)
+    /enhance/v1/...                      -> stand-in image enhancement provider
+    POST /restyle/v1/restyle?style=      -> stand-in restyle provider
+
+Run standalone:
+    python -m benchmarks.fake_google --port 9100 --latency-ms 50 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+import zlib
+from collections import Counter
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+
+from app.pipeline.images import encode_jpeg
+from benchmarks.corpus import render_scene
+
+FULL_RESOLUTION = (1600, 1200)  # Size served for "=d" downloads
+UPLOAD_GRANULARITY = 256 * 1024  # Resumable upload chunk granularity, like Google's
+VIDEO_PATTERN_BYTES = 1 << 20  # Videos repeat a per-item random pattern of this size
+
+
+class FakeGoogleConfig:
+    """Behaviour knobs for the fake Google server."""
+
+    def __init__(
+        self,
+        latency_ms: float = 50.0,
+        jitter_ms: float = 10.0,
+        error_rate: float = 0.0,
+        items_per_session: int = 200,
+        albums: int = 120,
+        video_ratio: float = 0.05,
+        selection_delay_s: float = 0.0,
+        video_bytes: int = 64 * 2**20,
+        cut_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.items_per_session = items_per_session
+        self.albums = albums
+        self.video_ratio = video_ratio
+        self.selection_delay_s = selection_delay_s  # Time until a new session reports mediaItemsSet
+        self.video_bytes = video_bytes  # Size of every "=dv" video download
+        self.cut_rate = cut_rate  # Share of video downloads and resumable upload chunks broken off partway
+        self.random = random.Random(seed)
+
+
+def _media_item(
+    session_id: str, index: int, is_video: bool, media_base: str = "https://fake.googleusercontent.com"
+) -> dict:
+    """Build a deterministic Picker media item whose baseUrl points at `media_base`."""
+    item_id = f"{session_id}-item-{index:06d}"
+    return {
+        "id": item_id,
+        "createTime": f"2025-07-{1 + index % 28:02d}T10:{index % 60:02d}:00Z",
+        "type": "VIDEO" if is_video else "PHOTO",
+        "mediaFile": {
+            "baseUrl": f"{media_base}/{item_id}",
+            "mimeType": "video/mp4" if is_video else "image/jpeg",
+            "filename": f"IMG_{index:05d}.{'mp4' if is_video else 'jpg'}",
+            "mediaFileMetadata": {"width": 4032, "height": 3024},
+        },
+    }
+
+
+def _route_key(method: str, path: str) -> str:
+    """Collapse ids in a path so counters aggregate per route."""
+    if path.startswith("/media/"):
+        return f"{method} /media/{{id}}"
+    segments = ["{id}" if len(seg) == 32 and seg.isalnum() else seg for seg in path.split("/")]
+    return f"{method} {'/'.join(segments)}"
+
+
+@lru_cache(maxsize=512)
+def _render_media(item_id: str, width: int, height: int) -> bytes:
+    """Render a deterministic JPEG for a media item at the requested size."""
+    rng = np.random.default_rng(zlib.crc32(item_id.encode()))
+    return encode_jpeg(render_scene(rng, width, height), quality=85)
+
+
+@lru_cache(maxsize=64)
+def _video_pattern(item_id: str) -> bytes:
+    return np.random.default_rng(zlib.crc32(item_id.encode())).bytes(VIDEO_PATTERN_BYTES)
+
+
+def video_bytes(item_id: str, start: int, stop: int) -> bytes:
+    """Bytes [start, stop) of a media item's deterministic fake video."""
+    pattern = _video_pattern(item_id)
+    out = bytearray()
+    while start < stop:
+        index = start % VIDEO_PATTERN_BYTES
+        take = min(stop - start, VIDEO_PATTERN_BYTES - index)
+        out += pattern[index : index + take]
+        start += take
+    return bytes(out)
+
+
+def _media_size(params: str) -> tuple[int, int]:
+    """Parse baseUrl size parameters ("w1024-h768", "d") into the image size to render."""
+    width, height = FULL_RESOLUTION
+    for part in params.split("-"):
+        if part[:1] in ("w", "h") and part[1:].isdigit():
+            value = int(part[1:])
+            if part[0] == "w":
+                width = min(width, value)
+            else:
+                height = min(height, value)
+    # Keep the 4:3 aspect ratio within the requested bounds, like Google does
+    scale = min(width / FULL_RESOLUTION[0], height / FULL_RESOLUTION[1])
+    return max(1, round(FULL_RESOLUTION[0] * scale)), max(1, round(FULL_RESOLUTION[1] * scale))
+
+
+def _page(total: int, page_size: int, page_token: Optional[str]) -> tuple[int, int, Optional[str]]:
+    """Return (start, end, nextPageToken) for offset-based pagination."""
+    start = int(page_token) if page_token else 0
+    end = min(start + page_size, total)
+    return start, end, str(end) if end < total else None
+
+
+def create_app(config: Optional[FakeGoogleConfig] = None) -> FastAPI:
+    """
+    Create the fake Google ASGI app.
+
+    Args:
+        config: Latency/error/data-size configuration. Defaults are used if None.
+
+    Returns:
+        FastAPI application.
+    """
+    config = config or FakeGoogleConfig()
+    app = FastAPI(title="Fake Google APIs")
+    hits: Counter = Counter()
+    session_created: dict[str, float] = {}
+    uploads: dict[str, dict] = {}  # Resumable upload sessions: received bytes, CRC-32, token once final
+
+    def video_response(item_id: str, range_header: Optional[str]) -> StreamingResponse:
+        size = config.video_bytes
+        start = 0
+        if range_header and range_header.startswith("bytes="):
+            start = min(int(range_header[6:].partition("-")[0] or 0), size)
+        cut = None
+        if start < size and config.random.random() < config.cut_rate:
+            cut = config.random.randrange(start, size)
+            hits["video cuts"] += 1
+
+        async def body():
+            position = start
+            while position < size:
+                end = min(size, position + UPLOAD_GRANULARITY)
+                if cut is not None and end > cut:
+                    yield video_bytes(item_id, position, cut)
+                    raise ConnectionResetError("Simulated broken video download")
+                yield video_bytes(item_id, position, end)
+                position = end
+
+        headers = {"Content-Length": str(size - start), "Accept-Ranges": "bytes"}
+        if start:
+            headers["Content-Range"] = f"bytes {start}-{size - 1}/{size}"
+        return StreamingResponse(body(), status_code=206 if start else 200, headers=headers, media_type="video/mp4")
+
+    @app.middleware("http")
+    async def simulate_upstream(request: Request, call_next):
+        """Apply latency and random failures to every non-admin route."""
+        if request.url.path.startswith("/_"):
+            return await call_next(request)
+
+        hits[_route_key(request.method, request.url.path)] += 1
+        delay = max(0.0, config.latency_ms + config.random.uniform(-1, 1) * config.jitter_ms)
+        await asyncio.sleep(delay / 1000)
+        if config.random.random() < config.error_rate:
+            hits["errors"] += 1
+            return JSONResponse(
+                status_code=503,
+                content={"error": {"code": 503, "message": "Simulated upstream failure"}},
+            )
+        return await call_next(request)
+
+    @app.get("/_stats")
+    async def stats():
+        """Upstream call counters (used by benchmarks to count Google round-trips)."""
+        return dict(hits)
+
+    @app.post("/_reset")
+    async def reset():
+        """Reset call counters."""
+        hits.clear()
+        return {"status": "ok"}
+
+    @app.post("/token")
+    async def token():
+        """OAuth token endpoint (refresh_token grant)."""
+        return {
+            "access_token": f"fake-access-{uuid.uuid4().hex}",
+            "expires_in": 3599,
+            "token_type": "Bearer",
+            "scope": "https://www.googleapis.com/auth/photospicker.mediaitems.readonly",
+        }
+
+    @app.post("/picker/v1/sessions")
+    async def create_session():
+        """Create a Picker session."""
+        session_id = uuid.uuid4().hex
+        session_created[session_id] = time.monotonic()
+        return {
+            "id": session_id,
+            "pickerUri": f"https://photos.google.com/picker/{session_id}",
+            "pollingConfig": {"pollInterval": "1s", "timeoutIn": "1800s"},
+            "mediaItemsSet": False,
+        }
+
+    @app.get("/picker/v1/sessions/{session_id}")
+    async def get_session(session_id: str):
+        """Get a Picker session; the selection is reported done `selection_delay_s` after creation."""
+        created = session_created.setdefault(session_id, time.monotonic() - config.selection_delay_s)
+        return {
+            "id": session_id,
+            "pickerUri": f"https://photos.google.com/picker/{session_id}",
+            "pollingConfig": {"pollInterval": "1s", "timeoutIn": "1800s"},
+            "mediaItemsSet": time.monotonic() - created >= config.selection_delay_s,
+        }
+
+    @app.get("/picker/v1/mediaItems")
+    async def list_media_items(
+        request: Request,
+        sessionId: str = Query(...),
+        pageSize: int = Query(25),
+        pageToken: Optional[str] = Query(None),
+    ):
+        """List picked media items with offset-based page tokens."""
+        start, end, next_token = _page(config.items_per_session, pageSize, pageToken)
+        video_every = int(1 / config.video_ratio) if config.video_ratio > 0 else 0
+        media_base = f"{str(request.base_url).rstrip('/')}/media"
+        items = [
+            _media_item(sessionId, i, bool(video_every) and i % video_every == video_every - 1, media_base)
+            for i in range(start, end)
+        ]
+        body = {"mediaItems": items}
+        if next_token:
+            body["nextPageToken"] = next_token
+        return body
+
+    @app.get("/media/{media_ref}")
+    async def media(media_ref: str, request: Request):
+        """Serve image bytes for a baseUrl, honoring "=wW-hH" size parameters ("=d" is full size, "=dv" a video)."""
+        item_id, _, params = media_ref.partition("=")
+        if params == "dv":
+            return video_response(item_id, request.headers.get("range"))
+        width, height = _media_size(params)
+        body = await asyncio.to_thread(_render_media, item_id, width, height)
+        return Response(content=body, media_type="image/jpeg")
+
+    @app.get("/library/v1/albums")
+    async def list_albums(pageSize: int = Query(20), pageToken: Optional[str] = Query(None)):
+        """List app-created albums."""
+        start, end, next_token = _page(config.albums, pageSize, pageToken)
+        albums = [
+            {
+                "id": f"album-{i:05d}",
+                "title": f"Trip {i}",
+                "mediaItemsCount": str(50 + i),
+                "productUrl": f"https://photos.google.com/album/album-{i:05d}",
+            }
+            for i in range(start, end)
+        ]
+        body = {"albums": albums}
+        if next_token:
+            body["nextPageToken"] = next_token
+        return body
+
+    @app.post("/library/v1/uploads")
+    async def upload(request: Request):
+        """Accept raw upload bytes and return an upload token (as plain text, like Google), or start a resumable upload."""
+        if request.headers.get("x-goog-upload-protocol") == "resumable":
+            upload_id = uuid.uuid4().hex
+            raw_size = request.headers.get("x-goog-upload-raw-size")
+            uploads[upload_id] = {"received": 0, "crc": 0, "raw_size": int(raw_size) if raw_size else None, "token": None}
+            return Response(
+                headers={
+                    "X-Goog-Upload-Status": "active",
+                    "X-Goog-Upload-URL": f"{str(request.base_url).rstrip('/')}/library/v1/uploads/resumable/{upload_id}",
+                    "X-Goog-Upload-Chunk-Granularity": str(UPLOAD_GRANULARITY),
+                }
+            )
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+        return PlainTextResponse(f"upload-token-{uuid.uuid4().hex}-{size}")
+
+    @app.post("/library/v1/uploads/resumable/{upload_id}")
+    async def resumable_upload(upload_id: str, request: Request):
+        """
+        Resumable upload commands: "query", "upload" and "upload, finalize".
+
+        The token of a finished upload is upload-token-<id>-<size>-<crc32 hex>,
+        so callers can check what arrived. With `cut_rate`, a chunk may be
+        accepted only up to a granularity boundary before a 503.
+        """
+        upload = uploads.get(upload_id)
+        if upload is None:
+            return JSONResponse(status_code=404, content={"error": {"code": 404, "message": "No such upload"}})
+        command = request.headers.get("x-goog-upload-command", "")
+        status = "final" if upload["token"] else "active"
+        if command == "query":
+            return PlainTextResponse(
+                upload["token"] or "",
+                headers={"X-Goog-Upload-Status": status, "X-Goog-Upload-Size-Received": str(upload["received"])},
+            )
+        if status == "final" or not command.startswith("upload"):
+            return JSONResponse(status_code=400, content={"error": {"code": 400, "message": f"Bad command {command!r}"}})
+        if int(request.headers.get("x-goog-upload-offset", "-1")) != upload["received"]:
+            return JSONResponse(status_code=400, content={"error": {"code": 400, "message": "Offset mismatch"}})
+
+        finalize = "finalize" in command
+        length = int(request.headers.get("content-length", "0"))
+        if not finalize and length % UPLOAD_GRANULARITY:
+            return JSONResponse(status_code=400, content={"error": {"code": 400, "message": "Chunk not a multiple of granularity"}})
+        accept = length
+        if length and config.random.random() < config.cut_rate:
+            accept = config.random.randrange(length // UPLOAD_GRANULARITY + 1) * UPLOAD_GRANULARITY
+            hits["upload cuts"] += 1
+        taken = 0
+        async for chunk in request.stream():
+            part = chunk[: max(0, accept - taken)]
+            upload["crc"] = zlib.crc32(part, upload["crc"])
+            upload["received"] += len(part)
+            taken += len(chunk)
+        if accept < length:
+            return JSONResponse(status_code=503, content={"error": {"code": 503, "message": "Simulated cut upload"}})
+        if finalize:
+            if upload["raw_size"] is not None and upload["raw_size"] != upload["received"]:
+                return JSONResponse(status_code=400, content={"error": {"code": 400, "message": "Size mismatch"}})
+            upload["token"] = f"upload-token-{upload_id}-{upload['received']}-{upload['crc']:08x}"
+            return PlainTextResponse(upload["token"], headers={"X-Goog-Upload-Status": "final"})
+        return Response(headers={"X-Goog-Upload-Status": "active"})
+
+    @app.post("/library/v1/mediaItems:batchCreate")
+    async def batch_create(request: Request):
+        """Create media items from upload tokens."""
+        payload = await request.json()
+        results = [
+            {
+                "uploadToken": item.get("simpleMediaItem", {}).get("uploadToken"),
+                "status": {"message": "Success"},
+                "mediaItem": {"id": uuid.uuid4().hex},
+            }
+            for item in payload.get("newMediaItems", [])
+        ]
+        return {"newMediaItemResults": results}
+
+    @app.post("/enhance/v1/enhance")
+    async def enhance(request: Request):
+        """Enhancement provider stand-in: returns the image unchanged."""
+        return Response(content=await request.body(), media_type=request.headers.get("content-type", "image/jpeg"))
+
+    @app.post("/enhance/v1/enhance:batch")
+    async def enhance_batch(request: Request):
+        """Batched enhancement: base64 images in, base64 images out, in order."""
+        payload = await request.json()
+        return {"results": [{"id": image["id"], "data": image["data"]} for image in payload.get("images", [])]}
+
+    @app.post("/restyle/v1/restyle")
+    async def restyle(request: Request, style: str = "anime"):
+        """Restyle provider stand-in: appends the style to the image bytes (decoders ignore trailing data)."""
+        return Response(content=await request.body() + style.encode(), media_type="image/jpeg")
+
+    return app
+
+
+def main() -> None:
+    """Run the fake Google server with uvicorn."""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--items", type=int, default=200, help="Media items per picker session")
+    parser.add_argument("--albums", type=int, default=120)
+    parser.add_argument(
+        "--selection-delay", type=float, default=0.0, help="Seconds until a new session reports mediaItemsSet"
+    )
+    parser.add_argument("--video-mb", type=float, default=64.0, help="Size of every video download")
+    parser.add_argument(
+        "--cut-rate", type=float, default=0.0, help="Share of video downloads and resumable upload chunks broken off"
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = FakeGoogleConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        items_per_session=args.items,
+        albums=args.albums,
+        selection_delay_s=args.selection_delay,
+        video_bytes=int(args.video_mb * 2**20),
+        cut_rate=args.cut_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+"""
+HTTP load benchmark for the auth and picker endpoints.
+
+Starts the fake Google server (`benchmarks.fake_google`) and the backend
+(`uvicorn app.main:app`) as subprocesses, seeds a benchmark user with
+encrypted OAuth credentials, then drives concurrent clients against a
+weighted mix of routes. Reports throughput, error counts and p50/p95/p99
+latency per route, plus the number of upstream (fake Google) calls.
+
+Requires a migrated Postgres reachable via DATABASE_URL
+(`docker compose up db` + `alembic upgrade head`).
+
+Usage (from backend/):
+    python -m benchmarks.http_load --concurrency 32 --duration 30 --output bench.json
+    python -m benchmarks.http_load --latency-ms 200 --error-rate 0.02 --compare bench.json
+"""
+import argparse
+import base64
+import os
+import random
+import secrets
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Optional
+
+import requests
+
+from benchmarks.common import (
+    compare_metric,
+    load_results,
+    result_envelope,
+    summarize_latencies,
+    write_results,
+)
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Route mix: (route label, relative weight). Labels use path templates so
+# results aggregate per route rather than per session id.
+DEFAULT_MIX = {
+    "GET /api/health": 1,
+    "GET /api/auth/me": 4,
+    "POST /api/photos/picker/session": 1,
+    "GET /api/photos/picker/session/{id}": 4,
+    "GET /api/photos/picker/session/{id}/items": 2,
+}
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_up(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code < 500:
+                return
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"Server at {url} did not come up within {timeout}s")
+
+
+def build_environment(fake_base: str) -> dict:
+    """
+    Environment for the backend under test, pointing all Google calls at the fake.
+
+    JWT_SECRET and TOKEN_ENCRYPTION_KEY are generated if not already set so the
+    benchmark can run against a fresh checkout.
+    """
+    env = dict(os.environ)
+    env.update(
+        {
+            "GOOGLE_CLIENT_ID": env.get("GOOGLE_CLIENT_ID") or "bench-client-id",
+            "GOOGLE_CLIENT_SECRET": env.get("GOOGLE_CLIENT_SECRET") or "bench-client-secret",
+            "GOOGLE_TOKEN_URI": f"{fake_base}/token",
+            "PICKER_API_BASE": f"{fake_base}/picker/v1",
+            "PHOTOS_LIBRARY_API_BASE": f"{fake_base}/library/v1",
+            "JWT_SECRET": env.get("JWT_SECRET") or secrets.token_urlsafe(32),
+            "TOKEN_ENCRYPTION_KEY": env.get("TOKEN_ENCRYPTION_KEY")
+            or base64.b64encode(secrets.token_bytes(32)).decode(),
+        }
+    )
+    return env
+
+
+def seed_user() -> tuple[uuid.UUID, str]:
+    """
+    Create a benchmark user with encrypted credentials and mint a JWT for it.
+
+    Must be called after the benchmark environment is applied to os.environ,
+    because app settings are read at import time.
+    """
+    from app.core.database import SessionLocal
+    from app.core.encryption import encrypt_token
+    from app.core.jwt import create_access_token
+    from app.core.oauth import GOOGLE_PHOTOS_SCOPES
+    from app.models import OAuthCredential, User
+
+    db = SessionLocal()
+    try:
+        user = User(google_user_id=f"bench-{uuid.uuid4().hex}", email="bench@example.invalid")
+        db.add(user)
+        db.flush()
+        db.add(
+            OAuthCredential(
+                user_id=user.id,
+                provider="google",
+                refresh_token=encrypt_token("bench-refresh-token"),
+                scopes=GOOGLE_PHOTOS_SCOPES,
+            )
+        )
+        db.commit()
+        return user.id, create_access_token(user.id, user.email)
+    finally:
+        db.close()
+
+
+def delete_user(user_id: uuid.UUID) -> None:
+    """Remove the benchmark user (credentials cascade)."""
+    from app.core.database import SessionLocal
+    from app.models import User
+
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.id == user_id).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+class LoadContext:
+    """State shared by client threads."""
+
+    def __init__(self, base_url: str, token: str, session_ids: list[str]):
+        self.base_url = base_url
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.session_ids = session_ids
+
+
+def _timed(http: requests.Session, method: str, url: str, **kwargs) -> tuple[int, float, Optional[dict]]:
+    start = time.perf_counter()
+    try:
+        response = http.request(method, url, timeout=60, **kwargs)
+        status_code = response.status_code
+        body = response.json() if response.ok else None
+    except requests.exceptions.RequestException:
+        status_code, body = 0, None
+    return status_code, (time.perf_counter() - start) * 1000, body
+
+
+def _op_health(http, ctx, rng):
+    status_code, ms, _ = _timed(http, "GET", f"{ctx.base_url}/api/health")
+    return [("GET /api/health", status_code, ms)]
+
+
+def _op_me(http, ctx, rng):
+    status_code, ms, _ = _timed(http, "GET", f"{ctx.base_url}/api/auth/me", headers=ctx.headers)
+    return [("GET /api/auth/me", status_code, ms)]
+
+
+def _op_create_session(http, ctx, rng):
+    url = f"{ctx.base_url}/api/photos/picker/session"
+    status_code, ms, _ = _timed(http, "POST", url, headers=ctx.headers)
+    return [("POST /api/photos/picker/session", status_code, ms)]
+
+
+def _op_session_status(http, ctx, rng):
+    url = f"{ctx.base_url}/api/photos/picker/session/{rng.choice(ctx.session_ids)}"
+    status_code, ms, _ = _timed(http, "GET", url, headers=ctx.headers)
+    return [("GET /api/photos/picker/session/{id}", status_code, ms)]
+
+
+def _op_items(http, ctx, rng):
+    """Walk every page of a session's items, recording each page request."""
+    url = f"{ctx.base_url}/api/photos/picker/session/{rng.choice(ctx.session_ids)}/items"
+    samples, page_token = [], None
+    while True:
+        params = {"page_token": page_token} if page_token else None
+        status_code, ms, body = _timed(http, "GET", url, headers=ctx.headers, params=params)
+        samples.append(("GET /api/photos/picker/session/{id}/items", status_code, ms))
+        page_token = body.get("nextPageToken") if body else None
+        if not page_token:
+            return samples
+
+
+OPERATIONS: dict[str, Callable] = {
+    "GET /api/health": _op_health,
+    "GET /api/auth/me": _op_me,
+    "POST /api/photos/picker/session": _op_create_session,
+    "GET /api/photos/picker/session/{id}": _op_session_status,
+    "GET /api/photos/picker/session/{id}/items": _op_items,
+}
+
+
+def run_load(ctx: LoadContext, mix: dict[str, int], concurrency: int, duration: float, seed: int) -> dict:
+    """
+    Drive `concurrency` client threads for `duration` seconds.
+
+    Returns:
+        Dict of route label -> list of (status_code, latency_ms) samples.
+    """
+    routes, weights = zip(*mix.items())
+    samples: dict[str, list[tuple[int, float]]] = defaultdict(list)
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(index: int) -> None:
+        rng = random.Random(seed + index)
+        http = requests.Session()
+        local = defaultdict(list)
+        while time.monotonic() < deadline:
+            route = rng.choices(routes, weights=weights)[0]
+            for label, status_code, ms in OPERATIONS[route](http, ctx, rng):
+                local[label].append((status_code, ms))
+        with lock:
+            for label, values in local.items():
+                samples[label].extend(values)
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def summarize(samples: dict, elapsed: float) -> dict:
+    """Per-route throughput, error counts and latency percentiles."""
+    routes = {}
+    for label, values in sorted(samples.items()):
+        ok = [ms for status_code, ms in values if 200 <= status_code < 400]
+        routes[label] = {
+            "requests": len(values),
+            "errors": len(values) - len(ok),
+            "throughput_rps": round(len(values) / elapsed, 2),
+            **summarize_latencies(ok),
+        }
+    total = sum(route["requests"] for route in routes.values())
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "total_requests": total,
+        "total_throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "routes": routes,
+    }
+
+
+def print_report(results: dict) -> None:
+    header = f"{'route':48} {'req':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}"
+    print(header)
+    print("-" * len(header))
+    for label, route in results["routes"].items():
+        print(
+            f"{label:48} {route['requests']:>7} {route['errors']:>5} {route['throughput_rps']:>8.1f} "
+            f"{route['p50_ms']:>8.1f} {route['p95_ms']:>8.1f} {route['p99_ms']:>8.1f}"
+        )
+    print(f"\nTotal: {results['total_requests']} requests, {results['total_throughput_rps']} req/s")
+    if results.get("upstream_calls"):
+        print(f"Upstream calls: {results['upstream_calls']}")
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list[str]:
+    """Return regression messages for routes present in both runs."""
+    regressions = []
+    base_routes = baseline["results"]["routes"]
+    for label, route in current["results"]["routes"].items():
+        base = base_routes.get(label)
+        if not base:
+            continue
+        checks = [
+            ("throughput_rps", True),
+            ("p95_ms", False),
+            ("p99_ms", False),
+        ]
+        for metric, higher_is_better in checks:
+            message = compare_metric(
+                f"{label} {metric}", base[metric], route[metric], tolerance, higher_is_better
+            )
+            if message:
+                regressions.append(message)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of unmeasured load first")
+    parser.add_argument("--workers", type=int, default=1, help="Backend uvicorn workers")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Fake Google latency")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fake Google error rate (0-1)")
+    parser.add_argument("--items", type=int, default=200, help="Media items per picker session")
+    parser.add_argument("--sessions", type=int, default=8, help="Picker sessions polled by clients")
+    parser.add_argument(
+        "--mix",
+        default=None,
+        help="Route weights, e.g. 'GET /api/auth/me=4,GET /api/health=1' (default: built-in mix)",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write machine-readable results (JSON) to this path")
+    parser.add_argument("--compare", help="Baseline results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    mix = dict(DEFAULT_MIX)
+    if args.mix:
+        mix = {}
+        for entry in args.mix.split(","):
+            route, weight = entry.rsplit("=", 1)
+            if route.strip() not in OPERATIONS:
+                parser.error(f"Unknown route in --mix: {route.strip()}")
+            mix[route.strip()] = int(weight)
+
+    fake_port, app_port = _free_port(), _free_port()
+    fake_base = f"http://127.0.0.1:{fake_port}"
+    base_url = f"http://127.0.0.1:{app_port}"
+    env = build_environment(fake_base)
+    os.environ.update(env)
+
+    processes = [
+        subprocess.Popen(
+            [
+                sys.executable, "-m", "benchmarks.fake_google",
+                "--port", str(fake_port),
+                "--latency-ms", str(args.latency_ms),
+                "--jitter-ms", str(args.jitter_ms),
+                "--error-rate", str(args.error_rate),
+                "--items", str(args.items),
+                "--seed", str(args.seed),
+            ],
+            cwd=BACKEND_DIR,
+            env=env,
+        ),
+        subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "app.main:app",
+                "--port", str(app_port),
+                "--workers", str(args.workers),
+                "--log-level", "warning",
+                "--no-access-log",
+            ],
+            cwd=BACKEND_DIR,
+            env=env,
+        ),
+    ]
+    user_id = None
+    try:
+        _wait_until_up(f"{fake_base}/_stats")
+        _wait_until_up(f"{base_url}/api/health")
+
+        user_id, token = seed_user()
+        headers = {"Authorization": f"Bearer {token}"}
+        session_ids = []
+        for _ in range(args.sessions):
+            response = requests.post(f"{base_url}/api/photos/picker/session", headers=headers, timeout=60)
+            response.raise_for_status()
+            session_ids.append(response.json()["sessionId"])
+        ctx = LoadContext(base_url, token, session_ids)
+
+        if args.warmup > 0:
+            run_load(ctx, mix, args.concurrency, args.warmup, args.seed)
+        requests.post(f"{fake_base}/_reset", timeout=5)
+
+        start = time.monotonic()
+        samples = run_load(ctx, mix, args.concurrency, args.duration, args.seed)
+        results = summarize(samples, time.monotonic() - start)
+        results["upstream_calls"] = requests.get(f"{fake_base}/_stats", timeout=5).json()
+    finally:
+        if user_id is not None:
+            delete_user(user_id)
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "compare")}
+    config["mix"] = mix
+    envelope = result_envelope("http_load", config, results)
+    print_report(results)
+    write_results(args.output, envelope)
+
+    if args.compare:
+        regressions = compare(load_results(args.compare), envelope, args.tolerance)
+        if regressions:
+            print("\nRegressions vs baseline:")
+            for message in regressions:
+                print(f"  {message}")
+            return 1
+        print("\nNo regressions vs baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,342 @@
+"""
+Pipeline-stage micro-benchmarks against the technical-spec §10 targets.
+
+Runs each stage over a synthetic trip corpus (`benchmarks.corpus`) at
+several album sizes and resolutions. Every (stage, count, resolution) run
+executes in a fresh process so peak RSS is measured per run. Reports
+images/s, peak RSS, stage-specific accuracy checks against the corpus
+ground truth, and pass/fail for:
+
+- dedup of 100 photos in under 2 seconds
+- 100 images through all benchmarked stages in under 5 minutes
+
+Stages: dedup, quality, tilt, enhancement_fallback, local_enhance (the
+local CPU enhancer, also reporting megapixels/s), upload (against the fake
+Google server from `benchmarks.fake_google`).
+
+Usage (from backend/):
+    python -m benchmarks.pipeline_stages --output stages.json
+    python -m benchmarks.pipeline_stages --counts 100,1000 --resolutions 1024x768 --stages dedup,tilt
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+from benchmarks.common import compare_metric, load_results, result_envelope, write_results
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+STAGES = ["dedup", "quality", "tilt", "enhancement_fallback", "local_enhance", "upload"]
+
+# Technical-spec §10
+DEDUP_TARGET_SECONDS_PER_100 = 2.0
+PIPELINE_TARGET_SECONDS_PER_100 = 300.0
+
+
+def _stage_dedup(corpus) -> tuple[float, dict]:
+    from app.pipeline.dedup import dhash, find_duplicate_groups, similarity_signature
+
+    elapsed, hashes, signatures, truth = 0.0, [], [], []
+    for item in corpus:
+        start = time.perf_counter()
+        hashes.append(dhash(item.image))
+        signatures.append(similarity_signature(item.image))
+        elapsed += time.perf_counter() - start
+        truth.append((item.kind, item.burst_id) if item.kind == "burst" else (item.kind, item.index))
+
+    start = time.perf_counter()
+    groups = find_duplicate_groups(hashes, signatures)
+    elapsed += time.perf_counter() - start
+
+    expected = len(truth) - len(set(truth))
+    return elapsed, {
+        "duplicates_expected": expected,
+        "duplicates_found": sum(len(group) - 1 for group in groups),
+        "false_merges": sum(1 for group in groups if len({truth[i] for i in group}) > 1),
+    }
+
+
+def _stage_quality(corpus) -> tuple[float, dict]:
+    from app.pipeline.quality import compute_quality
+
+    elapsed = 0.0
+    counts = {"blurred": 0, "blurred_flagged": 0, "dark": 0, "dark_flagged": 0, "clean": 0, "clean_flagged": 0}
+    for item in corpus:
+        start = time.perf_counter()
+        metrics = compute_quality(item.image)
+        elapsed += time.perf_counter() - start
+        if item.kind == "blurred":
+            counts["blurred"] += 1
+            counts["blurred_flagged"] += metrics.is_blurry()
+        elif item.kind == "underexposed":
+            counts["dark"] += 1
+            counts["dark_flagged"] += metrics.is_underexposed()
+        else:
+            counts["clean"] += 1
+            counts["clean_flagged"] += metrics.is_blurry() or metrics.is_underexposed()
+    return elapsed, {
+        "blur_recall": round(counts["blurred_flagged"] / max(1, counts["blurred"]), 3),
+        "underexposure_recall": round(counts["dark_flagged"] / max(1, counts["dark"]), 3),
+        "false_flag_rate": round(counts["clean_flagged"] / max(1, counts["clean"]), 3),
+    }
+
+
+def _stage_tilt(corpus) -> tuple[float, dict]:
+    from app.pipeline.tilt import correct_tilt, estimate_tilt
+
+    elapsed, tilted, detected, false_corrections, errors = 0.0, 0, 0, 0, []
+    for item in corpus:
+        start = time.perf_counter()
+        estimate = estimate_tilt(item.image)
+        if estimate.should_correct:
+            correct_tilt(item.image, estimate.angle)
+        elapsed += time.perf_counter() - start
+        if item.kind == "tilted":
+            tilted += 1
+            if estimate.should_correct:
+                detected += 1
+                errors.append(abs(estimate.angle - item.tilt))
+        elif estimate.should_correct:
+            false_corrections += 1
+    return elapsed, {
+        "detection_recall": round(detected / max(1, tilted), 3),
+        "false_corrections": false_corrections,
+        "mean_abs_error_deg": round(sum(errors) / len(errors), 3) if errors else None,
+    }
+
+
+def _stage_enhancement_fallback(corpus) -> tuple[float, dict]:
+    from app.pipeline.enhance import enhance_with_fallback
+    from app.pipeline.images import encode_jpeg
+
+    def unavailable(_: bytes) -> bytes:
+        raise TimeoutError("enhancement provider unavailable")
+
+    elapsed, fallbacks = 0.0, 0
+    for item in corpus:
+        original = encode_jpeg(item.image)
+        start = time.perf_counter()
+        result = enhance_with_fallback(original, unavailable)
+        elapsed += time.perf_counter() - start
+        fallbacks += not result.enhanced
+    return elapsed, {"fallbacks": fallbacks}
+
+
+def _stage_local_enhance(corpus) -> tuple[float, dict]:
+    from app.pipeline.local_enhance import enhance_array, shutdown_enhance_pool
+    from app.pipeline.quality import compute_quality
+
+    elapsed, pixels, sharper, count = 0.0, 0, 0, 0
+    try:
+        for item in corpus:
+            start = time.perf_counter()
+            enhanced = enhance_array(item.image)
+            elapsed += time.perf_counter() - start
+            pixels += item.image.shape[0] * item.image.shape[1]
+            count += 1
+            sharper += compute_quality(enhanced).sharpness > compute_quality(item.image).sharpness
+    finally:
+        shutdown_enhance_pool()
+    return elapsed, {
+        "megapixels_per_s": round(pixels / 1e6 / elapsed, 1),
+        "sharpened_share": round(sharper / max(1, count), 3),
+    }
+
+
+def _stage_upload(corpus, concurrency: int) -> tuple[float, dict]:
+    from google.oauth2.credentials import Credentials
+
+    from app.pipeline.images import encode_jpeg
+    from app.services.google_photos import upload_media
+
+    credentials = Credentials(token="bench-access-token")
+    uploaded_bytes = 0
+
+    def upload(image) -> int:
+        data = encode_jpeg(image)
+        upload_media(credentials, data, "image/jpeg")
+        return len(data)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for size in pool.map(upload, (item.image for item in corpus)):
+            uploaded_bytes += size
+    elapsed = time.perf_counter() - start
+    return elapsed, {"uploaded_mb": round(uploaded_bytes / 2**20, 2), "mb_per_s": round(uploaded_bytes / 2**20 / elapsed, 2)}
+
+
+def run_stage(stage: str, count: int, width: int, height: int, seed: int, upload_concurrency: int) -> dict:
+    """Run one stage over a fresh corpus (called in a child process)."""
+    from benchmarks.corpus import generate_corpus
+
+    corpus = generate_corpus(count, width, height, seed=seed)
+    if stage == "upload":
+        elapsed, metrics = _stage_upload(corpus, upload_concurrency)
+    else:
+        elapsed, metrics = globals()[f"_stage_{stage}"](corpus)
+
+    return {
+        "stage": stage,
+        "count": count,
+        "resolution": f"{width}x{height}",
+        "seconds": round(elapsed, 4),
+        "images_per_s": round(count / elapsed, 2) if elapsed else None,
+        # ru_maxrss is KiB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "metrics": metrics,
+    }
+
+
+def evaluate_targets(runs: list[dict]) -> list[dict]:
+    """Check results against the technical-spec §10 targets, per resolution."""
+    targets = []
+    for resolution in sorted({run["resolution"] for run in runs}):
+        at_resolution = [run for run in runs if run["resolution"] == resolution and run["images_per_s"]]
+
+        dedup_runs = sorted((run for run in at_resolution if run["stage"] == "dedup"), key=lambda r: r["count"])
+        if dedup_runs:
+            exact = next((run for run in dedup_runs if run["count"] == 100), None)
+            seconds = exact["seconds"] if exact else 100 / dedup_runs[0]["images_per_s"]
+            targets.append(
+                {
+                    "target": "dedup_100_photos_under_2s",
+                    "resolution": resolution,
+                    "value_s": round(seconds, 3),
+                    "limit_s": DEDUP_TARGET_SECONDS_PER_100,
+                    "passed": seconds < DEDUP_TARGET_SECONDS_PER_100,
+                }
+            )
+
+        # Per stage, use the largest album measured (steady-state throughput)
+        largest = {}
+        for run in at_resolution:
+            if run["count"] >= largest.get(run["stage"], {"count": -1})["count"]:
+                largest[run["stage"]] = run
+        if largest:
+            seconds = sum(100 / run["images_per_s"] for run in largest.values())
+            targets.append(
+                {
+                    "target": "pipeline_100_images_under_5min",
+                    "resolution": resolution,
+                    "stages": sorted(largest),
+                    "value_s": round(seconds, 3),
+                    "limit_s": PIPELINE_TARGET_SECONDS_PER_100,
+                    "passed": seconds < PIPELINE_TARGET_SECONDS_PER_100,
+                }
+            )
+    return targets
+
+
+def print_report(runs: list[dict], targets: list[dict]) -> None:
+    header = f"{'stage':22} {'count':>6} {'resolution':>10} {'seconds':>9} {'img/s':>9} {'rss MB':>8}  metrics"
+    print(header)
+    print("-" * len(header))
+    for run in runs:
+        print(
+            f"{run['stage']:22} {run['count']:>6} {run['resolution']:>10} {run['seconds']:>9.3f} "
+            f"{run['images_per_s'] or 0:>9.1f} {run['peak_rss_mb']:>8.1f}  {run['metrics']}"
+        )
+    print()
+    for target in targets:
+        status = "PASS" if target["passed"] else "FAIL"
+        print(f"[{status}] {target['target']} @ {target['resolution']}: {target['value_s']}s (limit {target['limit_s']}s)")
+
+
+def _parse_resolution(value: str) -> tuple[int, int]:
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", default="100,1000,10000", help="Album sizes, comma-separated")
+    parser.add_argument("--resolutions", default="640x480,1024x768,2048x1536", help="WxH list, comma-separated")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Subset of: {', '.join(STAGES)}")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--upload-latency-ms", type=float, default=30.0, help="Fake upload endpoint latency")
+    parser.add_argument("--upload-concurrency", type=int, default=8)
+    parser.add_argument("--output", help="Write machine-readable results (JSON) to this path")
+    parser.add_argument("--compare", help="Baseline results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    counts = [int(value) for value in args.counts.split(",")]
+    resolutions = [_parse_resolution(value) for value in args.resolutions.split(",")]
+    stages = [stage.strip() for stage in args.stages.split(",")]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+    fake = None
+    if "upload" in stages:
+        from benchmarks.http_load import _free_port, _wait_until_up
+
+        port = _free_port()
+        fake = subprocess.Popen(
+            [
+                sys.executable, "-m", "benchmarks.fake_google",
+                "--port", str(port),
+                "--latency-ms", str(args.upload_latency_ms),
+            ],
+            cwd=BACKEND_DIR,
+        )
+        os.environ["PHOTOS_LIBRARY_API_BASE"] = f"http://127.0.0.1:{port}/library/v1"
+        _wait_until_up(f"http://127.0.0.1:{port}/_stats")
+
+    runs = []
+    context = multiprocessing.get_context("spawn")
+    try:
+        for width, height in resolutions:
+            for count in counts:
+                for stage in stages:
+                    # Fresh process per run so peak RSS is attributable to this run
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                        run = pool.submit(
+                            run_stage, stage, count, width, height, args.seed, args.upload_concurrency
+                        ).result()
+                    print(f"  {stage} x{count} @ {width}x{height}: {run['images_per_s']} img/s", flush=True)
+                    runs.append(run)
+    finally:
+        if fake:
+            fake.terminate()
+            fake.wait(timeout=10)
+
+    targets = evaluate_targets(runs)
+    print()
+    print_report(runs, targets)
+
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "compare")}
+    write_results(args.output, result_envelope("pipeline_stages", config, {"runs": runs, "targets": targets}))
+
+    exit_code = 0 if all(target["passed"] for target in targets) else 1
+    if args.compare:
+        baseline = {
+            (run["stage"], run["count"], run["resolution"]): run
+            for run in load_results(args.compare)["results"]["runs"]
+        }
+        regressions = []
+        for run in runs:
+            base = baseline.get((run["stage"], run["count"], run["resolution"]))
+            if base and base["images_per_s"] and run["images_per_s"]:
+                label = f"{run['stage']} x{run['count']} @ {run['resolution']}"
+                for metric, higher_is_better in (("images_per_s", True), ("peak_rss_mb", False)):
+                    message = compare_metric(
+                        f"{label} {metric}", base[metric], run[metric], args.tolerance, higher_is_better
+                    )
+                    if message:
+                        regressions.append(message)
+        if regressions:
+            print("\nRegressions vs baseline:")
+            for message in regressions:
+                print(f"  {message}")
+            exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Multi-tenant job scheduling: FIFO vs weighted fair queuing.
+
+One user submits a large album, then other users submit small trips
+shortly after. Each work unit sleeps for `--unit-ms` in a worker thread
+(standing in for per-photo work). Reports, per job, when it finished and
+how long its units waited, under:
+
+- fifo:  one queue, no per-user cap (units run in submission order)
+- fair:  `app.services.scheduler.FairScheduler` (per-user fair share and cap)
+
+Usage (from backend/):
+    python -m benchmarks.scheduler_fairness
+    python -m benchmarks.scheduler_fairness --large 8000 --small 50 --small-users 3 --workers 8 --unit-ms 2
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from app.services.scheduler import FairScheduler
+from benchmarks.common import result_envelope, write_results
+
+
+def _unit(seconds: float):
+    return lambda: time.sleep(seconds)
+
+
+async def run_fifo(args) -> dict:
+    """One shared queue drained by `workers` tasks, in submission order."""
+    queue: asyncio.Queue = asyncio.Queue()
+    remaining: dict[str, int] = {}
+    finished: dict[str, float] = {}
+    started = time.monotonic()
+
+    async def worker() -> None:
+        while True:
+            name = await queue.get()
+            await asyncio.to_thread(time.sleep, args.unit_ms / 1000)
+            remaining[name] -= 1
+            if not remaining[name]:
+                finished[name] = round(time.monotonic() - started, 3)
+            queue.task_done()
+
+    workers = [asyncio.create_task(worker()) for _ in range(args.workers)]
+    remaining["large"] = args.large
+    for _ in range(args.large):
+        queue.put_nowait("large")
+    await asyncio.sleep(args.small_delay_ms / 1000)
+    for index in range(args.small_users):
+        remaining[f"small{index}"] = args.small
+        for _ in range(args.small):
+            queue.put_nowait(f"small{index}")
+    await queue.join()
+    for task in workers:
+        task.cancel()
+    return finished
+
+
+async def run_fair(args) -> dict:
+    scheduler = FairScheduler(workers=args.workers, user_max_concurrency=args.user_cap)
+    started = time.monotonic()
+    unit = _unit(args.unit_ms / 1000)
+    jobs = [("large", scheduler.submit(uuid.uuid4(), uuid.uuid4(), [unit] * args.large))]
+    await asyncio.sleep(args.small_delay_ms / 1000)
+    for index in range(args.small_users):
+        jobs.append((f"small{index}", scheduler.submit(uuid.uuid4(), uuid.uuid4(), [unit] * args.small)))
+    await asyncio.gather(*(job.wait() for _, job in jobs))
+    await scheduler.close()
+    finished = {name: round(job.finished_at - started, 3) for name, job in jobs}
+    waits = {name: round(job.mean_wait_seconds, 3) for name, job in jobs}
+    return {**finished, "mean_wait_s_by_job": waits}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--large", type=int, default=8000, help="Units in the large job")
+    parser.add_argument("--small", type=int, default=50, help="Units per small job")
+    parser.add_argument("--small-users", type=int, default=3)
+    parser.add_argument("--small-delay-ms", type=float, default=50.0, help="Small jobs arrive this long after the large one")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--user-cap", type=int, default=6, help="Fair mode per-user concurrency")
+    parser.add_argument("--unit-ms", type=float, default=2.0)
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    results = {}
+    for mode in ("fifo", "fair"):
+        finished = asyncio.run(run_fifo(args) if mode == "fifo" else run_fair(args))
+        results[mode] = finished
+        small = [seconds for name, seconds in finished.items() if name.startswith("small")]
+        print(
+            f"{mode:5} large job done {finished['large']:>7.2f}s   small jobs done "
+            f"{min(small):.2f}-{max(small):.2f}s",
+            flush=True,
+        )
+
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    write_results(args.output, result_envelope("scheduler_fairness", config, results))
+
+
+if __name__ == "__main__":
+    main()
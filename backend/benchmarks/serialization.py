@@ -0,0 +1,240 @@
+"""
+Response serialization benchmark for large Picker listings.
+
+Builds an in-process FastAPI app that serves the same Picker media-item
+page through three pipelines and measures each end to end (transform +
+FastAPI response serialization + JSON rendering), via direct ASGI calls so
+no network or event-loop overhead is included:
+
+- dict:          plain dicts, no response model, `jsonable_encoder` + stdlib `json`
+                 (the previous code path)
+- model:         `PickerMediaItemList` response model; FastAPI (>= 0.130) dumps it
+                 straight to JSON bytes in pydantic-core (the current code path)
+- model_orjson:  same response model with an orjson response class, which makes
+                 FastAPI build a dict first (skipped if orjson is not installed)
+
+Per-item cost is the slope of request time over page size, so fixed
+per-request overhead is excluded. Also reports gzip/brotli sizes and
+compression time for each page size.
+
+Usage (from backend/):
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --sizes 50,500,5000 --output serialization.json
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import statistics
+import sys
+import time
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from app.schemas import PickerMediaItemList
+from app.services.picker_api import to_media_item
+from benchmarks.common import compare_metric, load_results, result_envelope, write_results
+from benchmarks.fake_google import _media_item
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+PIPELINES = ["dict", "model"] + (["model_orjson"] if orjson is not None else [])
+
+
+class _ORJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+
+def _legacy_media_item(item: dict) -> dict:
+    """The dict transform the Picker service used before response models."""
+    media_file = item.get("mediaFile", {})
+    base_url = media_file.get("baseUrl", "")
+    if base_url and "=" not in base_url:
+        base_url = base_url + "=d"
+    return {
+        "id": item.get("id"),
+        "filename": media_file.get("filename", ""),
+        "mimeType": media_file.get("mimeType", ""),
+        "mediaMetadata": media_file.get("mediaFileMetadata", {}),
+        "baseUrl": base_url,
+        "type": item.get("type", ""),
+        "createTime": item.get("createTime", ""),
+    }
+
+
+def build_app(pages: dict[int, dict]) -> FastAPI:
+    """One route per pipeline, each serving the upstream page of the requested size."""
+    app = FastAPI()
+
+    @app.get("/dict/{size}", response_class=JSONResponse)
+    async def as_dict(size: int):
+        data = pages[size]
+        return {
+            "mediaItems": [_legacy_media_item(item) for item in data["mediaItems"]],
+            "nextPageToken": data.get("nextPageToken"),
+        }
+
+    def model_page(size: int) -> PickerMediaItemList:
+        data = pages[size]
+        return PickerMediaItemList(
+            media_items=[to_media_item(item) for item in data["mediaItems"]],
+            next_page_token=data.get("nextPageToken"),
+        )
+
+    @app.get("/model/{size}", response_model=PickerMediaItemList)
+    async def as_model(size: int):
+        return model_page(size)
+
+    @app.get("/model_orjson/{size}", response_model=PickerMediaItemList, response_class=_ORJSONResponse)
+    async def as_model_orjson(size: int):
+        return model_page(size)
+
+    return app
+
+
+async def call(app: FastAPI, path: str) -> bytes:
+    """Run one GET through the ASGI app and return the response body."""
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [], "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 8000),
+    }
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def time_route(app: FastAPI, path: str, min_seconds: float) -> float:
+    """Median wall time (µs) of repeated requests, after a warm-up."""
+    for _ in range(3):
+        await call(app, path)
+    samples = []
+    deadline = time.perf_counter() + min_seconds
+    while time.perf_counter() < deadline or len(samples) < 5:
+        start = time.perf_counter()
+        await call(app, path)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def compression_stats(body: bytes) -> dict:
+    """Compressed sizes and times for gzip (level 6) and brotli (quality 4)."""
+    stats = {"identity_bytes": len(body)}
+    start = time.perf_counter()
+    stats["gzip_bytes"] = len(gzip.compress(body, compresslevel=6))
+    stats["gzip_ms"] = (time.perf_counter() - start) * 1000
+    if brotli is not None:
+        start = time.perf_counter()
+        stats["br_bytes"] = len(brotli.compress(body, quality=4))
+        stats["br_ms"] = (time.perf_counter() - start) * 1000
+    return stats
+
+
+async def run(sizes: list[int], min_seconds: float) -> dict:
+    pages = {
+        size: {
+            "mediaItems": [_media_item("bench", i, is_video=i % 10 == 0) for i in range(size)],
+            "nextPageToken": "next",
+        }
+        for size in sizes
+    }
+    app = build_app(pages)
+
+    bodies = {pipeline: await call(app, f"/{pipeline}/{sizes[-1]}") for pipeline in PIPELINES}
+    decoded = {pipeline: json.loads(body) for pipeline, body in bodies.items()}
+    if any(value != decoded["dict"] for value in decoded.values()):
+        raise RuntimeError("Pipelines produced different JSON documents")
+
+    results: dict = {"pipelines": {}, "compression": {}}
+    for pipeline in PIPELINES:
+        request_us = {size: await time_route(app, f"/{pipeline}/{size}", min_seconds) for size in sizes}
+        slope = float(np.polyfit(sizes, [request_us[size] for size in sizes], 1)[0]) if len(sizes) > 1 else (
+            request_us[sizes[0]] / sizes[0]
+        )
+        results["pipelines"][pipeline] = {
+            "request_us": {str(size): value for size, value in request_us.items()},
+            "per_item_us": slope,
+        }
+    for size in sizes:
+        results["compression"][str(size)] = compression_stats(await call(app, f"/dict/{size}"))
+    return results
+
+
+def report(results: dict, sizes: list[int]) -> None:
+    print(f"{'pipeline':14} {'µs/item':>9} " + " ".join(f"{f'{size} items (ms)':>16}" for size in sizes))
+    print("-" * (25 + 17 * len(sizes)))
+    baseline = results["pipelines"]["dict"]["per_item_us"]
+    for pipeline, data in results["pipelines"].items():
+        per_item = data["per_item_us"]
+        cells = " ".join(f"{data['request_us'][str(size)] / 1000:>16.2f}" for size in sizes)
+        print(f"{pipeline:14} {per_item:>9.2f} {cells}   ({baseline / per_item:.1f}x vs dict)")
+
+    print(f"\n{'items':>7} {'identity KB':>12} {'gzip KB':>9} {'gzip ms':>8} {'br KB':>8} {'br ms':>7}")
+    for size, stats in results["compression"].items():
+        br_kb = f"{stats['br_bytes'] / 1024:>8.1f}" if "br_bytes" in stats else f"{'-':>8}"
+        br_ms = f"{stats['br_ms']:>7.2f}" if "br_ms" in stats else f"{'-':>7}"
+        print(
+            f"{size:>7} {stats['identity_bytes'] / 1024:>12.1f} {stats['gzip_bytes'] / 1024:>9.1f} "
+            f"{stats['gzip_ms']:>8.2f} {br_kb} {br_ms}"
+        )
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list[str]:
+    """Return regressions in per-item cost versus a baseline results file."""
+    regressions = []
+    for pipeline, data in current["pipelines"].items():
+        before = baseline["pipelines"].get(pipeline)
+        if before is None:
+            continue
+        message = compare_metric(
+            f"{pipeline} µs/item", before["per_item_us"], data["per_item_us"], tolerance, higher_is_better=False
+        )
+        if message:
+            regressions.append(message)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="50,500,5000", help="Items per page, comma-separated")
+    parser.add_argument("--min-seconds", type=float, default=1.0, help="Minimum timing window per route and size")
+    parser.add_argument("--output", help="Write machine-readable results (JSON) to this path")
+    parser.add_argument("--compare", help="Baseline results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    results = asyncio.run(run(sizes, args.min_seconds))
+    report(results, sizes)
+    write_results(args.output, result_envelope("serialization", {"sizes": sizes}, results))
+
+    if args.compare:
+        regressions = compare(load_results(args.compare)["results"], results, args.tolerance)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Process-pool handoff of images: pickled arrays vs shared memory.
+
+Runs CPU tasks on large RGB images in a process pool two ways:
+
+- pickled:  `ProcessPoolExecutor.submit(fn, image)`; every task pickles
+            the whole image to the worker
+- shared:   `app.pipeline.shared_arrays.SharedArrayExecutor`; the image
+            is copied into shared memory once and tasks get a descriptor
+
+Tasks:
+
+- dhash:          `app.pipeline.dedup.dhash`, one task per image (light
+                  work, so the handoff dominates)
+- local_enhance:  `app.pipeline.local_enhance.enhance_array`, split into
+                  strips across the pool
+
+Reports wall time per image, images/s and the parent's CPU time per image
+(pickling and pipe writes land there).
+
+Usage (from backend/):
+    python -m benchmarks.shared_arrays
+    python -m benchmarks.shared_arrays --megapixels 24 --images 20 --workers 4 --tasks dhash
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from benchmarks.common import result_envelope, write_results
+
+MODES = ["pickled", "shared"]
+TASKS = ["dhash", "local_enhance"]
+
+
+def _images(count: int, megapixels: float) -> list[np.ndarray]:
+    width = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+    height = int(megapixels * 1e6 // width)
+    rng = np.random.default_rng(7)
+    base = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    return [np.roll(base, index * 17, axis=1) for index in range(count)]
+
+
+def run(mode: str, task: str, images: list[np.ndarray], workers: int) -> dict:
+    from app.core.config import settings
+    from app.pipeline.dedup import dhash
+    from app.pipeline.local_enhance import enhance_array
+    from app.pipeline.shared_arrays import SharedArrayExecutor
+
+    settings.local_enhance_parallel_min_mp = 0.0
+    context = multiprocessing.get_context("spawn")
+    pool_class = SharedArrayExecutor if mode == "shared" else ProcessPoolExecutor
+    with pool_class(max_workers=workers, mp_context=context) as pool:
+        pool.submit(dhash, images[0][:8, :8]).result()  # Start the workers
+        cpu_started, started = time.process_time(), time.perf_counter()
+        if task == "dhash":
+            if mode == "shared":
+                shared = [pool.share(image) for image in images]
+                futures = [pool.submit(dhash, array) for array in shared]
+                for array in shared:
+                    array.release()  # Tasks keep their own references
+            else:
+                futures = [pool.submit(dhash, image) for image in images]
+            for future in futures:
+                future.result()
+        else:
+            for image in images:
+                enhance_array(image, executor=pool)
+        elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+    return {
+        "mode": mode,
+        "task": task,
+        "ms_per_image": round(elapsed / len(images) * 1000, 1),
+        "images_per_s": round(len(images) / elapsed, 2),
+        "parent_cpu_ms_per_image": round(cpu / len(images) * 1000, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=12)
+    parser.add_argument("--megapixels", type=float, default=12.0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--modes", default=",".join(MODES), help=f"Subset of: {', '.join(MODES)}")
+    parser.add_argument("--tasks", default=",".join(TASKS), help=f"Subset of: {', '.join(TASKS)}")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    images = _images(args.images, args.megapixels)
+    runs = []
+    for task in (task.strip() for task in args.tasks.split(",")):
+        for mode in (mode.strip() for mode in args.modes.split(",")):
+            result = run(mode, task, images, args.workers)
+            runs.append(result)
+            print(
+                f"{task:14} {mode:8} {result['ms_per_image']:>8.1f} ms/image {result['images_per_s']:>7.2f} images/s "
+                f"parent CPU {result['parent_cpu_ms_per_image']:>7.1f} ms/image",
+                flush=True,
+            )
+
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    write_results(args.output, result_envelope("shared_arrays", config, {"runs": runs}))
+
+
+if __name__ == "__main__":
+    main()
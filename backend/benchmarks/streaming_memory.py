@@ -0,0 +1,115 @@
+"""
+Peak memory of whole-album vs streaming processing.
+
+Runs the same per-photo work (quality metrics + dHash + similarity
+signature on full-resolution images from `benchmarks.corpus`) two ways,
+each in a fresh process so peak RSS is attributable to the run:
+
+- buffered:   decode the whole album into a list, then process it
+- streaming:  `app.pipeline.stream.stream_batches` under a memory budget,
+              spilling to memory-mapped files once the budget is full
+
+The per-photo work is slower than decoding, so the producer runs ahead
+and the budget, spill and batch-size adaptation are exercised.
+
+Usage (from backend/):
+    python -m benchmarks.streaming_memory
+    python -m benchmarks.streaming_memory --counts 100,1000,10000 --modes streaming --budget-mb 128
+"""
+import argparse
+import multiprocessing
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from benchmarks.common import result_envelope, write_results
+
+MODES = ["buffered", "streaming"]
+
+
+def _work(image) -> None:
+    from app.pipeline.dedup import dhash, similarity_signature
+    from app.pipeline.quality import compute_quality
+
+    compute_quality(image)
+    dhash(image)
+    similarity_signature(image)
+
+
+def run(mode: str, count: int, width: int, height: int, budget_mb: int, batch: int) -> dict:
+    """Process one album (called in a child process)."""
+    from app.pipeline.stream import MemoryBudget, StreamStats, stream_batches
+    from benchmarks.corpus import generate_corpus
+
+    corpus = generate_corpus(count, width, height, seed=3)
+    stats = None
+    start = time.perf_counter()
+    if mode == "buffered":
+        images = [item.image for item in corpus]
+        for image in images:
+            _work(image)
+    else:
+        stats = StreamStats()
+        budget = MemoryBudget(budget_mb * 2**20)
+        for frames in stream_batches(
+            corpus, lambda item: (item.index, item.image), budget=budget, batch_size=batch, stats=stats
+        ):
+            for frame in frames:
+                _work(frame.array)
+    elapsed = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "count": count,
+        "resolution": f"{width}x{height}",
+        "seconds": round(elapsed, 3),
+        "images_per_s": round(count / elapsed, 2),
+        # ru_maxrss is KiB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "spilled": stats.spilled if stats else 0,
+        "batch_range": [stats.min_batch, stats.max_batch] if stats else None,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", default="100,1000", help="Album sizes, comma-separated")
+    parser.add_argument("--resolution", default="2048x1536", help="WxH")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"Subset of: {', '.join(MODES)}")
+    parser.add_argument("--budget-mb", type=int, default=128, help="Streaming memory budget")
+    parser.add_argument("--batch", type=int, default=16, help="Streaming maximum batch size")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    width, height = (int(value) for value in args.resolution.lower().split("x"))
+    counts = [int(value) for value in args.counts.split(",")]
+    modes = [mode.strip() for mode in args.modes.split(",")]
+
+    runs = []
+    context = multiprocessing.get_context("spawn")
+    for count in counts:
+        for mode in modes:
+            try:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    result = pool.submit(run, mode, count, width, height, args.budget_mb, args.batch).result()
+            except BrokenProcessPool:
+                # Typically the OOM killer: the album does not fit in memory this way
+                runs.append({"mode": mode, "count": count, "resolution": args.resolution, "killed": True})
+                print(f"{mode:10} x{count:<6} process killed (out of memory?)", flush=True)
+                continue
+            runs.append(result)
+            print(
+                f"{mode:10} x{count:<6} {result['seconds']:>8.2f}s {result['images_per_s']:>7.1f} img/s "
+                f"peak RSS {result['peak_rss_mb']:>7.1f} MB  spilled {result['spilled']:>5}  "
+                f"batches {result['batch_range']}",
+                flush=True,
+            )
+
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    write_results(args.output, result_envelope("streaming_memory", config, {"runs": runs}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+Peak memory and resilience of video passthrough.
+
+Copies one video from the fake Google server (`benchmarks.fake_google`)
+into a Google Photos upload two ways, each in a fresh process so peak RSS
+is attributable to the run:
+
+- buffered:   `download_media` of the whole "=dv" download, then one raw `upload_media`
+- streaming:  `app.services.video_passthrough.passthrough_video` (resumable
+              upload, one chunk in memory)
+
+With --cut-rate, the fake breaks off that share of downloads and upload
+chunks partway; streaming resumes from the confirmed offset, and the run
+checks the uploaded size and CRC-32 carried in the fake's upload token.
+
+Usage (from backend/):
+    python -m benchmarks.video_passthrough
+    python -m benchmarks.video_passthrough --video-mb 1024 --modes streaming --cut-rate 0.2
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from benchmarks.common import result_envelope, write_results
+from benchmarks.http_load import BACKEND_DIR, _free_port, _wait_until_up
+
+MODES = ["buffered", "streaming"]
+ITEM_ID = "bench-video-000001"
+
+
+def run(mode: str, fake_base: str, video_bytes: int, chunk_mb: int) -> dict:
+    """Copy the video once (called in a child process)."""
+    from google.oauth2.credentials import Credentials
+
+    os.environ["PHOTOS_LIBRARY_API_BASE"] = f"{fake_base}/library/v1"
+    from app.services.google_photos import upload_media
+    from app.services.picker_api import download_media, video_url
+    from app.services.video_passthrough import passthrough_video
+
+    credentials = Credentials(token="bench-access-token")
+    base_url = f"{fake_base}/media/{ITEM_ID}"
+    extra = {}
+    start = time.perf_counter()
+    if mode == "buffered":
+        token = upload_media(credentials, download_media(credentials, video_url(base_url)), "video/mp4")
+    else:
+        result = passthrough_video(credentials, base_url, "video/mp4", chunk_bytes=chunk_mb * 2**20)
+        token = result.upload_token
+        extra = {"upload_resumes": result.upload_resumes, "download_restarts": result.download_restarts}
+    elapsed = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "video_mb": round(video_bytes / 2**20, 1),
+        "seconds": round(elapsed, 3),
+        "mb_per_s": round(video_bytes / 2**20 / elapsed, 1),
+        # ru_maxrss is KiB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "token": token,
+        **extra,
+    }
+
+
+def expected_crc(video_bytes: int) -> int:
+    from benchmarks.fake_google import video_bytes as fake_video_bytes
+
+    crc = 0
+    for start in range(0, video_bytes, 2**24):
+        crc = zlib.crc32(fake_video_bytes(ITEM_ID, start, min(start + 2**24, video_bytes)), crc)
+    return crc
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--video-mb", type=float, default=512.0)
+    parser.add_argument("--chunk-mb", type=int, default=16, help="Streaming upload chunk size")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"Subset of: {', '.join(MODES)}")
+    parser.add_argument("--cut-rate", type=float, default=0.0, help="Share of downloads/chunks the fake breaks off")
+    parser.add_argument("--output", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    video_bytes = int(args.video_mb * 2**20)
+    port = _free_port()
+    fake_base = f"http://127.0.0.1:{port}"
+    fake = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.fake_google",
+            "--port", str(port),
+            "--latency-ms", "1",
+            "--jitter-ms", "0",
+            "--video-mb", str(args.video_mb),
+            "--cut-rate", str(args.cut_rate),
+            "--seed", "7",
+        ],
+        cwd=BACKEND_DIR,
+    )
+    runs = []
+    try:
+        _wait_until_up(f"{fake_base}/_stats")
+        crc = expected_crc(video_bytes)
+        context = multiprocessing.get_context("spawn")
+        for mode in (mode.strip() for mode in args.modes.split(",")):
+            try:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    result = pool.submit(run, mode, fake_base, video_bytes, args.chunk_mb).result()
+            except BrokenProcessPool:
+                runs.append({"mode": mode, "video_mb": args.video_mb, "killed": True})
+                print(f"{mode:10} process killed (out of memory?)", flush=True)
+                continue
+            except Exception as e:
+                runs.append({"mode": mode, "video_mb": args.video_mb, "error": str(e)})
+                print(f"{mode:10} failed: {e}", flush=True)
+                continue
+            if mode == "streaming":
+                result["intact"] = result.pop("token").endswith(f"-{video_bytes}-{crc:08x}")
+            else:
+                result["intact"] = result.pop("token").endswith(f"-{video_bytes}")
+            runs.append(result)
+            print(
+                f"{mode:10} {result['video_mb']:>7.0f} MB {result['seconds']:>7.2f}s {result['mb_per_s']:>7.1f} MB/s "
+                f"peak RSS {result['peak_rss_mb']:>7.1f} MB  intact {result['intact']}  "
+                f"resumes {result.get('upload_resumes', '-')}/{result.get('download_restarts', '-')}",
+                flush=True,
+            )
+    finally:
+        fake.terminate()
+        fake.wait()
+
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    write_results(args.output, result_envelope("video_passthrough", config, {"runs": runs}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())